@@ -0,0 +1,114 @@
+"""
+Compare ways of reading a page of datasets from the database.
+
+* `orm`: load `DatasetModel` instances, with formats and tags fetched by
+  `selectinload()`, then convert them into entities. This is how listings used
+  to be read.
+* `rows`: read flat rows with formats and tags aggregated into arrays, and build
+  entities from rows directly. This is how `GetAllQuery` reads listings.
+
+Runs against the database configured by `APP_DATABASE_URL`. Fill it first, e.g.:
+
+    python -m tools.addrandomdatasets 5000
+
+Usage:
+
+    python -m benchmarks.dataset_listing --page-size 100
+"""
+import argparse
+import asyncio
+import functools
+import statistics
+import time
+from typing import Awaitable, Callable, List
+
+import click
+from sqlalchemy import select
+from sqlalchemy.orm import contains_eager, selectinload
+
+from server.config.di import bootstrap, resolve
+from server.domain.common.pagination import Page
+from server.domain.datasets.entities import Dataset
+from server.domain.datasets.specifications import DatasetSpec
+from server.infrastructure.catalog_records.repositories import CatalogRecordModel
+from server.infrastructure.database import Database
+from server.infrastructure.datasets.models import DatasetModel
+from server.infrastructure.datasets.queries.get_all import GetAllQuery
+from server.infrastructure.datasets.transformers import make_entity
+from server.infrastructure.metrics.sql import track_queries
+
+info = functools.partial(click.style, fg="blue")
+
+
+async def read_orm(db: Database, page_size: int) -> List[Dataset]:
+    stmt = (
+        select(DatasetModel)
+        .join(DatasetModel.catalog_record)
+        .options(
+            contains_eager(DatasetModel.catalog_record),
+            selectinload(DatasetModel.formats),
+            selectinload(DatasetModel.tags),
+        )
+        .order_by(CatalogRecordModel.created_at.desc(), CatalogRecordModel.id.desc())
+        .limit(page_size)
+    )
+
+    async with db.session() as session:
+        result = await session.execute(stmt)
+        return [make_entity(instance) for instance in result.scalars()]
+
+
+async def read_rows(db: Database, page_size: int) -> List[Dataset]:
+    query = GetAllQuery(DatasetSpec())
+    page = Page(size=page_size)
+
+    async with db.session() as session:
+        result = await session.execute(query.paginate(page))
+        rows, _ = query.cursors(result.all(), page)
+        return [query.entity(row) for row in rows]
+
+
+async def _measure(
+    label: str, read: Callable[[], Awaitable[List[Dataset]]], n: int
+) -> List[Dataset]:
+    datasets = await read()  # Warmup
+
+    latencies = []
+
+    with track_queries() as queries:
+        for _ in range(n):
+            start = time.perf_counter()
+            await read()
+            latencies.append(time.perf_counter() - start)
+
+    cuts = statistics.quantiles(latencies, n=100)
+    p50, p95, p99 = (1000 * cuts[k - 1] for k in (50, 95, 99))
+    print(
+        f"{info(label)}: p50={p50:.1f}ms p95={p95:.1f}ms p99={p99:.1f}ms "
+        f"queries/page={queries.count / n:.0f}"
+    )
+
+    return datasets
+
+
+async def main(page_size: int, n: int) -> None:
+    db = resolve(Database)
+
+    orm = await _measure("orm", lambda: read_orm(db, page_size), n)
+    rows = await _measure("rows", lambda: read_rows(db, page_size), n)
+
+    # Both ways must read the same datasets. (Order of formats and tags may vary.)
+    assert [dataset.id for dataset in orm] == [dataset.id for dataset in rows]
+
+    await db.engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("-n", type=int, default=200, help="Number of pages read")
+    args = parser.parse_args()
+
+    bootstrap()
+
+    asyncio.run(main(args.page_size, args.n))
@@ -0,0 +1,181 @@
+"""
+Measure cold start time of the server and of CLI tools, and compare results with a
+baseline to catch regressions, e.g. a slow dependency imported at startup.
+
+Each target runs `-n` times in a fresh Python process, after an unmeasured run that
+fills bytecode and OS caches. The median wall time is reported for each target,
+along with the number of imported modules.
+
+Record a baseline, e.g. before making changes:
+
+    python -m benchmarks.importtime --save-baseline
+
+And compare with it, e.g. after making changes:
+
+    python -m benchmarks.importtime
+
+Use `--top` to list modules that take the longest to import, as reported by
+`python -X importtime`.
+
+Exits with status 1 if a target is slower than the baseline by more than
+`--tolerance`. Baselines depend on the machine, so only compare runs made on the
+same machine.
+"""
+import argparse
+import functools
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import click
+
+info = functools.partial(click.style, fg="blue")
+success = functools.partial(click.style, fg="bright_green")
+warn = functools.partial(click.style, fg="red")
+
+ROOT = Path(__file__).parent.parent
+
+DEFAULT_BASELINE = Path(__file__).parent / "importtime_baseline.json"
+
+_TOOL = "import {}; from server.config.di import bootstrap; bootstrap()"
+
+# Python arguments, up to when each entrypoint starts doing actual work.
+TARGETS: Dict[str, List[str]] = {
+    # Bootstraps and creates the app on import.
+    "server": ["-c", "import server.main"],
+    # Runs env.py, without connecting to the database.
+    "migrations": ["-m", "alembic", "upgrade", "head:head", "--sql"],
+    "changepassword": ["-c", _TOOL.format("tools.changepassword")],
+    "initdata": ["-c", _TOOL.format("tools.initdata")],
+    "addrandomdatasets": ["-c", _TOOL.format("tools.addrandomdatasets")],
+}
+
+
+def _run(args: List[str]) -> Tuple[float, str]:
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, *args], cwd=ROOT, capture_output=True, text=True
+    )
+    duration = time.perf_counter() - start
+
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} failed:\n{result.stderr}")
+
+    return duration, result.stderr
+
+
+def _parse_importtime(stderr: str) -> Dict[str, int]:
+    """
+    Return the self import time of each module, in microseconds.
+    """
+    self_times = {}
+
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or line.endswith("| imported package"):
+            continue
+        self_us, _, name = line[len("import time:") :].split("|")
+        self_times[name.strip()] = int(self_us)
+
+    return self_times
+
+
+def measure(args: List[str], n: int) -> Tuple[Dict[str, float], Dict[str, int]]:
+    _, stderr = _run(["-X", "importtime", *args])
+    self_times = _parse_importtime(stderr)
+
+    durations = [_run(args)[0] * 1000 for _ in range(n)]
+
+    summary = {
+        "median": statistics.median(durations),
+        "min": min(durations),
+        "modules": len(self_times),
+    }
+
+    return summary, self_times
+
+
+def main(targets: List[str], n: int, top: int) -> Dict[str, Dict[str, float]]:
+    summaries = {}
+
+    for name in targets:
+        summary, self_times = measure(TARGETS[name], n)
+        summaries[name] = summary
+
+        print(
+            f"{info(name)}: median={summary['median']:.1f}ms "
+            f"min={summary['min']:.1f}ms modules={summary['modules']:.0f}"
+        )
+
+        slowest = sorted(self_times.items(), key=lambda item: item[1], reverse=True)
+        for module, self_us in slowest[:top]:
+            print(f"  {self_us / 1000:6.1f}ms {module}")
+
+    return summaries
+
+
+def _compare(
+    name: str, summary: Dict[str, float], baseline: Dict[str, float], tolerance: float
+) -> List[str]:
+    regressions = []
+
+    if summary["median"] > baseline["median"] * (1 + tolerance):
+        regressions.append(
+            f"{name}: median {summary['median']:.1f}ms, "
+            f"baseline {baseline['median']:.1f}ms"
+        )
+
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--target",
+        dest="targets",
+        action="append",
+        choices=list(TARGETS),
+        help="Default: all",
+    )
+    parser.add_argument("-n", type=int, default=10, help="Runs per target")
+    parser.add_argument("--top", type=int, default=0, help="Slowest modules to list")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    summaries = main(args.targets or list(TARGETS), args.n, args.top)
+
+    if args.save_baseline:
+        baseline = {
+            "n": args.n,
+            "targets": {
+                name: {key: round(value, 1) for key, value in summary.items()}
+                for name, summary in summaries.items()
+            },
+        }
+        args.baseline.write_text(json.dumps(baseline, indent=2) + "\n")
+        print(f"{success('saved')}: {args.baseline}")
+        sys.exit(0)
+
+    if not args.baseline.exists():
+        sys.exit(0)
+
+    baseline = json.loads(args.baseline.read_text())
+
+    regressions = [
+        regression
+        for name, summary in summaries.items()
+        if name in baseline["targets"]
+        for regression in _compare(
+            name, summary, baseline["targets"][name], args.tolerance
+        )
+    ]
+
+    for regression in regressions:
+        print(f"{warn('regression')}: {regression}")
+
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,421 @@
+"""
+Load test the API, and compare results with a baseline to catch regressions.
+
+Each scenario sends `-n` requests of one kind, e.g. dataset searches, from a number
+of concurrent clients. Throughput and latency percentiles are reported for each
+scenario, and compared with those of a baseline file if any.
+
+Requests are served by the app in-process (`server.main:app`), or by a running
+API server when `--url` is given. Either way, they run against the database
+configured by `APP_DATABASE_URL`, which gets modified: use a dedicated database.
+
+Seed it first with datasets of realistic French text, tags and formats, and a
+user to make requests as:
+
+    python -m benchmarks.load --seed 10000 -n 0
+
+Then record a baseline, e.g. before making changes:
+
+    python -m benchmarks.load --save-baseline
+
+And compare with it, e.g. after making changes:
+
+    python -m benchmarks.load
+
+Exits with status 1 if any request fails, in which case no baseline is saved, or
+if a scenario is slower than the baseline by more than `--tolerance`, in
+throughput or in p95 latency. Baselines depend on the machine
+and on the size of the catalog, so only compare runs made in the same setting.
+"""
+import argparse
+import asyncio
+import functools
+import json
+import random
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import click
+import faker
+import httpx
+from pydantic import EmailStr, SecretStr
+from tqdm import tqdm
+
+from server.application.auth.commands import CreateUser
+from server.application.datasets.commands import BulkCreateDatasets, CreateDataset
+from server.application.tags.commands import CreateTag
+from server.application.tags.queries import GetAllTags
+from server.config.di import resolve
+from server.domain.auth.exceptions import EmailAlreadyExists
+from server.domain.common.types import ID
+from server.domain.datasets.entities import DataFormat
+from server.main import app
+from server.seedwork.application.messages import MessageBus
+from tests.factories import CreateDatasetFactory, fake
+from tests.helpers import to_payload
+
+info = functools.partial(click.style, fg="blue")
+success = functools.partial(click.style, fg="bright_green")
+warn = functools.partial(click.style, fg="red")
+
+DEFAULT_BASELINE = Path(__file__).parent / "load_baseline.json"
+
+EMAIL = "loadtest@catalogue.data.gouv.fr"
+PASSWORD = "loadtest"
+
+NUM_TAGS = 20
+BATCH_SIZE = 500
+
+# Datasets read or updated by scenarios are picked among this many recent ones.
+NUM_SAMPLE_DATASETS = 1000
+
+
+@dataclass
+class Context:
+    auth: dict
+    dataset_ids: List[ID]
+    tag_ids: List[ID]
+    search_terms: List[str]
+
+
+@dataclass
+class Result:
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+    elapsed: float = 0
+
+    def summary(self) -> Dict[str, float]:
+        if len(self.latencies) >= 2:
+            cuts = statistics.quantiles(self.latencies, n=100)
+            p50, p95, p99 = (1000 * cuts[k - 1] for k in (50, 95, 99))
+        else:
+            # `quantiles()` requires at least 2 samples, e.g. not with `-n 1`.
+            p50 = p95 = p99 = 1000 * max(self.latencies, default=0)
+
+        return {
+            "throughput": len(self.latencies) / self.elapsed,
+            "p50": p50,
+            "p95": p95,
+            "p99": p99,
+            "errors": self.errors,
+        }
+
+
+Scenario = Callable[[httpx.AsyncClient, Context], Awaitable[httpx.Response]]
+
+
+# Catalogs have few distinct values of filterable fields, unlike random text.
+# These are the same across runs.
+_values_fake = faker.Faker(["fr_FR"])
+_values_fake.seed_instance(0)
+SERVICES = [_values_fake.company() for _ in range(50)]
+GEOGRAPHICAL_COVERAGES = [
+    "France",
+    "France métropolitaine",
+    "Outre-mer",
+    *(_values_fake.region() for _ in range(10)),
+]
+TECHNICAL_SOURCES = [_values_fake.sentence(nb_words=3) for _ in range(20)]
+
+
+def _build_dataset(tag_ids: List[ID]) -> CreateDataset:
+    return CreateDatasetFactory.build(
+        service=random.choice(SERVICES),
+        geographical_coverage=random.choice(GEOGRAPHICAL_COVERAGES),
+        technical_source=random.choice([None, *TECHNICAL_SOURCES]),
+        formats=random.sample(list(DataFormat), k=random.randint(1, 3)),
+        tag_ids=random.sample(tag_ids, k=random.randint(1, min(3, len(tag_ids)))),
+    )
+
+
+def _dataset_payload(ctx: Context) -> dict:
+    return to_payload(_build_dataset(ctx.tag_ids))
+
+
+async def _list(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    return await client.get("/datasets/", headers=ctx.auth)
+
+
+async def _search(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    q = random.choice(ctx.search_terms)
+    return await client.get("/datasets/", params={"q": q}, headers=ctx.auth)
+
+
+async def _filters(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    return await client.get("/datasets/filters/", headers=ctx.auth)
+
+
+async def _get_by_id(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    id = random.choice(ctx.dataset_ids)
+    return await client.get(f"/datasets/{id}/", headers=ctx.auth)
+
+
+async def _create(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    payload = _dataset_payload(ctx)
+    return await client.post("/datasets/", json=payload, headers=ctx.auth)
+
+
+async def _update(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    id = random.choice(ctx.dataset_ids)
+    payload = _dataset_payload(ctx)
+    return await client.put(f"/datasets/{id}/", json=payload, headers=ctx.auth)
+
+
+async def _login(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    payload = {"email": EMAIL, "password": PASSWORD}
+    return await client.post("/auth/login/", json=payload)
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "list": _list,
+    "search": _search,
+    "filters": _filters,
+    "get_by_id": _get_by_id,
+    "create": _create,
+    "update": _update,
+    "login": _login,
+}
+
+
+async def seed(n: int) -> None:
+    bus = resolve(MessageBus)
+
+    try:
+        await bus.execute(
+            CreateUser(email=EmailStr(EMAIL), password=SecretStr(PASSWORD))
+        )
+    except EmailAlreadyExists:
+        pass
+
+    tag_ids = [tag.id for tag in await bus.execute(GetAllTags())]
+
+    for _ in range(NUM_TAGS - len(tag_ids)):
+        tag_ids.append(await bus.execute(CreateTag(name=fake.word())))
+
+    with tqdm(total=n, unit="dataset") as progress:
+        for start in range(0, n, BATCH_SIZE):
+            items = [_build_dataset(tag_ids) for _ in range(min(BATCH_SIZE, n - start))]
+            await bus.execute(BulkCreateDatasets(items=items))
+            progress.update(len(items))
+
+    print(f"{success('seeded')}: {n} datasets")
+
+
+async def _make_context(client: httpx.AsyncClient) -> Context:
+    response = await client.post(
+        "/auth/login/", json={"email": EMAIL, "password": PASSWORD}
+    )
+    response.raise_for_status()
+    auth = {"Authorization": f"Bearer {response.json()['api_token']}"}
+
+    datasets: List[dict] = []
+    params: dict = {"page_size": 100, "count_mode": "estimated"}
+
+    while len(datasets) < NUM_SAMPLE_DATASETS:
+        response = await client.get("/datasets/", params=params, headers=auth)
+        response.raise_for_status()
+        data = response.json()
+        datasets.extend(data["items"])
+        if (cursor := data["next_cursor"]) is None:
+            break
+        params["cursor"] = cursor
+
+    assert datasets, "No datasets found. Hint: use --seed"
+
+    response = await client.get("/tags/", headers=auth)
+    response.raise_for_status()
+    tag_ids = [tag["id"] for tag in response.json()]
+
+    # Words of the kind found in dataset texts, some of which match none.
+    search_terms = [
+        *(random.choice(dataset["title"].split()) for dataset in datasets[:50]),
+        *(fake.word() for _ in range(50)),
+    ]
+
+    return Context(
+        auth=auth,
+        dataset_ids=[dataset["id"] for dataset in datasets],
+        tag_ids=tag_ids,
+        search_terms=search_terms,
+    )
+
+
+async def _run(
+    scenario: Scenario,
+    client: httpx.AsyncClient,
+    ctx: Context,
+    n: int,
+    concurrency: int,
+) -> Result:
+    result = Result()
+    remaining = iter(range(n))
+
+    async def worker() -> None:
+        # Workers share `remaining`, so that exactly `n` requests are made.
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await scenario(client, ctx)
+            result.latencies.append(time.perf_counter() - start)
+            if response.is_error:
+                result.errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.elapsed = time.perf_counter() - start
+
+    return result
+
+
+def _compare(
+    name: str, summary: Dict[str, float], baseline: Dict[str, float], tolerance: float
+) -> List[str]:
+    regressions = []
+
+    if summary["throughput"] < baseline["throughput"] * (1 - tolerance):
+        regressions.append(
+            f"{name}: throughput {summary['throughput']:.1f} req/s, "
+            f"baseline {baseline['throughput']:.1f} req/s"
+        )
+
+    if summary["p95"] > baseline["p95"] * (1 + tolerance):
+        regressions.append(
+            f"{name}: p95 {summary['p95']:.1f}ms, baseline {baseline['p95']:.1f}ms"
+        )
+
+    return regressions
+
+
+async def main(
+    url: Optional[str],
+    num_seed: int,
+    scenarios: List[str],
+    n: int,
+    concurrency: int,
+    warmup: int,
+) -> Dict[str, Dict[str, float]]:
+    if num_seed:
+        await seed(num_seed)
+
+    if not n:
+        return {}
+
+    if url is None:
+        client = httpx.AsyncClient(app=app, base_url="http://testserver", timeout=60)
+    else:
+        limits = httpx.Limits(max_connections=concurrency)
+        client = httpx.AsyncClient(base_url=url, limits=limits, timeout=60)
+
+    summaries = {}
+
+    async with client:
+        ctx = await _make_context(client)
+
+        for name in scenarios:
+            scenario = SCENARIOS[name]
+
+            # E.g. fill caches, prepare statements.
+            for _ in range(warmup):
+                await scenario(client, ctx)
+
+            result = await _run(scenario, client, ctx, n, concurrency)
+            summary = summaries[name] = result.summary()
+
+            print(
+                f"{info(name)}: {summary['throughput']:.1f} req/s "
+                f"p50={summary['p50']:.1f}ms p95={summary['p95']:.1f}ms "
+                f"p99={summary['p99']:.1f}ms"
+                + (warn(f" errors={result.errors}") if result.errors else "")
+            )
+
+    return summaries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=None, help="Default: serve in-process")
+    parser.add_argument("--seed", type=int, default=0, help="Datasets to add first")
+    parser.add_argument("--random-seed", type=int, default=None)
+    parser.add_argument(
+        "--scenario",
+        dest="scenarios",
+        action="append",
+        choices=list(SCENARIOS),
+        help="Default: all",
+    )
+    parser.add_argument("-n", type=int, default=500, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=5, help="Unmeasured requests")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    if args.random_seed is not None:
+        random.seed(args.random_seed)
+        fake.seed_instance(args.random_seed)
+
+    summaries = asyncio.run(
+        main(
+            args.url,
+            args.seed,
+            args.scenarios or list(SCENARIOS),
+            args.n,
+            args.concurrency,
+            args.warmup,
+        )
+    )
+
+    if not summaries:
+        sys.exit(0)
+
+    # Failed requests skew results, e.g. errors are often faster than successes.
+    failures = [
+        f"{name}: {summary['errors']:.0f} failed requests"
+        for name, summary in summaries.items()
+        if summary["errors"]
+    ]
+
+    for failure in failures:
+        print(f"{warn('failure')}: {failure}")
+
+    if failures:
+        sys.exit(1)
+
+    if args.save_baseline:
+        baseline = {
+            "n": args.n,
+            "concurrency": args.concurrency,
+            "scenarios": {
+                name: {key: round(value, 1) for key, value in summary.items()}
+                for name, summary in summaries.items()
+            },
+        }
+        args.baseline.write_text(json.dumps(baseline, indent=2) + "\n")
+        print(f"{success('saved')}: {args.baseline}")
+        sys.exit(0)
+
+    if not args.baseline.exists():
+        sys.exit(0)
+
+    baseline = json.loads(args.baseline.read_text())
+
+    if (baseline["n"], baseline["concurrency"]) != (args.n, args.concurrency):
+        print(warn("Baseline was recorded with different -n or --concurrency"))
+
+    regressions = [
+        regression
+        for name, summary in summaries.items()
+        if name in baseline["scenarios"]
+        for regression in _compare(
+            name, summary, baseline["scenarios"][name], args.tolerance
+        )
+    ]
+
+    for regression in regressions:
+        print(f"{warn('regression')}: {regression}")
+
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,91 @@
+"""
+Measure latency of dataset listings while logins are in flight.
+
+Password hashing is CPU-intensive. If it ran on the event loop, concurrent logins
+would stall every other request served by the same worker. This benchmark keeps
+a number of logins in flight against a running API server, and reports latency
+percentiles of `GET /datasets/` meanwhile.
+
+Usage:
+
+    make serve-server
+    python -m benchmarks.login_concurrency --email admin@catalogue.data.gouv.fr
+"""
+import argparse
+import asyncio
+import functools
+import statistics
+import time
+from typing import List
+
+import click
+import httpx
+
+info = functools.partial(click.style, fg="blue")
+
+
+async def _login_forever(client: httpx.AsyncClient, email: str, password: str) -> None:
+    payload = {"email": email, "password": password}
+    while True:
+        response = await client.post("/auth/login/", json=payload)
+        response.raise_for_status()
+
+
+async def _time_listings(client: httpx.AsyncClient, auth: dict, n: int) -> List[float]:
+    latencies = []
+
+    for _ in range(n):
+        start = time.perf_counter()
+        response = await client.get("/datasets/", headers=auth)
+        latencies.append(time.perf_counter() - start)
+        response.raise_for_status()
+
+    return latencies
+
+
+def _report(label: str, latencies: List[float]) -> None:
+    cuts = statistics.quantiles(latencies, n=100)
+    p50, p95, p99 = (1000 * cuts[k - 1] for k in (50, 95, 99))
+    print(f"{info(label)}: p50={p50:.1f}ms p95={p95:.1f}ms p99={p99:.1f}ms")
+
+
+async def main(url: str, email: str, password: str, logins: int, n: int) -> None:
+    limits = httpx.Limits(max_connections=logins + 1)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        response = await client.post(
+            "/auth/login/", json={"email": email, "password": password}
+        )
+        response.raise_for_status()
+        auth = {"Authorization": f"Bearer {response.json()['api_token']}"}
+
+        _report("idle", await _time_listings(client, auth, n))
+
+        tasks = [
+            asyncio.create_task(_login_forever(client, email, password))
+            for _ in range(logins)
+        ]
+
+        try:
+            _report(
+                f"{logins} concurrent logins",
+                await _time_listings(client, auth, n),
+            )
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:3579")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", default=None)
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("-n", type=int, default=200, help="Number of listings")
+    args = parser.parse_args()
+
+    password = args.password or click.prompt("Password", hide_input=True)
+
+    asyncio.run(main(args.url, args.email, password, args.logins, args.n))
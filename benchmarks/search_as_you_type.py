@@ -0,0 +1,144 @@
+"""
+Measure latency of requests made by a search box as the user types.
+
+For each search term, requests are made for each of its prefixes, e.g. 'fo',
+'for', 'forê', ..., like a client does as keys are pressed. Latency percentiles
+are reported for each kind of request, against a budget of 20 ms.
+
+Runs against a running API server. Budgets are set for a catalog of 100k datasets,
+so fill its database first, e.g.:
+
+    python -m tools.addrandomdatasets 100000
+
+Usage:
+
+    make serve-server
+    python -m benchmarks.search_as_you_type --email admin@catalogue.data.gouv.fr
+
+Exits with status 1 if the p95 latency of an endpoint exceeds the budget.
+"""
+import argparse
+import asyncio
+import functools
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List
+
+import click
+import httpx
+
+info = functools.partial(click.style, fg="blue")
+warn = functools.partial(click.style, fg="red")
+
+BUDGET_MS = 20
+
+TERMS = [
+    "forêts",
+    "inventaire national",
+    "cadastre",
+    "qualité de l'air",
+    "données ouvertes",
+    "transport",
+    "energie",
+    "population",
+]
+
+ENDPOINTS: Dict[str, Callable[[str], dict]] = {
+    "autocomplete": lambda q: {"url": "/datasets/autocomplete/", "params": {"q": q}},
+    "prefix": lambda q: {
+        "url": "/datasets/",
+        "params": {"q": q, "search_mode": "prefix", "count_mode": "estimated"},
+    },
+    "plain": lambda q: {
+        "url": "/datasets/",
+        "params": {"q": q, "count_mode": "estimated"},
+    },
+}
+
+
+def _prefixes(term: str, min_length: int = 2) -> List[str]:
+    return [term[:k] for k in range(min_length, len(term) + 1)]
+
+
+async def _time_requests(
+    client: httpx.AsyncClient, auth: dict, endpoint: str, rounds: int
+) -> List[float]:
+    make_request = ENDPOINTS[endpoint]
+    latencies = []
+
+    for _ in range(rounds):
+        for term in TERMS:
+            for q in _prefixes(term):
+                request = make_request(q)
+                start = time.perf_counter()
+                response = await client.get(
+                    request["url"], params=request["params"], headers=auth
+                )
+                latencies.append(time.perf_counter() - start)
+                response.raise_for_status()
+
+    return latencies
+
+
+def _report(label: str, latencies: List[float]) -> bool:
+    cuts = statistics.quantiles(latencies, n=100)
+    p50, p95, p99 = (1000 * cuts[k - 1] for k in (50, 95, 99))
+    ok = p95 <= BUDGET_MS
+    style = info if ok else warn
+    print(f"{style(label)}: p50={p50:.1f}ms p95={p95:.1f}ms p99={p99:.1f}ms")
+    return ok
+
+
+async def main(
+    url: str, email: str, password: str, endpoints: List[str], rounds: int
+) -> bool:
+    async with httpx.AsyncClient(base_url=url, timeout=60) as client:
+        response = await client.post(
+            "/auth/login/", json={"email": email, "password": password}
+        )
+        response.raise_for_status()
+        auth = {"Authorization": f"Bearer {response.json()['api_token']}"}
+
+        response = await client.get("/datasets/", params={"page_size": 1}, headers=auth)
+        response.raise_for_status()
+        print(f"{info('datasets')}: {response.json()['total_items']}")
+
+        ok = True
+
+        for endpoint in endpoints:
+            await _time_requests(client, auth, endpoint, rounds=1)  # Warmup
+            latencies = await _time_requests(client, auth, endpoint, rounds)
+            ok = _report(endpoint, latencies) and ok
+
+        return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:3579")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", default=None)
+    parser.add_argument(
+        "--endpoint",
+        dest="endpoints",
+        action="append",
+        choices=list(ENDPOINTS),
+        help="Endpoints to measure (default: all)",
+    )
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    password = args.password or click.prompt("Password", hide_input=True)
+
+    ok = asyncio.run(
+        main(
+            args.url,
+            args.email,
+            password,
+            args.endpoints or list(ENDPOINTS),
+            args.rounds,
+        )
+    )
+
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,2 @@
+-- Run by the postgres image on first start, as a superuser. See: docs/fr/ops.md
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
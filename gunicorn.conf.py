@@ -0,0 +1,48 @@
+"""
+Gunicorn configuration, to serve the API with several worker processes in live mode.
+
+Usage: gunicorn server.main:app
+
+See: https://docs.gunicorn.org/en/stable/settings.html
+"""
+from typing import Any
+
+from server.config.settings import Settings
+from server.infrastructure.logging.config import get_log_config
+from server.infrastructure.metrics import multiprocess
+
+settings = Settings()
+
+bind = f"{settings.host}:{settings.port}"
+backlog = settings.server_backlog
+keepalive = settings.server_timeout_keep_alive
+
+worker_class = "server.infrastructure.server.UvicornWorker"
+workers = settings.workers
+# Workers whose event loop is blocked for this long are killed and replaced.
+timeout = settings.worker_timeout
+graceful_timeout = settings.worker_graceful_timeout
+
+logconfig_dict = get_log_config(settings)
+# Gunicorn merges this with its own defaults, which configure the root logger
+# under the "root" key.
+logconfig_dict["root"] = logconfig_dict["loggers"].pop("")
+# Uvicorn logs through the loggers of Gunicorn in worker processes.
+for name in ("gunicorn.error", "gunicorn.access"):
+    logconfig_dict["loggers"][name] = {
+        "handlers": ["default"],
+        "level": "INFO",
+        "propagate": False,
+    }
+
+if workers > 1:
+    # Before anything imports `prometheus_client`, see `multiprocess`.
+    multiprocess.enable_multiprocess_mode()
+
+
+def child_exit(server: Any, worker: Any) -> None:
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def on_exit(server: Any) -> None:
+    multiprocess.disable_multiprocess_mode()
@@ -1,11 +1,14 @@
-from debug_toolbar.middleware import DebugToolbarMiddleware
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from server.config import Settings
 from server.config.di import resolve
+from server.domain.datasets.search import SearchIndex
 
-from .auth.middleware import AuthMiddleware
+from .auth.middleware import AuthMiddleware, ReadYourWritesMiddleware
+from .metrics.middleware import MetricsMiddleware, QueryBudgetMiddleware
 from .resources import auth_backend
 from .routes import router
 
@@ -36,13 +39,37 @@ def create_app(settings: Settings = None) -> App:
     )
 
     app.add_middleware(AuthMiddleware, backend=auth_backend)
+    # Wraps authentication, so that users are read from the primary too right after
+    # a change, e.g. once their password or API token changed.
+    app.add_middleware(ReadYourWritesMiddleware)
+
+    app.add_middleware(
+        QueryBudgetMiddleware,
+        budget=settings.db_query_budget,
+        route_budgets=settings.db_query_budgets,
+    )
 
     if settings.debug:
+        # Debug-only dependency, which is slow to import.
+        from debug_toolbar.middleware import DebugToolbarMiddleware
+
         app.add_middleware(
             DebugToolbarMiddleware,
             panels=["server.api.debugging.debug_toolbar.panels.SQLAlchemyPanel"],
         )
 
+    # Outermost, so that time spent in other middleware is accounted for.
+    app.add_middleware(MetricsMiddleware)
+
     app.include_router(router)
 
+    async def load_search_index() -> None:
+        # Loading may take a while: serve requests meanwhile, rather than delay
+        # startup. Searches wait for it to complete.
+        app.state.search_index_loading = asyncio.create_task(
+            resolve(SearchIndex).load()
+        )
+
+    app.add_event_handler("startup", load_search_index)
+
     return app
@@ -1,9 +1,68 @@
+import math
+
+from starlette.datastructures import MutableHeaders
 from starlette.middleware.authentication import AuthenticationMiddleware
 from starlette.requests import HTTPConnection
 from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from server.config.di import resolve
+from server.infrastructure.database import Database
 
 
 class AuthMiddleware(AuthenticationMiddleware):
     @staticmethod
     def default_on_error(conn: HTTPConnection, exc: Exception) -> Response:
         return JSONResponse({"detail": "Invalid credentials"}, status_code=401)
+
+
+class ReadYourWritesMiddleware:
+    """
+    Let clients see their own changes: queries they make right after a change
+    don't read from a lagging replica.
+
+    The time of a client's last change is carried by a short-lived cookie, so
+    that all server processes know about it.
+
+    NOTE: changes committed once a response has started, e.g. while streaming
+    bulk creation results, don't set the cookie.
+    """
+
+    cookie_name = "last_write_at"
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        db = resolve(Database)
+
+        if scope["type"] != "http" or not db.replica_engines:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            last_write_at = float(HTTPConnection(scope).cookies[self.cookie_name])
+        except (KeyError, ValueError):
+            last_write_at = None
+
+        with db.client(last_write_at) as client:
+
+            async def send_with_cookie(message: Message) -> None:
+                if (
+                    message["type"] == "http.response.start"
+                    and client.last_write_at != last_write_at
+                ):
+                    response = Response()
+                    response.set_cookie(
+                        self.cookie_name,
+                        str(client.last_write_at),
+                        max_age=math.ceil(db.read_your_writes_window),
+                        httponly=True,
+                        samesite="strict",
+                    )
+                    headers = MutableHeaders(scope=message)
+                    headers.append("set-cookie", response.headers["set-cookie"])
+
+                await send(message)
+
+            await self.app(scope, receive, send_with_cookie)
@@ -199,8 +199,15 @@ def _patch_openapi_security_params(*permissions: BasePermission) -> Callable:
 class HasAPIKey(BasePermission):
     """
     Allow requests with a valid API key attached: 'X-Api-Key: <api_key>'
+
+    The expected key is read from the given setting, e.g. the sandbox config
+    API key by default.
     """
 
+    def __init__(self, setting: str = "config_repo_api_key") -> None:
+        super().__init__()
+        self._setting = setting
+
     def has_permission(self, request: APIRequest) -> bool:
         settings = resolve(Settings)
 
@@ -211,18 +218,20 @@ class HasAPIKey(BasePermission):
             return False
 
         # A more advanced implementation would reach to the database here.
-        # But all we need for now is to check for the sandbox config API key.
+        # But all we need for now is to check for keys set in the environment.
+
+        expected_api_key = getattr(settings, self._setting)
 
-        if not settings.config_repo_api_key:
+        if not expected_api_key:
             # Not set in the current environment. Would be problematic in the
             # "sandbox" environment.
             logger.warning(
-                "[HasAPIKey]: received request with an API key, "
-                "but APP_CONFIG_REPO_API_KEY is empty"
+                "[HasAPIKey]: received request with an API key, " "but APP_%s is empty",
+                self._setting.upper(),
             )
             return False
 
-        if api_key != settings.config_repo_api_key:
+        if api_key != expected_api_key:
             logger.info("[HasAPIKey]: invalid API key")
             return False
 
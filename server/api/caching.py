@@ -0,0 +1,69 @@
+"""
+Support for HTTP conditional requests, so that clients can revalidate their
+copy of a resource without downloading it again.
+
+See: https://developer.mozilla.org/en-US/docs/Web/HTTP/Conditional_requests
+"""
+import datetime as dt
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict
+
+from starlette.requests import Request
+
+from server.application.changes.views import ChangeVersionView
+
+
+def _opaque_tag(etag: str) -> str:
+    # Weak comparison: 'W/"1"' matches '"1"'.
+    etag = etag.strip()
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def make_etag(version: ChangeVersionView) -> str:
+    # Include the change date, so that tags don't collide if versions restart,
+    # e.g. after a database restore.
+    changed_at_ms = int(version.changed_at.timestamp() * 1000)
+    return f'W/"{version.value}-{changed_at_ms}"'
+
+
+def make_cache_headers(version: ChangeVersionView) -> Dict[str, str]:
+    return {
+        "ETag": make_etag(version),
+        "Last-Modified": format_datetime(
+            version.changed_at.astimezone(dt.timezone.utc), usegmt=True
+        ),
+        # Responses depend on authentication: let clients store them, but not
+        # shared caches, and have clients revalidate them before reuse.
+        "Cache-Control": "private, no-cache",
+    }
+
+
+def is_not_modified(request: Request, version: ChangeVersionView) -> bool:
+    """
+    Return whether the client's copy of a resource at `version` is up to date,
+    according to the request's `If-None-Match` or `If-Modified-Since` header.
+    """
+    if_none_match = request.headers.get("if-none-match")
+
+    if if_none_match is not None:
+        # Takes precedence over If-Modified-Since.
+        if if_none_match.strip() == "*":
+            return True
+        etag = _opaque_tag(make_etag(version))
+        return any(_opaque_tag(tag) == etag for tag in if_none_match.split(","))
+
+    if_modified_since = request.headers.get("if-modified-since")
+
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=dt.timezone.utc)
+
+        # HTTP dates have a resolution of one second.
+        return version.changed_at.replace(microsecond=0) <= since
+
+    return False
@@ -0,0 +1,24 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, Query
+
+from server.api.auth.permissions import IsAuthenticated
+from server.application.datasets.queries import GetDatasetSuggestions
+from server.application.datasets.views import DatasetSuggestionView
+from server.config.di import resolve
+from server.seedwork.application.messages import MessageBus
+
+router = APIRouter(prefix="/autocomplete")
+
+
+@router.get(
+    "/",
+    dependencies=[Depends(IsAuthenticated())],
+    response_model=List[DatasetSuggestionView],
+)
+async def autocomplete_datasets(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(10, ge=1, le=20),
+) -> List[DatasetSuggestionView]:
+    bus = resolve(MessageBus)
+    return await bus.execute(GetDatasetSuggestions(q=q, limit=limit))
@@ -0,0 +1,120 @@
+import json
+from typing import AsyncIterator, List, Tuple, Union
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.encoders import jsonable_encoder
+from pydantic import ValidationError
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from server.api.auth.permissions import IsAuthenticated
+from server.application.datasets.commands import BulkCreateDatasets, CreateDataset
+from server.config.di import resolve
+from server.seedwork.application.messages import MessageBus
+
+from ..schemas import DatasetCreate
+
+router = APIRouter(prefix="/bulk")
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """
+    A streaming response that may be sent while the request body is still being
+    read.
+
+    StreamingResponse listens for client disconnects while sending, by consuming
+    messages from `receive()`. This would swallow chunks of the request body.
+    """
+
+    media_type = NDJSON_MEDIA_TYPE
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+
+        if self.background is not None:
+            await self.background()  # pragma: no cover
+
+
+async def _read_lines(request: Request) -> AsyncIterator[Tuple[int, bytes]]:
+    buffer = b""
+    lineno = 0
+
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            lineno += 1
+            yield lineno, line
+
+    if buffer:
+        yield lineno + 1, buffer
+
+
+async def _read_batches(
+    request: Request, size: int
+) -> AsyncIterator[List[Tuple[int, Union[CreateDataset, ValidationError]]]]:
+    batch: List[Tuple[int, Union[CreateDataset, ValidationError]]] = []
+
+    async for lineno, line in _read_lines(request):
+        if not line.strip():
+            continue
+
+        try:
+            data = DatasetCreate.parse_raw(line)
+            batch.append((lineno, CreateDataset(**data.dict())))
+        except ValidationError as exc:
+            batch.append((lineno, exc))
+
+        if len(batch) >= size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+
+async def _create(request: Request, batch_size: int) -> AsyncIterator[str]:
+    bus = resolve(MessageBus)
+
+    async for batch in _read_batches(request, batch_size):
+        commands = [item for _, item in batch if isinstance(item, CreateDataset)]
+        results = await bus.execute(BulkCreateDatasets(items=commands))
+        created = iter(results)
+
+        for lineno, item in batch:
+            if isinstance(item, ValidationError):
+                data = {"line": lineno, "errors": item.errors()}
+            else:
+                data = {"line": lineno, **next(created).dict(exclude_none=True)}
+
+            yield json.dumps(jsonable_encoder(data)) + "\n"
+
+
+@router.post(
+    "/",
+    dependencies=[Depends(IsAuthenticated())],
+    response_class=_DuplexStreamingResponse,
+    responses={
+        200: {
+            "content": {NDJSON_MEDIA_TYPE: {}},
+            "description": (
+                "One line per input line: "
+                '`{"line": ..., "id": ...}` or `{"line": ..., "errors": [...]}`'
+            ),
+        }
+    },
+)
+async def bulk_create_datasets(
+    request: Request,
+    batch_size: int = Query(500, ge=1, le=1000),
+) -> StreamingResponse:
+    """
+    Create datasets from an NDJSON request body: one JSON `DatasetCreate` per line.
+
+    Lines are validated and inserted in batches of `batch_size`, each in its own
+    transaction. Results are streamed back as NDJSON as soon as their batch is
+    done, so invalid lines don't prevent valid ones from being created.
+    """
+    return _DuplexStreamingResponse(_create(request, batch_size))
@@ -0,0 +1,147 @@
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Callable, Dict
+
+from fastapi.encoders import jsonable_encoder
+
+from server.application.datasets.views import DatasetView
+
+
+class Renderer:
+    media_type: str
+    extension: str
+
+    def render(self, datasets: AsyncIterator[DatasetView]) -> AsyncIterator[str]:
+        raise NotImplementedError  # pragma: no cover
+
+
+class NDJSONRenderer(Renderer):
+    media_type = "application/x-ndjson"
+    extension = "ndjson"
+
+    async def render(self, datasets: AsyncIterator[DatasetView]) -> AsyncIterator[str]:
+        async for dataset in datasets:
+            yield dataset.json(exclude={"headlines"}) + "\n"
+
+
+class CSVRenderer(Renderer):
+    media_type = "text/csv"
+    extension = "csv"
+
+    # Separator of multiple values within a cell.
+    LIST_SEPARATOR = ";"
+
+    COLUMNS: Dict[str, Callable[[DatasetView], Any]] = {
+        "id": lambda d: d.id,
+        "organization_siret": lambda d: d.catalog_record.organization_siret,
+        "created_at": lambda d: d.catalog_record.created_at.isoformat(),
+        "title": lambda d: d.title,
+        "description": lambda d: d.description,
+        "service": lambda d: d.service,
+        "geographical_coverage": lambda d: d.geographical_coverage,
+        "formats": lambda d: [fmt.value for fmt in d.formats],
+        "technical_source": lambda d: d.technical_source,
+        "producer_email": lambda d: d.producer_email,
+        "contact_emails": lambda d: d.contact_emails,
+        "update_frequency": lambda d: d.update_frequency and d.update_frequency.value,
+        "last_updated_at": lambda d: d.last_updated_at
+        and d.last_updated_at.isoformat(),
+        "url": lambda d: d.url,
+        "license": lambda d: d.license,
+        "tags": lambda d: [tag.name for tag in d.tags],
+    }
+
+    def _cell(self, value: Any) -> Any:
+        if isinstance(value, list):
+            return self.LIST_SEPARATOR.join(value)
+        return value
+
+    async def render(self, datasets: AsyncIterator[DatasetView]) -> AsyncIterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        def flush() -> str:
+            value = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return value
+
+        writer.writerow(self.COLUMNS)
+        yield flush()
+
+        async for dataset in datasets:
+            writer.writerow(
+                [self._cell(getter(dataset)) for getter in self.COLUMNS.values()]
+            )
+            yield flush()
+
+
+class DCATRenderer(Renderer):
+    """
+    Render datasets as a DCAT catalog, in JSON-LD.
+
+    See: https://www.w3.org/TR/vocab-dcat-2/
+    """
+
+    media_type = "application/ld+json"
+    extension = "jsonld"
+
+    CONTEXT = {
+        "dcat": "http://www.w3.org/ns/dcat#",
+        "dct": "http://purl.org/dc/terms/",
+        "foaf": "http://xmlns.com/foaf/0.1/",
+        "vcard": "http://www.w3.org/2006/vcard/ns#",
+    }
+
+    def _node(self, dataset: DatasetView) -> dict:
+        node: Dict[str, Any] = {
+            "@id": f"urn:uuid:{dataset.id}",
+            "@type": "dcat:Dataset",
+            "dct:identifier": dataset.id,
+            "dct:title": dataset.title,
+            "dct:description": dataset.description,
+            "dct:issued": dataset.catalog_record.created_at,
+            "dct:modified": dataset.last_updated_at,
+            "dct:publisher": {"@type": "foaf:Agent", "foaf:name": dataset.service},
+            "dct:spatial": dataset.geographical_coverage,
+            "dct:accrualPeriodicity": dataset.update_frequency,
+            "dct:license": dataset.license,
+            "dcat:landingPage": dataset.url,
+            "dcat:keyword": [tag.name for tag in dataset.tags],
+            "dcat:contactPoint": [
+                {"@type": "vcard:Kind", "vcard:hasEmail": f"mailto:{email}"}
+                for email in dataset.contact_emails
+            ],
+            "dcat:distribution": [
+                {"@type": "dcat:Distribution", "dct:format": fmt}
+                for fmt in dataset.formats
+            ],
+        }
+
+        return jsonable_encoder(
+            {key: value for key, value in node.items() if value is not None}
+        )
+
+    async def render(self, datasets: AsyncIterator[DatasetView]) -> AsyncIterator[str]:
+        # Write the enclosing catalog by hand, so that datasets can be streamed.
+        yield (
+            f'{{"@context": {json.dumps(self.CONTEXT)}, '
+            '"@type": "dcat:Catalog", '
+            '"dcat:dataset": ['
+        )
+
+        separator = ""
+
+        async for dataset in datasets:
+            yield separator + json.dumps(self._node(dataset))
+            separator = ", "
+
+        yield "]}"
+
+
+RENDERERS: Dict[str, Renderer] = {
+    "ndjson": NDJSONRenderer(),
+    "csv": CSVRenderer(),
+    "jsonld": DCATRenderer(),
+}
@@ -0,0 +1,57 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+from starlette.responses import StreamingResponse
+
+from server.api.auth.permissions import IsAuthenticated
+from server.application.datasets.queries import ExportDatasets
+from server.config.di import resolve
+from server.seedwork.application.messages import MessageBus
+
+from .renderers import RENDERERS
+
+router = APIRouter(prefix="/export")
+
+ExportFormat = Literal["ndjson", "csv", "jsonld"]
+
+
+@router.get(
+    "/",
+    dependencies=[Depends(IsAuthenticated())],
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {renderer.media_type: {} for renderer in RENDERERS.values()},
+            "description": "All datasets in the catalog.",
+        }
+    },
+)
+async def export_datasets(
+    format_: ExportFormat = Query("ndjson", alias="format"),
+) -> StreamingResponse:
+    """
+    Export the whole catalog, e.g. for synchronizing third-party systems.
+
+    Datasets are read from the database and sent as a stream, so this uses a
+    constant amount of memory regardless of catalog size.
+
+    Formats:
+
+    * `ndjson`: one JSON dataset per line.
+    * `csv`: one dataset per row. Multiple values in a cell are separated by `;`.
+    * `jsonld`: a [DCAT](https://www.w3.org/TR/vocab-dcat-2/) catalog in JSON-LD.
+    """
+    bus = resolve(MessageBus)
+    renderer = RENDERERS[format_]
+
+    datasets = await bus.execute(ExportDatasets())
+
+    return StreamingResponse(
+        renderer.render(datasets),
+        media_type=renderer.media_type,
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="datasets.{renderer.extension}"'
+            )
+        },
+    )
@@ -1,6 +1,12 @@
+from typing import Union
+
 from fastapi import APIRouter, Depends
+from starlette.requests import Request
+from starlette.responses import Response
 
 from server.api.auth.permissions import IsAuthenticated
+from server.api.caching import is_not_modified, make_cache_headers
+from server.application.changes.queries import GetCatalogVersion
 from server.application.datasets.queries import GetDatasetFilters
 from server.application.datasets.views import DatasetFiltersView
 from server.config.di import resolve
@@ -13,7 +19,23 @@ router = APIRouter(prefix="/filters")
     "/",
     dependencies=[Depends(IsAuthenticated())],
     response_model=DatasetFiltersView,
+    responses={304: {}},
 )
-async def get_dataset_filters() -> DatasetFiltersView:
+async def get_dataset_filters(
+    request: Request, response: Response
+) -> Union[DatasetFiltersView, Response]:
     bus = resolve(MessageBus)
-    return await bus.execute(GetDatasetFilters())
+
+    # Read the version first: if data changes in between, the response is tagged
+    # as older than it is, which at worst makes the client download it again.
+    version = await bus.execute(GetCatalogVersion())
+    headers = make_cache_headers(version)
+
+    if is_not_modified(request, version):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+
+    view = await bus.execute(GetDatasetFilters(catalog_version=version.value))
+
+    return view
@@ -1,47 +1,58 @@
+from typing import Union
+
 from fastapi import APIRouter, Depends
 from fastapi.exceptions import HTTPException
+from starlette.requests import Request
 from starlette.responses import Response
 
+from server.application.changes.queries import GetDatasetVersion
 from server.application.datasets.commands import (
     CreateDataset,
     DeleteDataset,
     UpdateDataset,
 )
 from server.application.datasets.queries import GetAllDatasets, GetDatasetByID
-from server.application.datasets.views import DatasetView
+from server.application.datasets.views import DatasetListView, DatasetView
 from server.config.di import resolve
 from server.domain.auth.entities import UserRole
-from server.domain.common.pagination import Page, Pagination
+from server.domain.common.exceptions import InvalidCursor
+from server.domain.common.pagination import Page
 from server.domain.common.types import ID
 from server.domain.datasets.exceptions import DatasetDoesNotExist
 from server.domain.datasets.specifications import DatasetSpec
 from server.seedwork.application.messages import MessageBus
 
 from ..auth.permissions import HasRole, IsAuthenticated
-from . import filters
+from ..caching import is_not_modified, make_cache_headers
+from ..responses import ORJSONResponse
+from . import autocomplete, bulk, export, filters
 from .schemas import DatasetCreate, DatasetListParams, DatasetUpdate
 
 router = APIRouter(prefix="/datasets", tags=["datasets"])
 
 router.include_router(filters.router)
+router.include_router(autocomplete.router)
+router.include_router(bulk.router)
+router.include_router(export.router)
 
 
 @router.get(
     "/",
     dependencies=[Depends(IsAuthenticated())],
-    response_model=Pagination[DatasetView],
+    response_model=DatasetListView,
 )
 async def list_datasets(
     params: DatasetListParams = Depends(),
-) -> Pagination[DatasetView]:
+) -> ORJSONResponse:
     bus = resolve(MessageBus)
 
-    page = Page(number=params.page_number, size=params.page_size)
+    page = Page(number=params.page_number, size=params.page_size, cursor=params.cursor)
 
     query = GetAllDatasets(
         page=page,
         spec=DatasetSpec(
             search_term=params.q,
+            search_mode=params.search_mode,
             geographical_coverage__in=params.geographical_coverage,
             service__in=params.service,
             format__in=params.format,
@@ -49,26 +60,46 @@ async def list_datasets(
             tag__id__in=params.tag_id,
             license=params.license,
         ),
+        count_mode=params.count_mode,
+        include_facets=params.facets,
     )
 
-    return await bus.execute(query)
+    try:
+        view = await bus.execute(query)
+    except InvalidCursor as exc:
+        raise HTTPException(400, detail=str(exc))
+
+    # Items are built from validated entities: skip re-validating the listing.
+    return ORJSONResponse(view)
 
 
 @router.get(
     "/{id}/",
     dependencies=[Depends(IsAuthenticated())],
     response_model=DatasetView,
-    responses={404: {}},
+    responses={304: {}, 404: {}},
 )
-async def get_dataset_by_id(id: ID) -> DatasetView:
+async def get_dataset_by_id(
+    id: ID, request: Request, response: Response
+) -> Union[DatasetView, Response]:
     bus = resolve(MessageBus)
 
-    query = GetDatasetByID(id=id)
     try:
-        return await bus.execute(query)
+        # Read the version first, see: `get_dataset_filters()`.
+        version = await bus.execute(GetDatasetVersion(id=id))
+        headers = make_cache_headers(version)
+
+        if is_not_modified(request, version):
+            return Response(status_code=304, headers=headers)
+
+        view = await bus.execute(GetDatasetByID(id=id))
     except DatasetDoesNotExist:
         raise HTTPException(404)
 
+    response.headers.update(headers)
+
+    return view
+
 
 @router.post(
     "/",
@@ -80,11 +111,7 @@ async def create_dataset(data: DatasetCreate) -> DatasetView:
     bus = resolve(MessageBus)
 
     command = CreateDataset(**data.dict())
-
-    id = await bus.execute(command)
-
-    query = GetDatasetByID(id=id)
-    return await bus.execute(query)
+    return await bus.execute(command)
 
 
 @router.put(
@@ -99,13 +126,10 @@ async def update_dataset(id: ID, data: DatasetUpdate) -> DatasetView:
     command = UpdateDataset(id=id, **data.dict())
 
     try:
-        await bus.execute(command)
+        return await bus.execute(command)
     except DatasetDoesNotExist:
         raise HTTPException(404)
 
-    query = GetDatasetByID(id=id)
-    return await bus.execute(query)
-
 
 @router.delete(
     "/{id}/",
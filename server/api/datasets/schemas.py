@@ -8,16 +8,22 @@ from server.application.datasets.validation import (
     CreateDatasetValidationMixin,
     UpdateDatasetValidationMixin,
 )
+from server.domain.common.pagination import CountMode
 from server.domain.common.types import ID
 from server.domain.datasets.entities import DataFormat, UpdateFrequency
+from server.domain.datasets.specifications import SearchMode
 
 
 class DatasetListParams:
     def __init__(
         self,
         q: Optional[str] = None,
+        search_mode: SearchMode = "plain",
         page_number: int = 1,
         page_size: int = 10,
+        cursor: Optional[str] = None,
+        count_mode: CountMode = "exact",
+        facets: bool = False,
         geographical_coverage: Optional[List[str]] = Query(None),
         service: Optional[List[str]] = Query(None),
         format_: Optional[List[DataFormat]] = Query(None, alias="format"),
@@ -26,8 +32,12 @@ class DatasetListParams:
         license: Optional[str] = Query(None),
     ) -> None:
         self.q = q
+        self.search_mode = search_mode
         self.page_number = page_number
         self.page_size = page_size
+        self.cursor = cursor
+        self.count_mode = count_mode
+        self.facets = facets
         self.geographical_coverage = geographical_coverage
         self.service = service
         self.format = format_
@@ -0,0 +1,155 @@
+import logging
+import time
+from typing import Dict, Optional
+
+from prometheus_client import Histogram
+from starlette.datastructures import MutableHeaders
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from server.infrastructure.metrics.sql import track_queries
+
+logger = logging.getLogger(__name__)
+
+REQUEST_DURATION_SECONDS = Histogram(
+    "catalogage_http_request_duration_seconds",
+    "Time spent handling HTTP requests, including streaming the response.",
+    ["method", "route", "status"],
+)
+
+REQUEST_DB_QUERIES = Histogram(
+    "catalogage_http_request_db_queries",
+    "Number of SQL statements executed per HTTP request.",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+
+REQUEST_DB_DURATION_SECONDS = Histogram(
+    "catalogage_http_request_db_duration_seconds",
+    "Time spent executing SQL statements per HTTP request.",
+    ["method", "route"],
+)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def _get_route(scope: Scope) -> Optional[str]:
+    # Use path templates rather than actual paths as labels, so that the number
+    # of time series stays bounded.
+    # Resolved once per request, by whichever middleware asks first.
+    if "route_template" not in scope:
+        scope["route_template"] = _match_route(scope)
+
+    return scope["route_template"]
+
+
+def _match_route(scope: Scope) -> Optional[str]:
+    # FastAPI stores the route that handled the request in the scope.
+    if (route := scope.get("route")) is not None:
+        return route.path
+
+    # Other routes, e.g. those of API docs.
+    for route in scope["app"].routes:
+        match, _ = route.matches(scope)
+        if match != Match.NONE:
+            return route.path
+
+    return None
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+
+        with track_queries() as queries:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                duration = time.perf_counter() - start
+                method = scope["method"]
+                route = _get_route(scope) or UNMATCHED_ROUTE
+
+                REQUEST_DURATION_SECONDS.labels(method, route, status_code).observe(
+                    duration
+                )
+                REQUEST_DB_QUERIES.labels(method, route).observe(queries.count)
+                REQUEST_DB_DURATION_SECONDS.labels(method, route).observe(
+                    queries.duration
+                )
+
+
+class QueryBudgetMiddleware:
+    """
+    Keep an eye on SQL statements executed by each request:
+
+    * Report their number and duration in a `Server-Timing` header, which
+      browser dev tools display alongside the request timings.
+      See: https://developer.mozilla.org/en-US/docs/Web/HTTP/Headers/Server-Timing
+    * Log a warning when a route goes over its query budget, which usually
+      hints at N+1 queries.
+    """
+
+    def __init__(
+        self, app: ASGIApp, budget: int = 0, route_budgets: Dict[str, int] = None
+    ) -> None:
+        self.app = app
+        self.budget = budget
+        self.route_budgets = route_budgets or {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+
+        with track_queries() as queries:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    # NOTE: streaming responses may execute more statements
+                    # after headers are sent. Those are only logged.
+                    duration = time.perf_counter() - start
+                    server_timing = ", ".join(
+                        [
+                            f"db;dur={queries.duration * 1000:.1f}"
+                            f';desc="{queries.count} queries"',
+                            f"app;dur={duration * 1000:.1f}",
+                        ]
+                    )
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", server_timing)
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+        route = _get_route(scope)
+        if route is None:
+            return
+
+        budget = self.route_budgets.get(route, self.budget)
+
+        if budget and queries.count > budget:
+            logger.warning(
+                "%s %s executed %d SQL statements (budget: %d) in %.1f ms",
+                scope["method"],
+                route,
+                queries.count,
+                budget,
+                queries.duration * 1000,
+            )
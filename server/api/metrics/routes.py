@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, generate_latest
+from starlette.responses import Response
+
+from server.config.di import resolve
+
+from ..auth.permissions import HasAPIKey
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get(
+    "/",
+    include_in_schema=False,
+    # Metrics reveal internals, e.g. routes and database pool usage.
+    dependencies=[Depends(HasAPIKey("metrics_api_key"))],
+)
+def get_metrics() -> Response:
+    # Prometheus text exposition format.
+    # See: https://prometheus.io/docs/instrumenting/exposition_formats/
+    registry = resolve(CollectorRegistry)
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,30 @@
+import uuid
+from typing import Any
+
+import orjson
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.__dict__
+    if isinstance(obj, uuid.UUID):
+        # orjson only handles exact UUID instances, but drivers may return
+        # subclasses, e.g. asyncpg for UUIDs in arrays.
+        return str(obj)
+    raise TypeError
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    A JSON response encoded by orjson.
+
+    Pydantic models in content are serialized from their field values as-is.
+    Unlike returning a model to be checked against `response_model`, this skips
+    re-validating and re-encoding the model, which is costly on large listings.
+    The `response_model` of the route is still used for the API docs.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
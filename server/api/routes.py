@@ -5,7 +5,7 @@ from starlette.responses import RedirectResponse
 from server.config import Settings
 from server.config.di import resolve
 
-from . import auth, datasets, licenses, organizations, tags
+from . import auth, datasets, licenses, metrics, organizations, tags
 
 router = APIRouter()
 
@@ -22,3 +22,4 @@ router.include_router(datasets.router)
 router.include_router(tags.router)
 router.include_router(licenses.router)
 router.include_router(organizations.router)
+router.include_router(metrics.router)
@@ -0,0 +1,14 @@
+from server.domain.common.types import ID
+from server.infrastructure.helpers.cache import TTLCache
+
+from .views import UserView
+
+
+class APITokenCache(TTLCache[str, UserView]):
+    """
+    Users by API token, so that authenticating requests does not need to
+    reach to the database every time.
+    """
+
+    def invalidate_user(self, id: ID) -> None:
+        self.delete_where(lambda user: user.id == id)
@@ -1,3 +1,5 @@
+from functools import partial
+
 from server.application.auth.views import AuthenticatedUserView, UserView
 from server.config.di import resolve
 from server.domain.auth.entities import User, UserRole
@@ -8,7 +10,9 @@ from server.domain.auth.exceptions import (
 )
 from server.domain.auth.repositories import UserRepository
 from server.domain.common.types import ID
+from server.seedwork.application.unit_of_work import UnitOfWork
 
+from .cache import APITokenCache
 from .commands import ChangePassword, CreateUser, DeleteUser
 from .passwords import PasswordEncoder, generate_api_token
 from .queries import GetUserByAPIToken, GetUserByEmail, Login
@@ -30,7 +34,7 @@ async def create_user(
     if user is not None:
         raise EmailAlreadyExists(email)
 
-    password_hash = password_encoder.hash(command.password)
+    password_hash = await password_encoder.hash(command.password)
     api_token = generate_api_token()
 
     user = User(
@@ -47,8 +51,13 @@ async def create_user(
 
 async def delete_user(command: DeleteUser) -> None:
     repository = resolve(UserRepository)
+    api_token_cache = resolve(APITokenCache)
+    unit_of_work = resolve(UnitOfWork)
+
     await repository.delete(command.id)
 
+    unit_of_work.on_commit(partial(api_token_cache.invalidate_user, command.id))
+
 
 async def login(query: Login) -> AuthenticatedUserView:
     repository = resolve(UserRepository)
@@ -57,10 +66,12 @@ async def login(query: Login) -> AuthenticatedUserView:
     user = await repository.get_by_email(query.email)
 
     if user is None:
-        password_encoder.hash(query.password)  # Mitigate timing attacks.
+        await password_encoder.hash(query.password)  # Mitigate timing attacks.
         raise LoginFailed("Invalid credentials")
 
-    if not password_encoder.verify(password=query.password, hash=user.password_hash):
+    if not await password_encoder.verify(
+        password=query.password, hash=user.password_hash
+    ):
         raise LoginFailed("Invalid credentials")
 
     return AuthenticatedUserView(**user.dict())
@@ -81,18 +92,29 @@ async def get_user_by_email(query: GetUserByEmail) -> UserView:
 
 async def get_user_by_api_token(query: GetUserByAPIToken) -> UserView:
     repository = resolve(UserRepository)
+    api_token_cache = resolve(APITokenCache)
+
+    view = api_token_cache.get(query.api_token)
+
+    if view is not None:
+        return view
 
     user = await repository.get_by_api_token(query.api_token)
 
     if user is None:
         raise UserDoesNotExist("__token__")
 
-    return UserView(**user.dict())
+    view = UserView(**user.dict())
+    api_token_cache.set(query.api_token, view)
+
+    return view
 
 
 async def change_password(command: ChangePassword) -> None:
     repository = resolve(UserRepository)
     password_encoder = resolve(PasswordEncoder)
+    api_token_cache = resolve(APITokenCache)
+    unit_of_work = resolve(UnitOfWork)
 
     email = command.email
     user = await repository.get_by_email(email)
@@ -100,7 +122,9 @@ async def change_password(command: ChangePassword) -> None:
     if user is None:
         raise UserDoesNotExist(email)
 
-    user.update_password(password_encoder.hash(command.password))
+    user.update_password(await password_encoder.hash(command.password))
     user.update_api_token(generate_api_token())  # Require new login
 
     await repository.update(user)
+
+    unit_of_work.on_commit(partial(api_token_cache.invalidate_user, user.id))
@@ -4,10 +4,15 @@ from pydantic import SecretStr
 
 
 class PasswordEncoder:
-    def hash(self, password: SecretStr) -> str:
+    """
+    Password hashing is CPU-intensive, so implementations are expected to run it
+    outside of the event loop.
+    """
+
+    async def hash(self, password: SecretStr) -> str:
         raise NotImplementedError  # pragma: no cover
 
-    def verify(self, password: SecretStr, hash: str) -> bool:
+    async def verify(self, password: SecretStr, hash: str) -> bool:
         raise NotImplementedError  # pragma: no cover
 
 
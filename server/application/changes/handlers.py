@@ -0,0 +1,24 @@
+from server.config.di import resolve
+from server.domain.changes.repositories import ChangeVersionRepository
+from server.domain.datasets.exceptions import DatasetDoesNotExist
+
+from .queries import GetCatalogVersion, GetDatasetVersion
+from .views import ChangeVersionView
+
+
+async def get_catalog_version(query: GetCatalogVersion) -> ChangeVersionView:
+    repository = resolve(ChangeVersionRepository)
+    version = await repository.get_catalog_version()
+    return ChangeVersionView(**version.dict())
+
+
+async def get_dataset_version(query: GetDatasetVersion) -> ChangeVersionView:
+    repository = resolve(ChangeVersionRepository)
+
+    id = query.id
+    version = await repository.get_dataset_version(id)
+
+    if version is None:
+        raise DatasetDoesNotExist(id)
+
+    return ChangeVersionView(**version.dict())
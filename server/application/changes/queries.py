@@ -0,0 +1,12 @@
+from server.domain.common.types import ID
+from server.seedwork.application.queries import Query
+
+from .views import ChangeVersionView
+
+
+class GetCatalogVersion(Query[ChangeVersionView]):
+    pass
+
+
+class GetDatasetVersion(Query[ChangeVersionView]):
+    id: ID
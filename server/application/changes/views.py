@@ -0,0 +1,8 @@
+import datetime as dt
+
+from pydantic import BaseModel
+
+
+class ChangeVersionView(BaseModel):
+    value: int
+    changed_at: dt.datetime
@@ -0,0 +1,27 @@
+from typing import Optional
+
+from server.infrastructure.helpers.cache import TTLCache
+
+from .views import DatasetFiltersView
+
+
+class DatasetFiltersCache:
+    """
+    Holds the dataset filters view, which is requested on every search page load
+    but only changes when datasets or tags are written.
+
+    The view is keyed by catalog version, so that writes made by other processes
+    are seen as soon as the version changes, rather than when the entry expires.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self._cache: TTLCache[int, DatasetFiltersView] = TTLCache(maxsize=1, ttl=ttl)
+
+    def get(self, catalog_version: int) -> Optional[DatasetFiltersView]:
+        return self._cache.get(catalog_version)
+
+    def set(self, catalog_version: int, view: DatasetFiltersView) -> None:
+        self._cache.set(catalog_version, view)
+
+    def invalidate(self) -> None:
+        self._cache.clear()
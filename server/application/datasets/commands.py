@@ -10,9 +10,10 @@ from server.domain.organizations.types import Siret
 from server.seedwork.application.commands import Command
 
 from .validation import CreateDatasetValidationMixin, UpdateDatasetValidationMixin
+from .views import DatasetCreateResultView, DatasetView
 
 
-class CreateDataset(CreateDatasetValidationMixin, Command[ID]):
+class CreateDataset(CreateDatasetValidationMixin, Command[DatasetView]):
     organization_siret: Siret = LEGACY_ORGANIZATION_SIRET
     title: str
     description: str
@@ -29,7 +30,18 @@ class CreateDataset(CreateDatasetValidationMixin, Command[ID]):
     tag_ids: List[ID] = Field(default_factory=list)
 
 
-class UpdateDataset(UpdateDatasetValidationMixin, Command[None]):
+class BulkCreateDatasets(Command[List[DatasetCreateResultView]]):
+    """
+    Create many datasets at once, in a single transaction.
+
+    Items that reference unknown entities are reported as errors, and do not
+    prevent other items from being created.
+    """
+
+    items: List[CreateDataset]
+
+
+class UpdateDataset(UpdateDatasetValidationMixin, Command[DatasetView]):
     id: ID
     title: str
     description: str
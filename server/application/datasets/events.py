@@ -0,0 +1,14 @@
+from server.domain.common.types import ID
+from server.seedwork.application.events import Event
+
+
+class DatasetCreated(Event):
+    id: ID
+
+
+class DatasetUpdated(Event):
+    id: ID
+
+
+class DatasetDeleted(Event):
+    id: ID
@@ -1,53 +1,172 @@
-from server.application.licenses.queries import GetLicenseSet
-from server.application.tags.queries import GetAllTags
+import logging
+from typing import AsyncIterator, List
+
+from server.application.catalog_records.views import CatalogRecordView
+from server.application.licenses.handlers import make_license_set
+from server.application.tags.views import TagView
 from server.config.di import resolve
 from server.domain.catalog_records.entities import CatalogRecord
 from server.domain.catalog_records.repositories import CatalogRecordRepository
-from server.domain.common.pagination import Pagination
+from server.domain.changes.repositories import ChangeVersionRepository
+from server.domain.common.exceptions import DoesNotExist
 from server.domain.common.types import ID
 from server.domain.datasets.entities import DataFormat, Dataset
-from server.domain.datasets.exceptions import DatasetDoesNotExist
-from server.domain.datasets.repositories import DatasetRepository
+from server.domain.datasets.exceptions import CannotInsertDatasets, DatasetDoesNotExist
+from server.domain.datasets.repositories import DatasetGetAllExtras, DatasetRepository
+from server.domain.datasets.search import SearchIndex
+from server.domain.organizations.exceptions import OrganizationDoesNotExist
+from server.domain.organizations.repositories import OrganizationRepository
+from server.domain.tags.exceptions import TagDoesNotExist
 from server.domain.tags.repositories import TagRepository
 from server.seedwork.application.messages import MessageBus
+from server.seedwork.application.unit_of_work import UnitOfWork
+
+from .cache import DatasetFiltersCache
+from .commands import BulkCreateDatasets, CreateDataset, DeleteDataset, UpdateDataset
+from .events import DatasetCreated, DatasetDeleted, DatasetUpdated
+from .queries import (
+    ExportDatasets,
+    GetAllDatasets,
+    GetDatasetByID,
+    GetDatasetFilters,
+    GetDatasetSuggestions,
+)
+from .views import (
+    DatasetCreateResultView,
+    DatasetFacetsView,
+    DatasetFiltersView,
+    DatasetListView,
+    DatasetSuggestionView,
+    DatasetView,
+)
 
-from .commands import CreateDataset, DeleteDataset, UpdateDataset
-from .queries import GetAllDatasets, GetDatasetByID, GetDatasetFilters
-from .views import DatasetFiltersView, DatasetView
+logger = logging.getLogger(__name__)
 
 
-async def create_dataset(command: CreateDataset, *, id_: ID = None) -> ID:
+async def create_dataset(command: CreateDataset, *, id_: ID = None) -> DatasetView:
     repository = resolve(DatasetRepository)
     catalog_record_repository = resolve(CatalogRecordRepository)
     tag_repository = resolve(TagRepository)
+    filters_cache = resolve(DatasetFiltersCache)
+    unit_of_work = resolve(UnitOfWork)
+    bus = resolve(MessageBus)
 
     if id_ is None:
         id_ = repository.make_id()
 
-    catalog_record_id = await catalog_record_repository.insert(
-        CatalogRecord(
-            id=catalog_record_repository.make_id(),
-            organization_siret=command.organization_siret,
-        )
-    )
-    catalog_record = await catalog_record_repository.get_by_id(catalog_record_id)
-    assert catalog_record is not None
-
     tags = await tag_repository.get_all(ids=command.tag_ids)
 
     dataset = Dataset(
         id=id_,
-        catalog_record=catalog_record,
+        catalog_record=CatalogRecord(
+            id=catalog_record_repository.make_id(),
+            organization_siret=command.organization_siret,
+        ),
         tags=tags,
-        **command.dict(exclude={"tag_ids"}),
+        **command.dict(exclude={"organization_siret", "tag_ids"}),
     )
 
-    return await repository.insert(dataset)
+    dataset = await repository.insert(dataset)
+
+    unit_of_work.on_commit(filters_cache.invalidate)
+    bus.publish(DatasetCreated(id=dataset.id))
+
+    return DatasetView(**dataset.dict())
+
+
+def _does_not_exist_error(loc: tuple, exc: DoesNotExist) -> dict:
+    return {"loc": loc, "msg": str(exc), "type": "value_error.does_not_exist"}
 
 
-async def update_dataset(command: UpdateDataset) -> None:
+async def bulk_create_datasets(
+    command: BulkCreateDatasets,
+) -> List[DatasetCreateResultView]:
     repository = resolve(DatasetRepository)
+    catalog_record_repository = resolve(CatalogRecordRepository)
+    organization_repository = resolve(OrganizationRepository)
     tag_repository = resolve(TagRepository)
+    filters_cache = resolve(DatasetFiltersCache)
+    unit_of_work = resolve(UnitOfWork)
+    bus = resolve(MessageBus)
+
+    # Fetch referenced entities once for all items.
+
+    sirets = {item.organization_siret for item in command.items}
+    existing_sirets = {
+        organization.siret
+        for organization in await organization_repository.get_many_by_siret(
+            list(sirets)
+        )
+    }
+
+    tag_ids = {tag_id for item in command.items for tag_id in item.tag_ids}
+    tags_by_id = {
+        tag.id: tag for tag in await tag_repository.get_all(ids=list(tag_ids))
+    }
+
+    results: List[DatasetCreateResultView] = []
+    datasets: List[Dataset] = []
+
+    for item in command.items:
+        errors = []
+
+        if item.organization_siret not in existing_sirets:
+            errors.append(
+                _does_not_exist_error(
+                    ("organization_siret",),
+                    OrganizationDoesNotExist(item.organization_siret),
+                )
+            )
+
+        for index, tag_id in enumerate(item.tag_ids):
+            if tag_id not in tags_by_id:
+                errors.append(
+                    _does_not_exist_error(("tag_ids", index), TagDoesNotExist(tag_id))
+                )
+
+        if errors:
+            results.append(DatasetCreateResultView(errors=errors))
+            continue
+
+        dataset = Dataset(
+            id=repository.make_id(),
+            catalog_record=CatalogRecord(
+                id=catalog_record_repository.make_id(),
+                organization_siret=item.organization_siret,
+            ),
+            tags=[tags_by_id[tag_id] for tag_id in item.tag_ids],
+            **item.dict(exclude={"organization_siret", "tag_ids"}),
+        )
+        datasets.append(dataset)
+        results.append(DatasetCreateResultView(id=dataset.id))
+
+    if not datasets:
+        return results
+
+    try:
+        await repository.insert_many(datasets)
+    except CannotInsertDatasets as exc:
+        logger.exception("Bulk insert failed")
+        error = {"loc": (), "msg": str(exc), "type": "insert_error"}
+        return [
+            DatasetCreateResultView(errors=[error]) if result.id is not None else result
+            for result in results
+        ]
+
+    unit_of_work.on_commit(filters_cache.invalidate)
+
+    for dataset in datasets:
+        bus.publish(DatasetCreated(id=dataset.id))
+
+    return results
+
+
+async def update_dataset(command: UpdateDataset) -> DatasetView:
+    repository = resolve(DatasetRepository)
+    tag_repository = resolve(TagRepository)
+    filters_cache = resolve(DatasetFiltersCache)
+    unit_of_work = resolve(UnitOfWork)
+    bus = resolve(MessageBus)
 
     pk = command.id
     dataset = await repository.get_by_id(pk)
@@ -57,42 +176,101 @@ async def update_dataset(command: UpdateDataset) -> None:
     tags = await tag_repository.get_all(ids=command.tag_ids)
     dataset.update(**command.dict(exclude={"id", "tag_ids"}), tags=tags)
 
-    await repository.update(dataset)
+    dataset = await repository.update(dataset)
+
+    unit_of_work.on_commit(filters_cache.invalidate)
+    bus.publish(DatasetUpdated(id=dataset.id))
+
+    return DatasetView(**dataset.dict())
 
 
 async def delete_dataset(command: DeleteDataset) -> None:
     repository = resolve(DatasetRepository)
+    filters_cache = resolve(DatasetFiltersCache)
+    unit_of_work = resolve(UnitOfWork)
+    bus = resolve(MessageBus)
+
     await repository.delete(command.id)
 
+    unit_of_work.on_commit(filters_cache.invalidate)
+    bus.publish(DatasetDeleted(id=command.id))
+
 
 async def get_dataset_filters(query: GetDatasetFilters) -> DatasetFiltersView:
-    bus = resolve(MessageBus)
     repository = resolve(DatasetRepository)
+    change_version_repository = resolve(ChangeVersionRepository)
+    filters_cache = resolve(DatasetFiltersCache)
 
-    geographical_coverages = await repository.get_geographical_coverage_set()
-    services = await repository.get_service_set()
-    technical_sources = await repository.get_technical_source_set()
-    tags = await bus.execute(GetAllTags())
-    licenses = await bus.execute(GetLicenseSet())
+    catalog_version = query.catalog_version
+    if catalog_version is None:
+        catalog_version = (await change_version_repository.get_catalog_version()).value
 
-    return DatasetFiltersView(
-        geographical_coverage=sorted(geographical_coverages),
-        service=list(services),
+    view = filters_cache.get(catalog_version)
+
+    if view is not None:
+        return view
+
+    values = await repository.get_filter_values()
+
+    view = DatasetFiltersView(
+        geographical_coverage=sorted(values["geographical_coverage"]),
+        service=list(values["service"]),
         format=list(DataFormat),
-        technical_source=list(technical_sources),
-        tag_id=tags,
-        license=["*", *licenses],
+        technical_source=list(values["technical_source"]),
+        tag_id=[TagView(**tag.dict()) for tag in values["tags"]],
+        license=["*", *make_license_set(values["license"])],
+    )
+    filters_cache.set(catalog_version, view)
+
+    return view
+
+
+def _make_list_item_view(dataset: Dataset, extras: DatasetGetAllExtras) -> DatasetView:
+    # Entities are valid already: build the view from their field values,
+    # rather than validating them all over again, item by item.
+    fields = dict(dataset)
+    fields["catalog_record"] = CatalogRecordView.construct(
+        **dict(dataset.catalog_record)
     )
+    fields["tags"] = [TagView.construct(**dict(tag)) for tag in dataset.tags]
+    return DatasetView.construct(**fields, **extras)
 
 
-async def get_all_datasets(query: GetAllDatasets) -> Pagination[DatasetView]:
+async def get_all_datasets(query: GetAllDatasets) -> DatasetListView:
     repository = resolve(DatasetRepository)
+    search_index = resolve(SearchIndex)
+
+    searching = query.spec.search_term is not None
+
+    if searching:
+        datasets, count, cursors = await search_index.search(
+            page=query.page, spec=query.spec, count_mode=query.count_mode
+        )
+    else:
+        datasets, count, cursors = await repository.get_all(
+            page=query.page, spec=query.spec, count_mode=query.count_mode
+        )
+
+    views = [_make_list_item_view(dataset, extras) for dataset, extras in datasets]
 
-    datasets, count = await repository.get_all(page=query.page, spec=query.spec)
+    facets = None
 
-    views = [DatasetView(**dataset.dict(), **extras) for dataset, extras in datasets]
+    if query.include_facets:
+        if searching:
+            counts = await search_index.get_facet_counts(spec=query.spec)
+        else:
+            counts = await repository.get_facet_counts(spec=query.spec)
+        facets = DatasetFacetsView(**counts)
 
-    return Pagination(items=views, total_items=count, page_size=query.page.size)
+    return DatasetListView(
+        items=views,
+        total_items=count.value,
+        total_items_estimated=count.estimated,
+        page_size=query.page.size,
+        next_cursor=cursors.next,
+        previous_cursor=cursors.previous,
+        facets=facets,
+    )
 
 
 async def get_dataset_by_id(query: GetDatasetByID) -> DatasetView:
@@ -105,3 +283,17 @@ async def get_dataset_by_id(query: GetDatasetByID) -> DatasetView:
         raise DatasetDoesNotExist(id)
 
     return DatasetView(**dataset.dict())
+
+
+async def get_dataset_suggestions(
+    query: GetDatasetSuggestions,
+) -> List[DatasetSuggestionView]:
+    repository = resolve(DatasetRepository)
+    suggestions = await repository.get_suggestions(query.q, limit=query.limit)
+    return [DatasetSuggestionView(**suggestion) for suggestion in suggestions]
+
+
+async def export_datasets(query: ExportDatasets) -> AsyncIterator[DatasetView]:
+    repository = resolve(DatasetRepository)
+
+    return (DatasetView(**dataset.dict()) async for dataset in repository.stream_all())
@@ -1,19 +1,40 @@
-from server.domain.common.pagination import Page, Pagination
+from typing import AsyncIterator, List, Optional
+
+from server.domain.common.pagination import CountMode, Page
 from server.domain.common.types import ID
 from server.domain.datasets.specifications import DatasetSpec
 from server.seedwork.application.queries import Query
 
-from .views import DatasetFiltersView, DatasetView
+from .views import (
+    DatasetFiltersView,
+    DatasetListView,
+    DatasetSuggestionView,
+    DatasetView,
+)
 
 
-class GetAllDatasets(Query[Pagination[DatasetView]]):
+class GetAllDatasets(Query[DatasetListView]):
     page: Page = Page()
     spec: DatasetSpec = DatasetSpec()
+    count_mode: CountMode = "exact"
+    include_facets: bool = False
 
 
 class GetDatasetByID(Query[DatasetView]):
     id: ID
 
 
+class GetDatasetSuggestions(Query[List[DatasetSuggestionView]]):
+    q: str
+    limit: int = 10
+
+
 class GetDatasetFilters(Query[DatasetFiltersView]):
-    pass
+    # Catalog version the response is tagged with, if known. Read otherwise.
+    catalog_version: Optional[int] = None
+
+
+class ExportDatasets(Query[AsyncIterator[DatasetView]]):
+    """
+    Read all datasets, as a stream.
+    """
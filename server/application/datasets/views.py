@@ -1,8 +1,9 @@
 import datetime as dt
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel
 
+from server.domain.common.pagination import Pagination
 from server.domain.common.types import ID
 from server.domain.datasets.entities import DataFormat, UpdateFrequency
 from server.domain.datasets.repositories import DatasetHeadlines
@@ -32,6 +33,17 @@ class DatasetView(BaseModel):
     headlines: Optional[DatasetHeadlines] = None
 
 
+class DatasetSuggestionView(BaseModel):
+    id: ID
+    title: str
+
+
+class DatasetCreateResultView(BaseModel):
+    # Either of these is set.
+    id: Optional[ID] = None
+    errors: Optional[List[dict]] = None  # Same format as Pydantic errors.
+
+
 class DatasetFiltersView(BaseModel):
     geographical_coverage: List[str]
     service: List[str]
@@ -39,3 +51,18 @@ class DatasetFiltersView(BaseModel):
     technical_source: List[str]
     tag_id: List[TagView]
     license: List[str]
+
+
+class DatasetFacetsView(BaseModel):
+    geographical_coverage: Dict[str, int]
+    service: Dict[str, int]
+    format: Dict[DataFormat, int]
+    technical_source: Dict[str, int]
+    tag_id: Dict[ID, int]
+    license: Dict[str, int]
+
+
+class DatasetListView(Pagination[DatasetView]):
+    items: List[DatasetView]
+    # Number of matching datasets for each value of filterable fields.
+    facets: Optional[DatasetFacetsView] = None
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Set
 
 from server.config.di import resolve
 from server.domain.datasets.repositories import DatasetRepository
@@ -7,7 +7,11 @@ from server.domain.licenses.entities import BUILTIN_LICENSE_SUGGESTIONS
 from .queries import GetLicenseSet
 
 
+def make_license_set(stored_licenses: Set[str]) -> List[str]:
+    return sorted(BUILTIN_LICENSE_SUGGESTIONS | stored_licenses)
+
+
 async def get_license_set(query: GetLicenseSet) -> List[str]:
     repository = resolve(DatasetRepository)
     stored_licenses = await repository.get_license_set()
-    return sorted(BUILTIN_LICENSE_SUGGESTIONS | stored_licenses)
+    return make_license_set(stored_licenses)
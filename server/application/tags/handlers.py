@@ -1,5 +1,6 @@
 from typing import List
 
+from server.application.datasets.cache import DatasetFiltersCache
 from server.application.tags.queries import GetAllTags, GetTagByID
 from server.application.tags.views import TagView
 from server.config.di import resolve
@@ -7,19 +8,26 @@ from server.domain.common.types import ID
 from server.domain.tags.entities import Tag
 from server.domain.tags.exceptions import TagDoesNotExist
 from server.domain.tags.repositories import TagRepository
+from server.seedwork.application.unit_of_work import UnitOfWork
 
 from .commands import CreateTag
 
 
 async def create_tag(command: CreateTag, *, id_: ID = None) -> ID:
     repository = resolve(TagRepository)
+    filters_cache = resolve(DatasetFiltersCache)
+    unit_of_work = resolve(UnitOfWork)
 
     if id_ is None:
         id_ = repository.make_id()
 
     tag = Tag(id=id_, **command.dict())
 
-    return await repository.insert(tag)
+    id_ = await repository.insert(tag)
+
+    unit_of_work.on_commit(filters_cache.invalidate)
+
+    return id_
 
 
 async def get_all_tags(query: GetAllTags) -> List[TagView]:
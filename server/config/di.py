@@ -59,25 +59,44 @@ Or in routes:
 Or in any custom scripts as seems fit.
 """
 
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from prometheus_client import REGISTRY, CollectorRegistry
+from prometheus_client.multiprocess import MultiProcessCollector
+
+from server.application.auth.cache import APITokenCache
 from server.application.auth.passwords import PasswordEncoder
+from server.application.datasets.cache import DatasetFiltersCache
 from server.domain.auth.repositories import UserRepository
 from server.domain.catalog_records.repositories import CatalogRecordRepository
+from server.domain.changes.repositories import ChangeVersionRepository
 from server.domain.datasets.repositories import DatasetRepository
+from server.domain.datasets.search import SearchIndex
 from server.domain.organizations.repositories import OrganizationRepository
 from server.domain.tags.repositories import TagRepository
 from server.infrastructure.adapters.messages import MessageBusAdapter
+from server.infrastructure.adapters.unit_of_work import SqlUnitOfWork
 from server.infrastructure.auth.passwords import Argon2PasswordEncoder
 from server.infrastructure.auth.repositories import SqlUserRepository
 from server.infrastructure.catalog_records.repositories import (
     SqlCatalogRecordRepository,
 )
+from server.infrastructure.catalogs import models  # noqa  # Trigger table discovery.
+from server.infrastructure.changes.repositories import SqlChangeVersionRepository
 from server.infrastructure.database import Database
 from server.infrastructure.datasets.repositories import SqlDatasetRepository
+from server.infrastructure.datasets.search import BM25SearchIndex, SqlSearchIndex
+from server.infrastructure.metrics.bus import InstrumentedMessageBus
+from server.infrastructure.metrics.multiprocess import is_multiprocess
+from server.infrastructure.metrics.pool import PoolCollector
+from server.infrastructure.metrics.sql import instrument_engine
 from server.infrastructure.organizations.repositories import SqlOrganizationRepository
 from server.infrastructure.tags.repositories import SqlTagRepository
 from server.seedwork.application.di import Container
 from server.seedwork.application.messages import MessageBus
-from server.seedwork.application.modules import load_modules
+from server.seedwork.application.modules import Handlers
+from server.seedwork.application.unit_of_work import UnitOfWork
 
 from .settings import Settings
 
@@ -88,6 +107,7 @@ MODULES = [
     "server.infrastructure.organizations.module.OrganizationsModule",
     "server.infrastructure.catalogs.module.CatalogsModule",
     "server.infrastructure.auth.module.AuthModule",
+    "server.infrastructure.changes.module.ChangesModule",
 ]
 
 
@@ -105,42 +125,102 @@ def configure(container: "Container") -> None:
 
     # Common services
 
-    container.register_instance(PasswordEncoder, Argon2PasswordEncoder())
-
-    # Event handling (Commands, queries, and the message bus)
-
-    modules = load_modules(MODULES)
-
-    command_handlers = {
-        command: handler
-        for cls in modules
-        for command, handler in cls.command_handlers.items()
-    }
-
-    query_handlers = {
-        query: handler
-        for cls in modules
-        for query, handler in cls.query_handlers.items()
-    }
-
-    bus = MessageBusAdapter(command_handlers, query_handlers)
-    container.register_instance(MessageBus, bus)
+    container.register_instance(
+        PasswordEncoder,
+        Argon2PasswordEncoder(
+            time_cost=settings.argon2_time_cost,
+            memory_cost=settings.argon2_memory_cost,
+            parallelism=settings.argon2_parallelism,
+            executor=ThreadPoolExecutor(
+                max_workers=settings.password_hashing_workers or os.cpu_count(),
+                thread_name_prefix="password-hashing",
+            ),
+        ),
+    )
+
+    container.register_instance(
+        APITokenCache,
+        APITokenCache(
+            maxsize=settings.api_token_cache_size,
+            ttl=settings.api_token_cache_ttl,
+        ),
+    )
+
+    container.register_instance(
+        DatasetFiltersCache,
+        DatasetFiltersCache(ttl=settings.dataset_filters_cache_ttl),
+    )
 
     # Databases
 
-    db = Database(url=settings.env_database_url, debug=settings.debug)
+    db = Database(
+        url=settings.env_database_url,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        statement_cache_size=settings.db_statement_cache_size,
+        statement_timeout=settings.db_statement_timeout,
+        replica_urls=settings.env_db_replica_urls,
+        read_your_writes_window=settings.db_read_your_writes_window,
+    )
     container.register_instance(Database, db)
+    unit_of_work = SqlUnitOfWork(db)
+    container.register_instance(UnitOfWork, unit_of_work)
+    for engine in [db.engine, *db.replica_engines]:
+        instrument_engine(engine.sync_engine)
+
+    # Metrics
+
+    registry = CollectorRegistry()
+    if is_multiprocess():
+        # Metrics defined at module level, in all worker processes.
+        MultiProcessCollector(registry)
+    else:
+        registry.register(REGISTRY)  # Metrics defined at module level
+    registry.register(PoolCollector(lambda: db.pool, per_process=is_multiprocess()))
+    container.register_instance(CollectorRegistry, registry)
 
     # Repositories
 
     container.register_instance(UserRepository, SqlUserRepository(db))
     container.register_instance(CatalogRecordRepository, SqlCatalogRecordRepository(db))
-    container.register_instance(DatasetRepository, SqlDatasetRepository(db))
+    dataset_repository = SqlDatasetRepository(db)
+    container.register_instance(DatasetRepository, dataset_repository)
     container.register_instance(TagRepository, SqlTagRepository(db))
     container.register_instance(OrganizationRepository, SqlOrganizationRepository(db))
+    change_version_repository = SqlChangeVersionRepository(db)
+    container.register_instance(ChangeVersionRepository, change_version_repository)
+
+    # Search
+
+    search_index: SearchIndex
+
+    if settings.search_index == "bm25":
+        search_index = BM25SearchIndex(dataset_repository, change_version_repository)
+    else:
+        search_index = SqlSearchIndex(dataset_repository)
+
+    container.register_instance(SearchIndex, search_index)
+
+    # Event handling (Commands, queries, and the message bus)
+
+    handlers = Handlers(MODULES)
+
+    bus = InstrumentedMessageBus(
+        MessageBusAdapter(
+            handlers.command_handlers,
+            handlers.query_handlers,
+            unit_of_work=unit_of_work,
+            event_handlers=handlers.event_handlers,
+        )
+    )
+    container.register_instance(MessageBus, bus)
 
 
 _CONTAINER = Container(configure)
 
 bootstrap = _CONTAINER.bootstrap
 resolve = _CONTAINER.resolve
+override = _CONTAINER.override
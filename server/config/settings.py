@@ -1,22 +1,77 @@
-from typing import Literal
+from typing import Dict, List, Literal, Optional
 
 from pydantic import BaseSettings
 from sqlalchemy.engine.url import make_url
 
 ServerMode = Literal["local", "live"]
 
+SearchIndexBackend = Literal["postgres", "bm25"]
+
+ServerLoop = Literal["auto", "asyncio", "uvloop"]
+
+ServerHTTP = Literal["auto", "h11", "httptools"]
+
 
 class Settings(BaseSettings):
     # For usage, see: https://pydantic-docs.helpmanual.io/usage/settings/
 
     server_mode: ServerMode = "local"
     database_url: str = "postgresql+asyncpg://localhost:5432/catalogage"
+    # Database connection pool, per process.
+    # See: https://docs.sqlalchemy.org/en/14/core/pooling.html
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30  # Seconds
+    db_pool_recycle: int = 1800  # Seconds. Set to -1 to disable.
+    db_pool_pre_ping: bool = False
+    # Prepared statements cached by the driver, per connection. Set to 0 to disable.
+    db_statement_cache_size: int = 100
+    # Statements running longer than this are cancelled. Set to 0 to disable.
+    db_statement_timeout: float = 0  # Seconds
+    # Log a warning when a request executes more SQL statements than this.
+    # Set to 0 to disable.
+    db_query_budget: int = 20
+    # Budgets of specific routes, by path template. E.g. {"/datasets/bulk/": 50}
+    db_query_budgets: Dict[str, int] = {}
+    # Read replicas of the database, which serve queries of the message bus.
+    db_replica_urls: List[str] = []
+    # Clients read from the primary for this long after committing changes.
+    db_read_your_writes_window: float = 5  # Seconds
     host: str = "localhost"
     port: int = 3579
+    # Gunicorn worker processes sharing the bound socket. See: gunicorn.conf.py
+    workers: int = 1
+    # Workers whose event loop is blocked for longer than this are restarted.
+    worker_timeout: int = 30  # Seconds
+    # Workers stopping take at most this long to finish in-flight requests.
+    worker_graceful_timeout: int = 30  # Seconds
+    # Uvicorn options.
+    # See: https://www.uvicorn.org/settings/
+    server_loop: ServerLoop = "auto"
+    server_http: ServerHTTP = "auto"
+    server_backlog: int = 2048
+    server_timeout_keep_alive: int = 5  # Seconds
+    # Respond with 503 beyond this many concurrent connections, per worker.
+    server_limit_concurrency: Optional[int] = None
     docs_url: str = "/docs"
     config_repo_api_key: str = ""
+    # Required to scrape /metrics/. Metrics are not served if empty.
+    metrics_api_key: str = ""
     debug: bool = False
     testing: bool = False
+    # In-process cache of authenticated users. Set size to 0 to disable.
+    api_token_cache_size: int = 1024
+    api_token_cache_ttl: float = 60  # Seconds
+    dataset_filters_cache_ttl: float = 300  # Seconds
+    # Full-text search engine. "bm25" keeps an index in the memory of each process.
+    search_index: SearchIndexBackend = "postgres"
+    # Password hashing runs in a pool of this many threads. Defaults to CPU count.
+    password_hashing_workers: Optional[int] = None
+    # Argon2 cost parameters.
+    # See: https://argon2-cffi.readthedocs.io/en/stable/parameters.html
+    argon2_time_cost: int = 3
+    argon2_memory_cost: int = 65536  # KiB
+    argon2_parallelism: int = 4
 
     class Config:
         env_prefix = "app_"
@@ -39,3 +94,8 @@ class Settings(BaseSettings):
     @property
     def env_database_url(self) -> str:
         return self.test_database_url if self.testing else self.database_url
+
+    @property
+    def env_db_replica_urls(self) -> List[str]:
+        # Tests run against a single database.
+        return [] if self.testing else self.db_replica_urls
@@ -0,0 +1,16 @@
+import datetime as dt
+
+from server.seedwork.domain.entities import Entity
+
+
+class ChangeVersion(Entity):
+    """
+    Identifies a state of some data: `value` is incremented on every change
+    to the data, which last happened at `changed_at`.
+    """
+
+    value: int
+    changed_at: dt.datetime
+
+    class Config:
+        allow_mutation = False
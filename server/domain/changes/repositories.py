@@ -0,0 +1,25 @@
+from typing import List, Optional
+
+from server.domain.common.types import ID
+from server.seedwork.domain.repositories import Repository
+
+from .entities import ChangeVersion
+
+
+class ChangeVersionRepository(Repository):
+    async def get_catalog_version(self) -> ChangeVersion:
+        """
+        Return the version of the catalog as a whole, which changes whenever
+        a dataset or a tag is created, updated or deleted.
+        """
+        raise NotImplementedError  # pragma: no cover
+
+    async def get_dataset_version(self, id: ID) -> Optional[ChangeVersion]:
+        raise NotImplementedError  # pragma: no cover
+
+    async def get_changed_dataset_ids(self, since: int) -> List[ID]:
+        """
+        Return the IDs of datasets created, updated or deleted after catalog
+        version `since`, e.g. to bring a copy of the catalog up to date.
+        """
+        raise NotImplementedError  # pragma: no cover
@@ -6,3 +6,8 @@ class DoesNotExist(Exception):
 
     def __init__(self, pk: Any) -> None:
         super().__init__(f"{self.entity_name} not found: {pk!r}")
+
+
+class InvalidCursor(Exception):
+    def __init__(self, cursor: str) -> None:
+        super().__init__(f"Invalid cursor: {cursor!r}")
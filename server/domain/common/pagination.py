@@ -1,4 +1,5 @@
-from typing import Generic, List, TypeVar
+import base64
+from typing import Any, Generic, List, Literal, Optional, TypeVar
 
 from pydantic import BaseModel, Field
 from pydantic.generics import GenericModel
@@ -6,12 +7,64 @@ from typing_extensions import Annotated
 
 from server.infrastructure.helpers.pydantic import Computed
 
+from .exceptions import InvalidCursor
+
 T = TypeVar("T")
 
+CursorDirection = Literal["next", "previous"]
+
+# "estimated" trades accuracy of large counts for speed. See: `Count`.
+CountMode = Literal["exact", "estimated"]
+
 
 class Page(BaseModel):
     number: Annotated[int, Field(ge=1, le=10_000)] = 1
     size: Annotated[int, Field(ge=1, le=100)] = 10
+    # Keyset pagination: when set, takes precedence over 'number'.
+    cursor: Optional[str] = None
+
+    class Config:
+        allow_mutation = False
+
+
+class Cursor(BaseModel):
+    """
+    A position in a listing, for use with keyset (a.k.a. "seek") pagination.
+
+    `key` is the sort key of the item at the edge of a page. `direction` tells
+    whether to read items that come after or before this item.
+
+    Cursors are exposed to clients as opaque strings, see `encode()` and `decode()`.
+    """
+
+    key: List[Any]
+    direction: CursorDirection = "next"
+
+    class Config:
+        allow_mutation = False
+
+    def encode(self) -> str:
+        return base64.urlsafe_b64encode(self.json().encode()).decode()
+
+    @classmethod
+    def decode(cls, value: str) -> "Cursor":
+        try:
+            return cls.parse_raw(base64.urlsafe_b64decode(value.encode()))
+        except ValueError:
+            raise InvalidCursor(value)
+
+
+class Count(BaseModel):
+    value: int
+    estimated: bool = False
+
+    class Config:
+        allow_mutation = False
+
+
+class PageCursors(BaseModel):
+    next: Optional[str] = None
+    previous: Optional[str] = None
 
     class Config:
         allow_mutation = False
@@ -20,10 +73,13 @@ class Page(BaseModel):
 class Pagination(GenericModel, Generic[T]):
     items: List[T]
     total_items: int
+    total_items_estimated: bool = False
     page_size: int
     total_pages: Computed[int] = Field(
         Computed.Expr("math.ceil(total_items / page_size)")
     )
+    next_cursor: Optional[str] = None
+    previous_cursor: Optional[str] = None
 
     class Config:
         allow_mutation = False
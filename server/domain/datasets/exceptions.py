@@ -3,3 +3,8 @@ from ..common.exceptions import DoesNotExist
 
 class DatasetDoesNotExist(DoesNotExist):
     entity_name = "Dataset"
+
+
+class CannotInsertDatasets(Exception):
+    def __init__(self, count: int) -> None:
+        super().__init__(f"Could not insert {count} datasets")
@@ -1,12 +1,13 @@
-from typing import List, Optional, Set, Tuple
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
 
 from typing_extensions import TypedDict
 
 from server.seedwork.domain.repositories import Repository
 
-from ..common.pagination import Page
+from ..common.pagination import Count, CountMode, Page, PageCursors
 from ..common.types import ID, id_factory
-from .entities import Dataset
+from ..tags.entities import Tag
+from .entities import DataFormat, Dataset
 from .specifications import DatasetSpec
 
 
@@ -19,34 +20,89 @@ class DatasetGetAllExtras(TypedDict, total=False):
     headlines: DatasetHeadlines
 
 
+class DatasetSuggestion(TypedDict):
+    id: ID
+    title: str
+
+
+class DatasetFilterValues(TypedDict):
+    geographical_coverage: Set[str]
+    service: Set[str]
+    technical_source: Set[str]
+    license: Set[str]
+    tags: List[Tag]
+
+
+class DatasetFacetCounts(TypedDict):
+    geographical_coverage: Dict[str, int]
+    service: Dict[str, int]
+    format: Dict[DataFormat, int]
+    technical_source: Dict[str, int]
+    tag_id: Dict[ID, int]
+    license: Dict[str, int]
+
+
 class DatasetRepository(Repository):
     def make_id(self) -> ID:
         return id_factory()
 
     async def get_all(
-        self, *, page: Page = Page(), spec: DatasetSpec = DatasetSpec()
-    ) -> Tuple[List[Tuple[Dataset, DatasetGetAllExtras]], int]:
+        self,
+        *,
+        page: Page = Page(),
+        spec: DatasetSpec = DatasetSpec(),
+        count_mode: CountMode = "exact",
+    ) -> Tuple[List[Tuple[Dataset, DatasetGetAllExtras]], Count, PageCursors]:
+        raise NotImplementedError  # pragma: no cover
+
+    def stream_all(self) -> AsyncIterator[Dataset]:
+        raise NotImplementedError  # pragma: no cover
+
+    async def get_facet_counts(
+        self, *, spec: DatasetSpec = DatasetSpec()
+    ) -> DatasetFacetCounts:
         raise NotImplementedError  # pragma: no cover
 
     async def get_by_id(self, id: ID) -> Optional[Dataset]:
         raise NotImplementedError  # pragma: no cover
 
-    async def get_geographical_coverage_set(self) -> Set[str]:
+    async def get_many(self, ids: Sequence[ID]) -> List[Dataset]:
+        """
+        Return existing datasets among `ids`, in no particular order.
+        """
         raise NotImplementedError  # pragma: no cover
 
-    async def get_service_set(self) -> Set[str]:
+    async def get_suggestions(self, q: str, *, limit: int) -> List[DatasetSuggestion]:
+        """
+        Return datasets whose title looks like `q`, best matches first.
+
+        Meant for autocompletion: tolerates typos and incomplete words.
+        """
         raise NotImplementedError  # pragma: no cover
 
-    async def get_technical_source_set(self) -> Set[str]:
+    async def get_filter_values(self) -> DatasetFilterValues:
         raise NotImplementedError  # pragma: no cover
 
     async def get_license_set(self) -> Set[str]:
         raise NotImplementedError  # pragma: no cover
 
-    async def insert(self, entity: Dataset) -> ID:
+    async def insert(self, entity: Dataset) -> Dataset:
+        """
+        Insert a dataset along with its catalog record, and return it as persisted,
+        e.g. with the catalog record creation date set by the database.
+        """
+        raise NotImplementedError  # pragma: no cover
+
+    async def insert_many(self, entities: List[Dataset]) -> List[ID]:
+        """
+        Insert all of `entities`, or none of them.
+
+        Raises `CannotInsertDatasets` if the database rejects them. The enclosing
+        transaction, if any, may still be committed.
+        """
         raise NotImplementedError  # pragma: no cover
 
-    async def update(self, entity: Dataset) -> None:
+    async def update(self, entity: Dataset) -> Dataset:
         raise NotImplementedError  # pragma: no cover
 
     async def delete(self, id: ID) -> None:
@@ -0,0 +1,33 @@
+from typing import List, Tuple
+
+from ..common.pagination import Count, CountMode, Page, PageCursors
+from .entities import Dataset
+from .repositories import DatasetFacetCounts, DatasetGetAllExtras
+from .specifications import DatasetSpec
+
+
+class SearchIndex:
+    """
+    Full-text search over datasets, i.e. listings whose spec has a `search_term`.
+
+    Results are sorted by relevance, and support the same filters, pagination and
+    facets as `DatasetRepository.get_all()`.
+    """
+
+    async def load(self) -> None:
+        """
+        Prepare the index for searching, e.g. when the server starts.
+        """
+        raise NotImplementedError  # pragma: no cover
+
+    async def search(
+        self,
+        *,
+        page: Page = Page(),
+        spec: DatasetSpec,
+        count_mode: CountMode = "exact",
+    ) -> Tuple[List[Tuple[Dataset, DatasetGetAllExtras]], Count, PageCursors]:
+        raise NotImplementedError  # pragma: no cover
+
+    async def get_facet_counts(self, *, spec: DatasetSpec) -> DatasetFacetCounts:
+        raise NotImplementedError  # pragma: no cover
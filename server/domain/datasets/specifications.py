@@ -1,14 +1,43 @@
+import enum
 from dataclasses import dataclass
-from typing import Optional, Sequence
+from typing import Literal, Optional, Sequence
 
 from server.domain.common.types import ID
 
 from .entities import DataFormat
 
+# "plain" matches whole words of the search term, "prefix" also matches words
+# that start with them, e.g. for searching as the user types.
+SearchMode = Literal["plain", "prefix"]
+
+# Shorter words are matched as whole words in "prefix" mode. Shorter prefixes
+# match too many datasets to be worth ranking, e.g. 'tra' matches a fifth of a
+# seeded catalog, and clients may use autocompletion for them instead.
+PREFIX_MIN_LENGTH = 4
+
+
+class SearchRankNormalization(enum.IntFlag):
+    """
+    How search ranks account for the length of matching datasets. Flags may be
+    combined, e.g. `LOG_LENGTH | UNIT_RANGE`.
+
+    See: https://www.postgresql.org/docs/12/textsearch-controls.html#TEXTSEARCH-RANKING
+    """
+
+    NONE = 0
+    LOG_LENGTH = 1  # Divide by 1 + log(number of words).
+    LENGTH = 2  # Divide by the number of words.
+    EXTENT = 4  # Divide by the mean distance between matching words.
+    UNIQUE_WORDS = 8  # Divide by the number of unique words.
+    LOG_UNIQUE_WORDS = 16  # Divide by 1 + log(number of unique words).
+    UNIT_RANGE = 32  # Scale to [0, 1), as rank / (rank + 1).
+
 
 @dataclass(frozen=True)
 class DatasetSpec:
     search_term: Optional[str] = None
+    search_mode: SearchMode = "plain"
+    search_rank_normalization: SearchRankNormalization = SearchRankNormalization.NONE
     geographical_coverage__in: Optional[Sequence[str]] = None
     service__in: Optional[Sequence[str]] = None
     format__in: Optional[Sequence[DataFormat]] = None
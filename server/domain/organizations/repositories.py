@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional, Sequence
 
 from server.domain.organizations.types import Siret
 from server.seedwork.domain.repositories import Repository
@@ -10,5 +10,11 @@ class OrganizationRepository(Repository):
     async def get_by_siret(self, siret: Siret) -> Optional[Organization]:
         raise NotImplementedError  # pragma: no cover
 
+    async def get_many_by_siret(self, sirets: Sequence[Siret]) -> List[Organization]:
+        """
+        Return existing organizations among `sirets`, in no particular order.
+        """
+        raise NotImplementedError  # pragma: no cover
+
     async def insert(self, entity: Organization) -> Siret:
         raise NotImplementedError  # pragma: no cover
@@ -1,8 +1,16 @@
-from typing import Any, Awaitable, Callable, Dict, Type, TypeVar, Union
+import functools
+from typing import Any, Awaitable, Callable, TypeVar, Union
 
 from server.seedwork.application.commands import Command
+from server.seedwork.application.events import Event
 from server.seedwork.application.messages import MessageBus
 from server.seedwork.application.queries import Query
+from server.seedwork.application.types import (
+    CommandHandlers,
+    EventHandlers,
+    QueryHandlers,
+)
+from server.seedwork.application.unit_of_work import UnitOfWork
 
 T = TypeVar("T")
 F = TypeVar("F", bound=Callable[..., Awaitable])
@@ -11,11 +19,15 @@ F = TypeVar("F", bound=Callable[..., Awaitable])
 class MessageBusAdapter(MessageBus):
     def __init__(
         self,
-        command_handlers: Dict[Type[Command], Callable[..., Awaitable]],
-        query_handlers: Dict[Type[Query], Callable[..., Awaitable]],
+        command_handlers: CommandHandlers,
+        query_handlers: QueryHandlers,
+        unit_of_work: UnitOfWork,
+        event_handlers: EventHandlers = None,
     ) -> None:
         self.command_handlers = command_handlers
         self.query_handlers = query_handlers
+        self.event_handlers = {} if event_handlers is None else event_handlers
+        self.unit_of_work = unit_of_work
 
     async def execute(self, message: Union[Command[T], Query[T]], **kwargs: Any) -> T:
         try:
@@ -26,4 +38,15 @@ class MessageBusAdapter(MessageBus):
         except KeyError:
             raise NotImplementedError(f"No handler for {type(message)}")
 
-        return await handler(message, **kwargs)
+        if isinstance(message, Command):
+            # Commands are atomic.
+            async with self.unit_of_work.transaction():
+                return await handler(message, **kwargs)
+
+        # Queries may read from a replica.
+        async with self.unit_of_work.read_only():
+            return await handler(message, **kwargs)
+
+    def publish(self, event: Event) -> None:
+        for handler in self.event_handlers.get(type(event), []):
+            self.unit_of_work.on_commit(functools.partial(handler, event))
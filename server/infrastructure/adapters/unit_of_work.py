@@ -0,0 +1,19 @@
+from typing import AsyncContextManager, Callable
+
+from server.seedwork.application.unit_of_work import UnitOfWork
+
+from ..database import Database
+
+
+class SqlUnitOfWork(UnitOfWork):
+    def __init__(self, db: Database) -> None:
+        self._db = db
+
+    def transaction(self) -> AsyncContextManager:
+        return self._db.transaction()
+
+    def read_only(self) -> AsyncContextManager:
+        return self._db.read_only()
+
+    def on_commit(self, callback: Callable[[], None]) -> None:
+        self._db.on_commit(callback)
@@ -1,3 +1,6 @@
+import asyncio
+from concurrent.futures import Executor
+
 import argon2
 from pydantic import SecretStr
 
@@ -5,15 +8,48 @@ from server.application.auth.passwords import PasswordEncoder
 
 
 class Argon2PasswordEncoder(PasswordEncoder):
-    def __init__(self) -> None:
-        self._hasher = argon2.PasswordHasher()
+    """
+    Hash passwords using Argon2.
+
+    Hashing runs in `executor`, so that it doesn't block the event loop. argon2-cffi
+    releases the GIL while hashing, so a thread pool executor is enough to get
+    parallelism. If no executor is given, the event loop's default executor is used.
+
+    Cost parameters default to those of `argon2.PasswordHasher`. Hashes store the
+    parameters they were made with, so changing them doesn't invalidate existing
+    passwords.
+    """
+
+    def __init__(
+        self,
+        *,
+        time_cost: int = argon2.DEFAULT_TIME_COST,
+        memory_cost: int = argon2.DEFAULT_MEMORY_COST,
+        parallelism: int = argon2.DEFAULT_PARALLELISM,
+        executor: Executor = None,
+    ) -> None:
+        self._hasher = argon2.PasswordHasher(
+            time_cost=time_cost,
+            memory_cost=memory_cost,
+            parallelism=parallelism,
+        )
+        self._executor = executor
+
+    async def hash(self, password: SecretStr) -> str:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self._hasher.hash, password.get_secret_value()
+        )
 
-    def hash(self, password: SecretStr) -> str:
-        return self._hasher.hash(password.get_secret_value())
+    async def verify(self, password: SecretStr, hash: str) -> bool:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self._verify, password.get_secret_value(), hash
+        )
 
-    def verify(self, password: SecretStr, hash: str) -> bool:
+    def _verify(self, password: str, hash: str) -> bool:
         try:
-            return self._hasher.verify(hash, password.get_secret_value())
+            return self._hasher.verify(hash, password)
         except argon2.exceptions.VerificationError:
             return False
         except argon2.exceptions.InvalidHash:
@@ -36,7 +36,9 @@ class UserModel(Base):
     email = Column(String, nullable=False, unique=True, index=True)
     password_hash = Column(String, nullable=False)
     role = Column(Enum(UserRole, name="user_role_enum"), nullable=False)
-    api_token = Column(String(API_TOKEN_LENGTH), nullable=False)
+    api_token = Column(
+        String(API_TOKEN_LENGTH), nullable=False, unique=True, index=True
+    )
 
 
 def update_instance(instance: UserModel, entity: User) -> None:
@@ -80,7 +82,7 @@ class SqlUserRepository(UserRepository):
             return User.from_orm(instance)
 
     async def insert(self, entity: User) -> ID:
-        async with self._db.session() as session:
+        async with self._db.transaction() as session:
             instance = UserModel(
                 id=entity.id,
                 organization_siret=entity.organization_siret,
@@ -91,14 +93,12 @@ class SqlUserRepository(UserRepository):
             )
 
             session.add(instance)
-
-            await session.commit()
-            await session.refresh(instance)
+            await session.flush()
 
             return ID(instance.id)
 
     async def update(self, entity: User) -> None:
-        async with self._db.session() as session:
+        async with self._db.transaction() as session:
             instance = await self._maybe_get_by(session, id=entity.id)
 
             if instance is None:
@@ -106,10 +106,7 @@ class SqlUserRepository(UserRepository):
 
             update_instance(instance, entity)
 
-            await session.commit()
-
     async def delete(self, id: ID) -> None:
-        async with self._db.session() as session:
+        async with self._db.transaction() as session:
             stmt = delete(UserModel).where(UserModel.id == id)
             await session.execute(stmt)
-            await session.commit()
@@ -1,7 +1,7 @@
 import datetime as dt
 from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import CHAR, Column, DateTime, ForeignKey, func, select
+from sqlalchemy import CHAR, Column, DateTime, ForeignKey, Index, func, select
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.orm import relationship
@@ -41,6 +41,16 @@ class CatalogRecordModel(Base):
         back_populates="catalog_record",
     )
 
+    # Read server-generated values, such as created_at, upon INSERT (using
+    # RETURNING) rather than on next access.
+    __mapper_args__ = {"eager_defaults": True}
+
+    __table_args__ = (
+        # Supports the default sort order of dataset listings, and seeking to
+        # a cursor position (keyset pagination).
+        Index("ix_catalog_record_created_at_id", created_at, id),
+    )
+
 
 def make_entity(instance: CatalogRecordModel) -> CatalogRecord:
     return CatalogRecord(
@@ -60,6 +70,11 @@ def make_instance(entity: CatalogRecord) -> CatalogRecordModel:
     )
 
 
+def make_row(entity: CatalogRecord) -> dict:
+    # For use with Core INSERT statements, which bypass the ORM.
+    return entity.dict(exclude={"created_at"})  # See: `make_instance()`.
+
+
 class SqlCatalogRecordRepository(CatalogRecordRepository):
     def __init__(self, db: Database) -> None:
         self._db = db
@@ -76,12 +91,10 @@ class SqlCatalogRecordRepository(CatalogRecordRepository):
                 return make_entity(instance)
 
     async def insert(self, entity: CatalogRecord) -> ID:
-        async with self._db.session() as session:
+        async with self._db.transaction() as session:
             instance = make_instance(entity)
 
             session.add(instance)
-
-            await session.commit()
-            await session.refresh(instance)
+            await session.flush()
 
             return ID(instance.id)
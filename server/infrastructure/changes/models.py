@@ -0,0 +1,105 @@
+import datetime as dt
+import uuid
+from typing import Iterable, Set
+
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    Integer,
+    bindparam,
+    cast,
+    event,
+    func,
+    insert,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from server.domain.common.types import ID
+
+from ..database import Base
+
+CATALOG_VERSION_ID = 1
+
+# Session info key, set when the catalog changed in the session's transaction.
+# Holds the IDs of changed datasets.
+_CATALOG_CHANGES = "catalog_changes"
+
+
+class CatalogVersionModel(Base):
+    # Single-row table, see: `bump_catalog_version()`.
+    __tablename__ = "catalog_version"
+
+    id: int = Column(Integer, primary_key=True)
+    value: int = Column(BigInteger, nullable=False)
+    changed_at: dt.datetime = Column(
+        DateTime(timezone=True),
+        server_default=func.clock_timestamp(),
+        nullable=False,
+    )
+
+
+class DatasetChangeModel(Base):
+    # Datasets created, updated or deleted at each catalog version, so that
+    # copies of the catalog, e.g. search indexes, can catch up with changes.
+    # See: `bump_catalog_version()`.
+    __tablename__ = "dataset_change"
+
+    catalog_version: int = Column(BigInteger, primary_key=True)
+    # Not a foreign key: deleted datasets are recorded too.
+    dataset_id: uuid.UUID = Column(UUID(as_uuid=True), primary_key=True)
+
+
+def bump_catalog_version(session: AsyncSession, dataset_ids: Iterable[ID] = ()) -> None:
+    """
+    Record a change to the catalog, made in the transaction of `session`, along
+    with the datasets it affects, if any.
+
+    The version is bumped at the end of the transaction, so that readers can't see
+    the new version along with old data. As versions are assigned in commit order,
+    readers that see a version can also see all changes recorded up to it.
+
+    NOTE: the bump locks the catalog version row until the transaction commits,
+    so committing writers are serialized. Bumping last keeps the lock for the
+    duration of the commit only, rather than e.g. of a bulk import.
+    """
+    changed_ids: Set[ID] = session.info.setdefault(_CATALOG_CHANGES, set())
+    changed_ids.update(dataset_ids)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_catalog_version_on_commit(session: Session) -> None:
+    # Also called when SAVEPOINTs are released, which don't end the transaction.
+    if session.in_nested_transaction():
+        return
+
+    if (changed_ids := session.info.pop(_CATALOG_CHANGES, None)) is None:
+        return
+
+    bump = (
+        update(CatalogVersionModel)
+        .where(CatalogVersionModel.id == CATALOG_VERSION_ID)
+        .values(
+            value=CatalogVersionModel.value + 1,
+            changed_at=func.clock_timestamp(),
+        )
+    )
+
+    if not changed_ids:
+        session.execute(bump)
+        return
+
+    # Record changed datasets along with the new version, in one statement
+    # whatever the number of datasets, e.g. in bulk imports.
+    version = bump.returning(CatalogVersionModel.value).cte("version")
+    ids_type = ARRAY(UUID(as_uuid=True))
+    ids = cast(bindparam("ids", list(changed_ids), type_=ids_type), ids_type)
+    stmt = insert(DatasetChangeModel).from_select(
+        ["catalog_version", "dataset_id"],
+        select(version.c.value, func.unnest(ids)),
+    )
+    session.execute(stmt.add_cte(version))  # type: ignore[attr-defined]
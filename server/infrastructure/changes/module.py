@@ -0,0 +1,12 @@
+from server.application.changes.handlers import get_catalog_version, get_dataset_version
+from server.application.changes.queries import GetCatalogVersion, GetDatasetVersion
+from server.seedwork.application.modules import Module
+
+from . import models  # noqa  # Trigger SQLAlchemy table discovery.
+
+
+class ChangesModule(Module):
+    query_handlers = {
+        GetCatalogVersion: get_catalog_version,
+        GetDatasetVersion: get_dataset_version,
+    }
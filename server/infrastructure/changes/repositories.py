@@ -0,0 +1,51 @@
+from typing import List, Optional
+
+from sqlalchemy import select
+
+from server.domain.changes.entities import ChangeVersion
+from server.domain.changes.repositories import ChangeVersionRepository
+from server.domain.common.types import ID
+
+from ..database import Database
+from ..datasets.models import DatasetModel
+from .models import CATALOG_VERSION_ID, CatalogVersionModel, DatasetChangeModel
+
+
+class SqlChangeVersionRepository(ChangeVersionRepository):
+    # NOTE: versions are read using plain column selects, so that checking
+    # whether a client's copy is up to date costs as little as possible.
+
+    def __init__(self, db: Database) -> None:
+        self._db = db
+
+    async def get_catalog_version(self) -> ChangeVersion:
+        async with self._db.session() as session:
+            stmt = select(
+                CatalogVersionModel.value, CatalogVersionModel.changed_at
+            ).where(CatalogVersionModel.id == CATALOG_VERSION_ID)
+            result = await session.execute(stmt)
+            row = result.one()
+            return ChangeVersion(value=row.value, changed_at=row.changed_at)
+
+    async def get_dataset_version(self, id: ID) -> Optional[ChangeVersion]:
+        async with self._db.session() as session:
+            stmt = select(DatasetModel.version, DatasetModel.changed_at).where(
+                DatasetModel.id == id
+            )
+            result = await session.execute(stmt)
+            row = result.one_or_none()
+
+            if row is None:
+                return None
+
+            return ChangeVersion(value=row.version, changed_at=row.changed_at)
+
+    async def get_changed_dataset_ids(self, since: int) -> List[ID]:
+        async with self._db.session() as session:
+            stmt = (
+                select(DatasetChangeModel.dataset_id)
+                .where(DatasetChangeModel.catalog_version > since)
+                .distinct()
+            )
+            result = await session.execute(stmt)
+            return [ID(id) for id in result.scalars()]
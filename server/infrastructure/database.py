@@ -1,8 +1,16 @@
-from contextlib import asynccontextmanager
-from typing import AsyncIterator
+import contextvars
+import itertools
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Iterator, List, Optional, cast
 
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
-from sqlalchemy.orm import DeclarativeMeta, registry, sessionmaker
+from sqlalchemy.orm import DeclarativeMeta, Session, registry, sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from .metrics.pool import InstrumentedPool
 
 mapper_registry = registry()
 
@@ -21,27 +29,256 @@ class Base(metaclass=DeclarativeMeta):
     __init__ = mapper_registry.constructor
 
 
+class _Transaction:
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+        self.on_commit: List[Callable[[], None]] = []
+
+
+_transaction: contextvars.ContextVar[Optional[_Transaction]] = contextvars.ContextVar(
+    "transaction", default=None
+)
+
+_read_only: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "read_only", default=False
+)
+
+_replica: contextvars.ContextVar[Optional[sessionmaker]] = contextvars.ContextVar(
+    "replica", default=None
+)
+
+
+class DatabaseClient:
+    """
+    A client of the database, e.g. the sender of an HTTP request.
+    """
+
+    def __init__(self, last_write_at: float = None) -> None:
+        # When the client last committed changes, as a UNIX timestamp.
+        self.last_write_at = last_write_at
+
+
+_client: contextvars.ContextVar[Optional[DatabaseClient]] = contextvars.ContextVar(
+    "client", default=None
+)
+
+
 class Database:
-    def __init__(self, url: str, debug: bool = False) -> None:
-        self._engine = create_async_engine(url, future=True)
+    def __init__(
+        self,
+        url: str,
+        *,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        pool_timeout: float = 30,
+        pool_recycle: int = -1,
+        pool_pre_ping: bool = False,
+        statement_cache_size: int = 100,
+        statement_timeout: float = 0,
+        replica_urls: List[str] = None,
+        read_your_writes_window: float = 5,
+    ) -> None:
+        connect_args: dict = {
+            # Prepared statements are cached per connection, so they are reused
+            # by any session that checks out the connection from the pool.
+            # See: https://docs.sqlalchemy.org/en/14/dialects/postgresql.html#prepared-statement-cache  # noqa
+            "prepared_statement_cache_size": statement_cache_size,
+        }
+
+        if statement_timeout:
+            # Let PostgreSQL cancel runaway statements.
+            # See: https://www.postgresql.org/docs/12/runtime-config-client.html
+            connect_args["server_settings"] = {
+                "statement_timeout": str(int(statement_timeout * 1000)),  # ms
+            }
+
+        def create_engine(url: str) -> AsyncEngine:
+            return create_async_engine(
+                url,
+                future=True,
+                poolclass=InstrumentedPool,
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                pool_timeout=pool_timeout,
+                pool_recycle=pool_recycle,
+                pool_pre_ping=pool_pre_ping,
+                connect_args=connect_args,
+            )
+
+        self._engine = create_engine(url)
         self._session_cls = sessionmaker(
             bind=self._engine, class_=AsyncSession, future=True
         )
 
+        # Read replicas, used in turn by read-only blocks. Each has its own pool.
+        self._replica_engines = [create_engine(url) for url in replica_urls or []]
+        self._replica_session_clses = itertools.cycle(
+            [
+                sessionmaker(bind=engine, class_=AsyncSession, future=True)
+                for engine in self._replica_engines
+            ]
+        )
+
+        # Clients that committed changes this recently read from the primary,
+        # until replicas have caught up.
+        self._read_your_writes_window = read_your_writes_window
+
     @property
     def engine(self) -> AsyncEngine:
         return self._engine
 
-    def session(self) -> AsyncSession:
-        return self._session_cls()
+    @property
+    def pool(self) -> QueuePool:
+        return cast(QueuePool, self._engine.sync_engine.pool)
+
+    @property
+    def replica_engines(self) -> List[AsyncEngine]:
+        return self._replica_engines
+
+    async def dispose(self) -> None:
+        for engine in [self._engine, *self._replica_engines]:
+            await engine.dispose()
+
+    @property
+    def read_your_writes_window(self) -> float:
+        return self._read_your_writes_window
+
+    @contextmanager
+    def client(self, last_write_at: float = None) -> Iterator[DatabaseClient]:
+        """
+        Attribute reads and writes made within the block to a client, e.g. the
+        sender of an HTTP request, so that they see their own changes.
+
+        Clients carry `last_write_at` along, e.g. in a cookie, so that any process
+        knows they wrote recently. Commits made within the block update it.
+
+        All read-only blocks within the block use the same replica.
+        """
+        client = DatabaseClient(last_write_at)
+        token = _client.set(client)
+        try:
+            with self._pin_replica():
+                yield client
+        finally:
+            _client.reset(token)
+
+    @asynccontextmanager
+    async def read_only(self) -> AsyncIterator[None]:
+        """
+        Run a block that makes no changes. Its sessions may read from a replica,
+        which may lag behind the primary. They all read from the same replica.
+
+        Clients that committed changes less than `read_your_writes_window` seconds
+        ago keep reading from the primary. Transactions always use the primary.
+        """
+        token = _read_only.set(True)
+        try:
+            with self._pin_replica():
+                yield
+        finally:
+            _read_only.reset(token)
+
+    @contextmanager
+    def _pin_replica(self) -> Iterator[None]:
+        # Replicas lag behind by different amounts: reading from several ones
+        # could show changes, then hide them.
+        if not self._replica_engines or _replica.get() is not None:
+            yield
+            return
+
+        token = _replica.set(next(self._replica_session_clses))
+        try:
+            yield
+        finally:
+            _replica.reset(token)
+
+    def _use_replica(self) -> bool:
+        if not self._replica_engines or not _read_only.get():
+            return False
+
+        client = _client.get()
+
+        return (
+            client is None
+            or client.last_write_at is None
+            or time.time() - client.last_write_at >= self._read_your_writes_window
+        )
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AsyncSession]:
+        """
+        Use the session of the current transaction, or a new session if there
+        is no current transaction.
+        """
+        if (tx := _transaction.get()) is not None:
+            yield tx.session
+            return
+
+        session_cls = self._session_cls
+
+        if self._use_replica() and (replica := _replica.get()) is not None:
+            session_cls = replica
+
+        async with session_cls() as session:
+            yield session
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[AsyncSession]:
+        """
+        Run a block in a transaction, committed on exit unless an error occurs.
+
+        Any session used within the block, by this task or by tasks it spawns,
+        is the session of the transaction. Nested transactions are part of the
+        outermost one.
+        """
+        if (tx := _transaction.get()) is not None:
+            yield tx.session
+            return
+
+        async with self._session_cls() as session:
+            tx = _Transaction(session)
+            token = _transaction.set(tx)
+            try:
+                async with session.begin():
+                    yield session
+            finally:
+                _transaction.reset(token)
+
+        if (client := _client.get()) is not None:
+            client.last_write_at = time.time()
+
+        for callback in tx.on_commit:
+            callback()
+
+    def on_commit(self, callback: Callable[[], None]) -> None:
+        """
+        Call `callback` once the current transaction is committed, or right away
+        if there is no current transaction.
+        """
+        if (tx := _transaction.get()) is None:
+            callback()
+        else:
+            tx.on_commit.append(callback)
 
     @asynccontextmanager
     async def autorollback(self) -> AsyncIterator[None]:
         async with self._engine.connect() as conn:
+            sync_conn = cast(Connection, conn.sync_connection)
+
+            # Sessions bound to a connection in a SAVEPOINT commit or roll back
+            # the SAVEPOINT, so start a new one each time a session is done.
+            # See: https://docs.sqlalchemy.org/en/14/orm/session_transaction.html#joining-a-session-into-an-external-transaction-such-as-for-test-suites  # noqa
+            def restart_savepoint(session: Session, transaction: Any) -> None:
+                if not sync_conn.in_nested_transaction():
+                    sync_conn.begin_nested()
+
             self._session_cls.configure(bind=conn)
+            event.listen(Session, "after_transaction_end", restart_savepoint)
             try:
                 async with conn.begin() as tx:
+                    await conn.begin_nested()
                     yield
                     await tx.rollback()
             finally:
+                event.remove(Session, "after_transaction_end", restart_savepoint)
                 self._session_cls.configure(bind=self._engine)
@@ -1,16 +1,18 @@
+import datetime as dt
 import uuid
 from typing import List
 
 from sqlalchemy import (
     Column,
-    Computed,
     DateTime,
     Enum,
+    FetchedValue,
     ForeignKey,
     Index,
     Integer,
     String,
     Table,
+    func,
 )
 from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR, UUID
 from sqlalchemy.orm import Mapped, relationship
@@ -26,7 +28,7 @@ from ..tags.repositories import TagModel, dataset_tag
 dataset_dataformat = Table(
     "dataset_dataformat",
     mapper_registry.metadata,
-    Column("dataset_id", ForeignKey("dataset.id"), primary_key=True),
+    Column("dataset_id", ForeignKey("dataset.id"), primary_key=True, index=True),
     Column("dataformat_id", ForeignKey("dataformat.id"), primary_key=True),
 )
 
@@ -81,9 +83,21 @@ class DatasetModel(Base):
         "TagModel", back_populates="datasets", secondary=dataset_tag
     )
 
+    # Incremented on every update, see: `SqlChangeVersionRepository`.
+    version: int = Column(Integer, server_default="1", nullable=False)
+    changed_at: dt.datetime = Column(
+        DateTime(timezone=True),
+        server_default=func.clock_timestamp(),
+        nullable=False,
+    )
+
+    # Weighted text search vector over title (A), service, geographical coverage
+    # and tags (B), and description (C). Maintained by database triggers, as tags
+    # live in a separate table. See migration `d41c8e7f5a36`.
     search_tsv: Mapped[str] = Column(
         TSVECTOR,
-        Computed("to_tsvector('french', title || ' ' || description)", persisted=True),
+        server_default=FetchedValue(),
+        server_onupdate=FetchedValue(),
     )
 
     __table_args__ = (
@@ -92,4 +106,11 @@ class DatasetModel(Base):
             search_tsv,
             postgresql_using="GIN",
         ),
+        # Requires the pg_trgm extension.
+        Index(
+            "ix_dataset_title_trgm",
+            title,
+            postgresql_using="GIN",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
     )
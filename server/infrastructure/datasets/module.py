@@ -1,20 +1,26 @@
 from server.application.datasets.commands import (
+    BulkCreateDatasets,
     CreateDataset,
     DeleteDataset,
     UpdateDataset,
 )
 from server.application.datasets.handlers import (
+    bulk_create_datasets,
     create_dataset,
     delete_dataset,
+    export_datasets,
     get_all_datasets,
     get_dataset_by_id,
     get_dataset_filters,
+    get_dataset_suggestions,
     update_dataset,
 )
 from server.application.datasets.queries import (
+    ExportDatasets,
     GetAllDatasets,
     GetDatasetByID,
     GetDatasetFilters,
+    GetDatasetSuggestions,
 )
 from server.seedwork.application.modules import Module
 
@@ -22,6 +28,7 @@ from server.seedwork.application.modules import Module
 class DatasetsModule(Module):
     command_handlers = {
         CreateDataset: create_dataset,
+        BulkCreateDatasets: bulk_create_datasets,
         UpdateDataset: update_dataset,
         DeleteDataset: delete_dataset,
     }
@@ -30,4 +37,6 @@ class DatasetsModule(Module):
         GetAllDatasets: get_all_datasets,
         GetDatasetByID: get_dataset_by_id,
         GetDatasetFilters: get_dataset_filters,
+        GetDatasetSuggestions: get_dataset_suggestions,
+        ExportDatasets: export_datasets,
     }
@@ -0,0 +1,28 @@
+from sqlalchemy import select
+from sqlalchemy.engine import Row
+
+from server.domain.datasets.entities import Dataset
+from server.infrastructure.catalog_records.repositories import CatalogRecordModel
+
+from ..models import DatasetModel
+from .rows import dataset_columns, make_dataset
+
+
+class ExportQuery:
+    """
+    Select all datasets, each from a single row.
+
+    Rows are meant to be read as a stream, in a constant amount of memory.
+    """
+
+    def __init__(self) -> None:
+        self.statement = (
+            select(*dataset_columns())
+            .join(DatasetModel.catalog_record)
+            .order_by(
+                CatalogRecordModel.created_at.desc(), CatalogRecordModel.id.desc()
+            )
+        )
+
+    def entity(self, row: Row) -> Dataset:
+        return make_dataset(row)
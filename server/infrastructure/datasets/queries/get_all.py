@@ -1,24 +1,61 @@
-from sqlalchemy import desc, func, select, text
+import datetime as dt
+import re
+import uuid
+from typing import Any, List, Optional, Sequence, Tuple
+
+from pydantic import ValidationError, parse_obj_as
+from sqlalchemy import bindparam, func, select, text, tuple_
 from sqlalchemy.engine import Row
-from sqlalchemy.orm import contains_eager, selectinload
+from sqlalchemy.sql import ColumnElement, Select
 
-from server.domain.datasets.repositories import DatasetGetAllExtras
-from server.domain.datasets.specifications import DatasetSpec
+from server.domain.common.exceptions import InvalidCursor
+from server.domain.common.pagination import Cursor, CursorDirection, Page, PageCursors
+from server.domain.datasets.entities import Dataset
+from server.domain.datasets.repositories import DatasetFacetCounts, DatasetGetAllExtras
+from server.domain.datasets.specifications import PREFIX_MIN_LENGTH, DatasetSpec
 from server.infrastructure.catalog_records.repositories import CatalogRecordModel
-from server.infrastructure.tags.repositories import TagModel
+from server.infrastructure.tags.repositories import TagModel, dataset_tag
+
+from ...helpers.sqlalchemy import to_limit_offset
+from ..models import DataFormatModel, DatasetModel, dataset_dataformat
+from .rows import dataset_columns, make_dataset
 
-from ..models import DataFormatModel, DatasetModel
+# Words of a search term, stripped of characters with a meaning in the
+# `to_tsquery()` syntax.
+_WORD_RE = re.compile(r"\w+")
 
 _TS_HEADLINE_TITLE_COL = "ts_headline_title"
 _TS_HEADLINE_DESCRIPTION_COL = "ts_headline_description"
 
+# Facets, in the order of facet columns.
+_FACETS = (
+    "geographical_coverage",
+    "service",
+    "format",
+    "technical_source",
+    "tag_id",
+    "license",
+)
+
+# GROUPING() sets a bit for each column that is not part of the grouping set of
+# a row, the first column being the most significant bit.
+_FACET_INDEX_BY_GROUPING = {
+    ((1 << len(_FACETS)) - 1) ^ (1 << (len(_FACETS) - 1 - index)): index
+    for index in range(len(_FACETS))
+}
+
 
 class GetAllQuery:
     def __init__(self, spec: DatasetSpec) -> None:
-        columns = []
-        joinclauses = []
         whereclauses = []
-        orderbyclauses = []
+
+        # Sort key, in descending order. Must identify rows uniquely, so that
+        # it can serve as a keyset pagination cursor.
+        sortkey: List[ColumnElement] = [
+            CatalogRecordModel.created_at,
+            CatalogRecordModel.id,
+        ]
+        self._ts_query: Optional[ColumnElement] = None
 
         if (search_term := spec.search_term) is not None:
             # Search using a PostgreSQL text search vector (TSV).
@@ -28,36 +65,36 @@ class GetAllQuery:
             # E.g. 'Forêts françaises' -> 'forêt' & 'français'
             ts_query = func.plainto_tsquery(text("'french'"), search_term)
 
-            # Compute search rank for each row
-            # https://www.postgresql.org/docs/12/textsearch-controls.html#TEXTSEARCH-RANKING
-            columns.append(
-                func.ts_rank_cd(DatasetModel.search_tsv, ts_query).label("rank")
-            )
-
-            # Compute headlines (highlight markers) for title and description.
-            # https://www.postgresql.org/docs/12/textsearch-controls.html#TEXTSEARCH-HEADLINE
-            columns.append(
-                func.ts_headline(
+            if spec.search_mode == "prefix" and (
+                words := _WORD_RE.findall(search_term)
+            ):
+                # Match words that start with those of the search term.
+                # E.g. 'Forêts fran' -> 'forêt':* & 'fran':*
+                ts_query = func.to_tsquery(
                     text("'french'"),
-                    DatasetModel.title,
-                    ts_query,
-                    text("'StartSel=<mark>, StopSel=</mark>, HighlightAll=1'"),
-                ).label(_TS_HEADLINE_TITLE_COL)
-            )
-            columns.append(
-                func.ts_headline(
-                    text("'french'"),
-                    DatasetModel.description,
-                    ts_query,
-                    text("'StartSel=<mark>, StopSel=</mark>, MaxFragments=10'"),
-                ).label(_TS_HEADLINE_DESCRIPTION_COL)
-            )
+                    " & ".join(
+                        f"{word}:*" if len(word) >= PREFIX_MIN_LENGTH else word
+                        for word in words
+                    ),
+                )
+
+            self._ts_query = ts_query
 
             # Drop rows that don't match the search query.
             whereclauses.append(DatasetModel.search_tsv.op("@@")(ts_query))
 
-            # Sort rows by search rank, best match first.
-            orderbyclauses.append(desc(text("rank")))
+            # Compute search rank for each row, and sort rows by search rank,
+            # best match first. Matches are weighted by the field they occur in,
+            # e.g. title matches rank higher than description matches.
+            # https://www.postgresql.org/docs/12/textsearch-controls.html#TEXTSEARCH-RANKING
+            sortkey.insert(
+                0,
+                func.ts_rank_cd(
+                    DatasetModel.search_tsv,
+                    ts_query,
+                    int(spec.search_rank_normalization),
+                ),
+            )
 
         if (geographical_coverages := spec.geographical_coverage__in) is not None:
             whereclauses.append(
@@ -67,16 +104,19 @@ class GetAllQuery:
         if (services := spec.service__in) is not None:
             whereclauses.append(DatasetModel.service.in_(services))
 
+        # NOTE: filters on related tables use EXISTS subqueries rather than joins.
+        # This avoids duplicate rows, and keeps the count statement join-free.
+
         if (formats := spec.format__in) is not None:
-            joinclauses.append((DatasetModel.formats, {"isouter": True}))
-            whereclauses.append(DataFormatModel.name.in_(formats))
+            whereclauses.append(
+                DatasetModel.formats.any(DataFormatModel.name.in_(formats))
+            )
 
         if (technical_sources := spec.technical_source__in) is not None:
             whereclauses.append(DatasetModel.technical_source.in_(technical_sources))
 
         if (tag_ids := spec.tag__id__in) is not None:
-            joinclauses.append((DatasetModel.tags, {"isouter": True}))
-            whereclauses.append(TagModel.id.in_(tag_ids))
+            whereclauses.append(DatasetModel.tags.any(TagModel.id.in_(tag_ids)))
 
         if (license := spec.license) is not None:
             if license == "*":
@@ -84,23 +124,204 @@ class GetAllQuery:
             else:
                 whereclauses.append(DatasetModel.license == license)
 
-        stmt = select(DatasetModel, *columns).join(DatasetModel.catalog_record)
+        self._sortkey = sortkey
+
+        # Minimal statement for counting results: no computed columns, no sorting,
+        # no eager loading. Catalog records are 1:1 with datasets, so there's no
+        # need to join them either.
+        self.count_statement = select(DatasetModel.id).where(*whereclauses)
 
-        for target, kwargs in joinclauses:
-            stmt = stmt.join(target, **kwargs)
+        # Statement for counting matching datasets by value of each filterable
+        # field, in one pass using GROUPING SETS.
+        # See: https://www.postgresql.org/docs/12/queries-table-expressions.html
+        facet_columns = [
+            DatasetModel.geographical_coverage,
+            DatasetModel.service,
+            DataFormatModel.name,
+            DatasetModel.technical_source,
+            dataset_tag.c.tag_id,
+            DatasetModel.license,
+        ]
+        self.facets_statement = (
+            select(
+                *facet_columns,
+                func.grouping(*facet_columns).label("grouping"),
+                # Joining formats and tags multiplies rows.
+                func.count(DatasetModel.id.distinct()).label("count"),
+            )
+            .select_from(DatasetModel)
+            .outerjoin(dataset_dataformat)
+            .outerjoin(DataFormatModel)
+            .outerjoin(dataset_tag)
+            .where(*whereclauses)
+            .group_by(func.grouping_sets(*facet_columns))
+        )
 
-        self.statement = (
-            stmt.options(
-                contains_eager(DatasetModel.catalog_record),
-                selectinload(DatasetModel.formats),
-                selectinload(DatasetModel.tags),
+        # Statement for selecting the IDs of matching datasets, along with their
+        # sort key. Pagination is applied to this statement, so that the expensive
+        # parts of the final statement only run on the rows of the requested page.
+        self._ranked_statement = (
+            select(
+                DatasetModel.id,
+                *(col.label(name) for col, name in zip(sortkey, self._sortkey_names)),
             )
+            .join(DatasetModel.catalog_record)
             .where(*whereclauses)
-            .order_by(*orderbyclauses, CatalogRecordModel.created_at.desc())
         )
 
-    def instance(self, row: Row) -> DatasetModel:
-        return row[0]
+    @property
+    def _ranked(self) -> bool:
+        return self._ts_query is not None
+
+    @property
+    def _sortkey_names(self) -> List[str]:
+        names = ["created_at", "catalog_record_id"]
+        if self._ranked:
+            names.insert(0, "rank")
+        return names
+
+    def paginate(self, page: Page) -> Select:
+        """
+        Return a statement that selects datasets on the requested page.
+
+        One extra row is fetched, so that `cursors()` can tell whether there are
+        more rows to read in the current direction.
+        """
+        ranked = self._ranked_statement
+        descending = True
+
+        if page.cursor is None:
+            limit, offset = to_limit_offset(page)
+            ranked = ranked.limit(limit + 1).offset(offset)
+        else:
+            # Keyset pagination: seek to the cursor using the sort key, instead of
+            # making the database walk through and discard 'offset' rows.
+            # See: https://use-the-index-luke.com/no-offset
+            cursor = Cursor.decode(page.cursor)
+            sortkey: ColumnElement = tuple_(*self._sortkey)
+            key: ColumnElement = tuple_(
+                *(
+                    bindparam(None, value, type_=col.type)
+                    for col, value in zip(self._sortkey, self._parse_key(cursor))
+                )
+            )
+
+            if cursor.direction == "next":
+                ranked = ranked.where(sortkey < key).limit(page.size + 1)
+            else:
+                # Read rows backwards from the cursor.
+                # They will be reversed in `cursors()`.
+                ranked = ranked.where(sortkey > key).limit(page.size + 1)
+                descending = False
+
+        ranked = ranked.order_by(
+            *(col.desc() if descending else col.asc() for col in self._sortkey)
+        )
+
+        pagerows = ranked.subquery("page")
+        columns = [pagerows.c[name] for name in self._sortkey_names]
+
+        extra_columns = []
+
+        if (ts_query := self._ts_query) is not None:
+            extra_columns.append(pagerows.c.rank)
+
+            # Compute headlines (highlight markers) for title and description.
+            # https://www.postgresql.org/docs/12/textsearch-controls.html#TEXTSEARCH-HEADLINE
+            extra_columns.append(
+                func.ts_headline(
+                    text("'french'"),
+                    DatasetModel.title,
+                    ts_query,
+                    text("'StartSel=<mark>, StopSel=</mark>, HighlightAll=1'"),
+                ).label(_TS_HEADLINE_TITLE_COL)
+            )
+            extra_columns.append(
+                func.ts_headline(
+                    text("'french'"),
+                    DatasetModel.description,
+                    ts_query,
+                    text("'StartSel=<mark>, StopSel=</mark>, MaxFragments=10'"),
+                ).label(_TS_HEADLINE_DESCRIPTION_COL)
+            )
+
+        # Datasets are read from flat rows, with formats and tags aggregated into
+        # arrays, rather than loaded as ORM instances.
+        return (
+            select(*dataset_columns(), *extra_columns)
+            .join(pagerows, pagerows.c.id == DatasetModel.id)
+            .join(DatasetModel.catalog_record)
+            .order_by(*(col.desc() if descending else col.asc() for col in columns))
+        )
+
+    def cursors(self, rows: Sequence[Row], page: Page) -> Tuple[List[Row], PageCursors]:
+        """
+        Trim rows fetched by `paginate()` to the page size, and compute cursors
+        pointing to the neighbouring pages.
+        """
+        has_more = len(rows) > page.size
+        rows = list(rows[: page.size])
+
+        if page.cursor is None:
+            has_next = has_more
+            has_previous = page.number > 1
+        elif Cursor.decode(page.cursor).direction == "next":
+            has_next = has_more
+            has_previous = True
+        else:
+            rows.reverse()
+            has_next = True
+            has_previous = has_more
+
+        if not rows:
+            return rows, PageCursors()
+
+        return rows, PageCursors(
+            next=self._cursor(rows[-1], "next") if has_next else None,
+            previous=self._cursor(rows[0], "previous") if has_previous else None,
+        )
+
+    def _cursor(self, row: Row, direction: CursorDirection) -> str:
+        key: List[Any] = [row.created_at, row.catalog_record_id]
+        if self._ranked:
+            key.insert(0, row.rank)
+        return Cursor(key=key, direction=direction).encode()
+
+    def _parse_key(self, cursor: Cursor) -> tuple:
+        keytype: Any = (
+            Tuple[float, dt.datetime, uuid.UUID]
+            if self._ranked
+            else Tuple[dt.datetime, uuid.UUID]
+        )
+        try:
+            return parse_obj_as(keytype, cursor.key)
+        except ValidationError:
+            # E.g. a cursor obtained from a non-search listing, used in a search.
+            raise InvalidCursor(cursor.encode())
+
+    def facet_counts(self, rows: Sequence[Row]) -> DatasetFacetCounts:
+        counts: DatasetFacetCounts = {name: {} for name in _FACETS}  # type: ignore
+
+        for row in rows:
+            index = _FACET_INDEX_BY_GROUPING[row.grouping]
+            name = _FACETS[index]
+            value = row[index]
+
+            if value is None:
+                # E.g. datasets with no license.
+                continue
+
+            if isinstance(value, uuid.UUID):
+                # Drivers may return UUID subclasses (e.g. asyncpg), which JSON
+                # encoders don't necessarily accept as mapping keys.
+                value = uuid.UUID(int=value.int)
+
+            counts[name][value] = row.count  # type: ignore
+
+        return counts
+
+    def entity(self, row: Row) -> Dataset:
+        return make_dataset(row)
 
     def extras(self, row: Row) -> DatasetGetAllExtras:
         try:
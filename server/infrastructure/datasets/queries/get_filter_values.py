@@ -0,0 +1,58 @@
+from typing import List, Set
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.engine import Row
+from sqlalchemy.sql import ColumnElement, Select
+
+from server.domain.datasets.repositories import DatasetFilterValues
+from server.domain.tags.entities import Tag
+from server.infrastructure.tags.repositories import TagModel
+
+from ..models import DatasetModel
+
+
+def _distinct_values(column: ColumnElement) -> ColumnElement:
+    return func.array_agg(column.distinct()).filter(column.is_not(None))
+
+
+def _tags_ordered(column: ColumnElement) -> ColumnElement:
+    return select(
+        func.array_agg(aggregate_order_by(column, TagModel.name, TagModel.id))
+    ).scalar_subquery()
+
+
+class GetFilterValuesQuery:
+    """
+    Select all values of filterable dataset fields in one roundtrip.
+
+    Distinct values of each field are aggregated during a single scan of the
+    dataset table, and tags are aggregated in subqueries.
+    """
+
+    def __init__(self) -> None:
+        self.statement: Select = select(
+            _distinct_values(DatasetModel.geographical_coverage).label(
+                "geographical_coverage"
+            ),
+            _distinct_values(DatasetModel.service).label("service"),
+            _distinct_values(DatasetModel.technical_source).label("technical_source"),
+            _distinct_values(DatasetModel.license).label("license"),
+            _tags_ordered(TagModel.id).label("tag_ids"),
+            _tags_ordered(TagModel.name).label("tag_names"),
+        )
+
+    def values(self, row: Row) -> DatasetFilterValues:
+        def as_set(values: List[str]) -> Set[str]:
+            return set(values or ())  # NULL if there are no rows.
+
+        return {
+            "geographical_coverage": as_set(row.geographical_coverage),
+            "service": as_set(row.service),
+            "technical_source": as_set(row.technical_source),
+            "license": as_set(row.license),
+            "tags": [
+                Tag(id=id_, name=name)
+                for id_, name in zip(row.tag_ids or (), row.tag_names or ())
+            ],
+        }
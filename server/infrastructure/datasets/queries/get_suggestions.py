@@ -0,0 +1,45 @@
+from typing import List, Sequence
+
+from sqlalchemy import desc, func, literal, select
+from sqlalchemy.engine import Row
+
+from server.domain.datasets.repositories import DatasetSuggestion
+
+from ..models import DatasetModel
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("/", "//").replace("%", "/%").replace("_", "/_")
+
+
+class GetSuggestionsQuery:
+    """
+    Select datasets whose title looks like a search term, using trigram matching.
+    See: https://www.postgresql.org/docs/12/pgtrgm.html
+
+    Both conditions are served by the trigram GIN index on titles:
+
+    * Titles that start with the term, so that suggestions follow typing.
+    * Titles that contain a word similar to the term, which tolerates typos.
+      E.g. 'forets' matches 'Inventaire des forêts'.
+
+    Titles that start with the term come first, then best matches.
+    """
+
+    def __init__(self, q: str, limit: int) -> None:
+        term = literal(q)
+        is_prefix = DatasetModel.title.ilike(f"{_escape_like(q)}%", escape="/")
+
+        self.statement = (
+            select(DatasetModel.id, DatasetModel.title)
+            .where(is_prefix | term.op("<%")(DatasetModel.title))
+            .order_by(
+                desc(is_prefix),
+                func.word_similarity(term, DatasetModel.title).desc(),
+                DatasetModel.title,
+            )
+            .limit(limit)
+        )
+
+    def suggestions(self, rows: Sequence[Row]) -> List[DatasetSuggestion]:
+        return [DatasetSuggestion(id=row.id, title=row.title) for row in rows]
@@ -0,0 +1,86 @@
+"""
+Read datasets from flat rows rather than ORM instances.
+
+Related entities are aggregated into arrays by the database, so that each
+dataset is read from a single row, without extra SELECT ... IN queries nor
+identity map bookkeeping.
+"""
+from typing import List
+
+from sqlalchemy import String, func, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by
+from sqlalchemy.engine import Row
+from sqlalchemy.sql import ColumnElement
+
+from server.domain.catalog_records.entities import CatalogRecord
+from server.domain.datasets.entities import DataFormat, Dataset
+from server.domain.tags.entities import Tag
+from server.infrastructure.catalog_records.repositories import CatalogRecordModel
+from server.infrastructure.tags.repositories import TagModel, dataset_tag
+
+from ..models import DataFormatModel, DatasetModel, dataset_dataformat
+
+_RELATED_FIELDS = {"catalog_record", "formats", "tags"}
+
+_SCALAR_FIELDS = [field for field in Dataset.__fields__ if field not in _RELATED_FIELDS]
+
+
+def _array_agg(column: ColumnElement, *order_by: ColumnElement) -> ColumnElement:
+    # Empty array rather than NULL when there are no rows.
+    return func.coalesce(
+        func.array_agg(aggregate_order_by(column, *order_by)),
+        literal([], type_=ARRAY(column.type)),
+    )
+
+
+def _tags(column: ColumnElement) -> ColumnElement:
+    return (
+        select(_array_agg(column, TagModel.name, TagModel.id))
+        .select_from(dataset_tag)
+        .join(TagModel)
+        .where(dataset_tag.c.dataset_id == DatasetModel.id)
+        .scalar_subquery()
+    )
+
+
+def dataset_columns() -> List[ColumnElement]:
+    """
+    Columns to read datasets with `make_dataset()`.
+
+    Statements must join `DatasetModel.catalog_record`.
+    """
+    # Enum values are stored by name.
+    format_name = DataFormatModel.name.cast(String)
+
+    formats = (
+        select(_array_agg(format_name, DataFormatModel.id))
+        .select_from(dataset_dataformat)
+        .join(DataFormatModel)
+        .where(dataset_dataformat.c.dataset_id == DatasetModel.id)
+        .scalar_subquery()
+    )
+
+    return [
+        *(getattr(DatasetModel, field) for field in _SCALAR_FIELDS),
+        CatalogRecordModel.id.label("catalog_record_id"),
+        CatalogRecordModel.organization_siret,
+        CatalogRecordModel.created_at,
+        formats.label("formats"),
+        _tags(TagModel.id).label("tag_ids"),
+        _tags(TagModel.name).label("tag_names"),
+    ]
+
+
+def make_dataset(row: Row) -> Dataset:
+    mapping = row._mapping
+
+    return Dataset(
+        catalog_record=CatalogRecord(
+            id=row.catalog_record_id,
+            organization_siret=row.organization_siret,
+            created_at=row.created_at,
+        ),
+        formats=[DataFormat[name] for name in row.formats],
+        tags=[Tag(id=id_, name=name) for id_, name in zip(row.tag_ids, row.tag_names)],
+        **{field: mapping[field] for field in _SCALAR_FIELDS},
+    )
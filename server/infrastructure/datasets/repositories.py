@@ -1,23 +1,40 @@
-from typing import List, Optional, Set, Tuple
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import contains_eager, selectinload
 
-from server.domain.common.pagination import Page
+from server.domain.common.pagination import Count, CountMode, Page, PageCursors
 from server.domain.common.types import ID
 from server.domain.datasets.entities import DataFormat, Dataset
-from server.domain.datasets.repositories import DatasetGetAllExtras, DatasetRepository
+from server.domain.datasets.exceptions import CannotInsertDatasets, DatasetDoesNotExist
+from server.domain.datasets.repositories import (
+    DatasetFacetCounts,
+    DatasetFilterValues,
+    DatasetGetAllExtras,
+    DatasetRepository,
+    DatasetSuggestion,
+)
 from server.domain.datasets.specifications import DatasetSpec
 from server.domain.tags.entities import Tag
 
 from ..catalog_records.repositories import CatalogRecordModel
+from ..catalog_records.repositories import make_instance as make_catalog_record_instance
+from ..catalog_records.repositories import make_row as make_catalog_record_row
+from ..changes.models import bump_catalog_version
 from ..database import Database
-from ..helpers.sqlalchemy import get_count_from, to_limit_offset
-from ..tags.repositories import TagModel
-from .models import DataFormatModel, DatasetModel
+from ..helpers.sqlalchemy import get_count_from, get_estimated_count_from
+from ..tags.repositories import TagModel, dataset_tag
+from .models import DataFormatModel, DatasetModel, dataset_dataformat
+from .queries.export import ExportQuery
 from .queries.get_all import GetAllQuery
-from .transformers import make_entity, make_instance, update_instance
+from .queries.get_filter_values import GetFilterValuesQuery
+from .queries.get_suggestions import GetSuggestionsQuery
+from .queries.rows import dataset_columns, make_dataset
+from .transformers import make_entity, make_instance, make_row, update_instance
+
+STREAM_BATCH_SIZE = 500
 
 
 class SqlDatasetRepository(DatasetRepository):
@@ -29,19 +46,44 @@ class SqlDatasetRepository(DatasetRepository):
         *,
         page: Page = Page(),
         spec: DatasetSpec = DatasetSpec(),
-    ) -> Tuple[List[Tuple[Dataset, DatasetGetAllExtras]], int]:
-        limit, offset = to_limit_offset(page)
+        count_mode: CountMode = "exact",
+    ) -> Tuple[List[Tuple[Dataset, DatasetGetAllExtras]], Count, PageCursors]:
+        async with self._db.session() as session:
+            query = GetAllQuery(spec)
+            stmt = query.paginate(page)
+
+            if count_mode == "estimated":
+                value, estimated = await get_estimated_count_from(
+                    query.count_statement, session
+                )
+                count = Count(value=value, estimated=estimated)
+            else:
+                value = await get_count_from(query.count_statement, session)
+                count = Count(value=value)
+
+            result = await session.stream(stmt)
+            rows, cursors = query.cursors(await result.all(), page)
+            items = [(query.entity(row), query.extras(row)) for row in rows]
+            return items, count, cursors
 
+    async def stream_all(self) -> AsyncIterator[Dataset]:
+        async with self._db.session() as session:
+            query = ExportQuery()
+            stmt = query.statement.execution_options(yield_per=STREAM_BATCH_SIZE)
+
+            # Read rows through a server-side cursor, a batch at a time.
+            result = await session.stream(stmt)
+
+            async for row in result:
+                yield query.entity(row)
+
+    async def get_facet_counts(
+        self, *, spec: DatasetSpec = DatasetSpec()
+    ) -> DatasetFacetCounts:
         async with self._db.session() as session:
             query = GetAllQuery(spec)
-            stmt = query.statement
-            count = await get_count_from(stmt, session)
-            result = await session.stream(stmt.limit(limit).offset(offset))
-            items = [
-                (make_entity(query.instance(row)), query.extras(row))
-                async for row in result
-            ]
-            return items, count
+            result = await session.execute(query.facets_statement)
+            return query.facet_counts(result.all())
 
     async def _maybe_get_by_id(
         self, session: AsyncSession, id: ID
@@ -69,25 +111,30 @@ class SqlDatasetRepository(DatasetRepository):
 
             return make_entity(instance)
 
-    async def get_geographical_coverage_set(self) -> Set[str]:
+    async def get_many(self, ids: Sequence[ID]) -> List[Dataset]:
+        if not ids:
+            return []
+
         async with self._db.session() as session:
-            stmt = select(DatasetModel.geographical_coverage.distinct())
+            stmt = (
+                select(*dataset_columns())
+                .join(DatasetModel.catalog_record)
+                .where(DatasetModel.id.in_(ids))
+            )
             result = await session.execute(stmt)
-            return set(result.scalars())
+            return [make_dataset(row) for row in result]
 
-    async def get_service_set(self) -> Set[str]:
+    async def get_suggestions(self, q: str, *, limit: int) -> List[DatasetSuggestion]:
         async with self._db.session() as session:
-            stmt = select(DatasetModel.service.distinct())
-            result = await session.execute(stmt)
-            return set(result.scalars())
+            query = GetSuggestionsQuery(q, limit)
+            result = await session.execute(query.statement)
+            return query.suggestions(result.all())
 
-    async def get_technical_source_set(self) -> Set[str]:
+    async def get_filter_values(self) -> DatasetFilterValues:
         async with self._db.session() as session:
-            stmt = select(DatasetModel.technical_source.distinct()).where(
-                DatasetModel.technical_source.is_not(None)
-            )
-            result = await session.execute(stmt)
-            return set(result.scalars())
+            query = GetFilterValuesQuery()
+            result = await session.execute(query.statement)
+            return query.values(result.one())
 
     async def get_license_set(self) -> Set[str]:
         async with self._db.session() as session:
@@ -97,13 +144,6 @@ class SqlDatasetRepository(DatasetRepository):
             result = await session.execute(stmt)
             return set(result.scalars())
 
-    async def _get_catalog_record(
-        self, session: AsyncSession, id_: ID
-    ) -> CatalogRecordModel:
-        stmt = select(CatalogRecordModel).where(CatalogRecordModel.id == id_)
-        result = await session.execute(stmt)
-        return result.scalar_one()
-
     async def _get_formats(
         self, session: AsyncSession, formats: List[DataFormat]
     ) -> List[DataFormatModel]:
@@ -116,41 +156,101 @@ class SqlDatasetRepository(DatasetRepository):
         result = await session.execute(stmt)
         return result.scalars().all()
 
-    async def insert(self, entity: Dataset) -> ID:
-        async with self._db.session() as session:
-            async with session.begin():
-                catalog_record = await self._get_catalog_record(
-                    session, entity.catalog_record.id
-                )
-                formats = await self._get_formats(session, entity.formats)
-                tags = await self._get_tags(session, entity.tags)
-                instance = make_instance(entity, catalog_record, formats, tags)
+    async def insert(self, entity: Dataset) -> Dataset:
+        async with self._db.transaction() as session:
+            catalog_record = make_catalog_record_instance(entity.catalog_record)
+            formats = await self._get_formats(session, entity.formats)
+            tags = await self._get_tags(session, entity.tags)
+            instance = make_instance(entity, catalog_record, formats, tags)
 
-                session.add(instance)
+            # NOTE: the catalog record relationship does not cascade saves.
+            session.add_all([catalog_record, instance])
+            await session.flush()
+            bump_catalog_version(session, [entity.id])
 
-            await session.refresh(instance)
+            # Relationships are already loaded: no need to read them back.
+            return make_entity(instance)
 
-            return ID(instance.id)
+    async def insert_many(self, entities: List[Dataset]) -> List[ID]:
+        """
+        Insert datasets along with their catalog records, format links and tag links
+        using one multi-row INSERT per table, in a single transaction.
 
-    async def update(self, entity: Dataset) -> None:
-        async with self._db.session() as session:
-            async with session.begin():
-                instance = await self._maybe_get_by_id(session, entity.id)
+        Unlike `insert()`, referenced tags are assumed to exist. Inserts are made in
+        a SAVEPOINT, so that a failed batch can be reported without aborting the
+        enclosing transaction.
+        """
+        if not entities:
+            return []
+
+        async with self._db.transaction() as session:
+            try:
+                async with session.begin_nested():
+                    await self._insert_many(session, entities)
+            except (KeyError, DBAPIError) as exc:
+                raise CannotInsertDatasets(len(entities)) from exc
+
+        return [entity.id for entity in entities]
+
+    async def _insert_many(
+        self, session: AsyncSession, entities: List[Dataset]
+    ) -> None:
+        result = await session.execute(select(DataFormatModel.name, DataFormatModel.id))
+        format_ids: Dict[DataFormat, int] = {row.name: row.id for row in result}
+
+        await session.execute(
+            insert(CatalogRecordModel).values(
+                [make_catalog_record_row(entity.catalog_record) for entity in entities]
+            )
+        )
+        await session.execute(
+            insert(DatasetModel).values([make_row(e) for e in entities])
+        )
+
+        format_rows = [
+            {"dataset_id": entity.id, "dataformat_id": format_ids[fmt]}
+            for entity in entities
+            for fmt in set(entity.formats)
+        ]
+        if format_rows:
+            await session.execute(insert(dataset_dataformat).values(format_rows))
 
-                if instance is None:
-                    return
+        tag_rows = [
+            {"dataset_id": entity.id, "tag_id": tag_id}
+            for entity in entities
+            for tag_id in {tag.id for tag in entity.tags}
+        ]
+        if tag_rows:
+            await session.execute(insert(dataset_tag).values(tag_rows))
 
-                formats = await self._get_formats(session, entity.formats)
-                tags = await self._get_tags(session, entity.tags)
-                update_instance(instance, entity, formats, tags)
+        bump_catalog_version(session, [entity.id for entity in entities])
+
+    async def update(self, entity: Dataset) -> Dataset:
+        async with self._db.transaction() as session:
+            instance = await self._maybe_get_by_id(session, entity.id)
+
+            if instance is None:
+                raise DatasetDoesNotExist(entity.id)
+
+            formats = await self._get_formats(session, entity.formats)
+            tags = await self._get_tags(session, entity.tags)
+            update_instance(instance, entity, formats, tags)
+
+            # Also ensures the dataset row is updated if only tags or formats changed.
+            instance.version = DatasetModel.version + 1
+            instance.changed_at = func.clock_timestamp()
+
+            await session.flush()
+            bump_catalog_version(session, [entity.id])
+
+            return make_entity(instance)
 
     async def delete(self, id: ID) -> None:
-        async with self._db.session() as session:
+        async with self._db.transaction() as session:
             instance = await self._maybe_get_by_id(session, id)
 
             if instance is None:
                 return
 
             await session.delete(instance)
-
-            await session.commit()
+            bump_catalog_version(session, [id])
@@ -0,0 +1,359 @@
+import asyncio
+import datetime as dt
+import heapq
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from pydantic import ValidationError, parse_obj_as
+
+from server.domain.changes.repositories import ChangeVersionRepository
+from server.domain.common.exceptions import InvalidCursor
+from server.domain.common.pagination import (
+    Count,
+    CountMode,
+    Cursor,
+    CursorDirection,
+    Page,
+    PageCursors,
+)
+from server.domain.common.types import ID
+from server.domain.datasets.entities import DataFormat, Dataset
+from server.domain.datasets.repositories import (
+    DatasetFacetCounts,
+    DatasetGetAllExtras,
+    DatasetRepository,
+)
+from server.domain.datasets.search import SearchIndex
+from server.domain.datasets.specifications import PREFIX_MIN_LENGTH, DatasetSpec
+
+from ..helpers.bm25 import BM25Index, highlight
+from ..helpers.cache import TTLCache
+from ..helpers.sqlalchemy import to_limit_offset
+
+
+class SqlSearchIndex(SearchIndex):
+    """
+    Search datasets using their PostgreSQL text search vector, which database
+    triggers keep up to date.
+    """
+
+    def __init__(self, repository: DatasetRepository) -> None:
+        self._repository = repository
+
+    async def load(self) -> None:
+        pass
+
+    async def search(
+        self,
+        *,
+        page: Page = Page(),
+        spec: DatasetSpec,
+        count_mode: CountMode = "exact",
+    ) -> Tuple[List[Tuple[Dataset, DatasetGetAllExtras]], Count, PageCursors]:
+        return await self._repository.get_all(
+            page=page, spec=spec, count_mode=count_mode
+        )
+
+    async def get_facet_counts(self, *, spec: DatasetSpec) -> DatasetFacetCounts:
+        return await self._repository.get_facet_counts(spec=spec)
+
+
+@dataclass(frozen=True)
+class _Document:
+    """
+    Fields of a dataset used for filtering and sorting search results.
+    """
+
+    created_at: dt.datetime
+    catalog_record_id: ID
+    geographical_coverage: str
+    service: str
+    formats: FrozenSet[DataFormat]
+    technical_source: Optional[str]
+    tag_ids: FrozenSet[ID]
+    license: Optional[str]
+
+
+# Sort key of search results, in descending order: rank, then creation date.
+_Key = Tuple[float, dt.datetime, ID]
+
+# A matching dataset: its sort key, and its ID.
+_Hit = Tuple[_Key, ID]
+
+
+class BM25SearchIndex(SearchIndex):
+    """
+    Search datasets using an inverted index held in memory, ranking them with BM25.
+
+    Spares the database the cost of ranking and filtering: only datasets of the
+    requested page are read from it. The index is loaded by `load()`, e.g. at
+    startup. Each search then compares the catalog version with that of the
+    index, and re-reads datasets changed since, including by other processes.
+    """
+
+    # Same relative weights as those PostgreSQL gives to A, B and C by default.
+    # See migration `d41c8e7f5a36`.
+    WEIGHTS = {"title": 1.0, "keywords": 0.4, "description": 0.2}
+
+    def __init__(
+        self,
+        repository: DatasetRepository,
+        change_version_repository: ChangeVersionRepository,
+    ) -> None:
+        self._repository = repository
+        self._change_version_repository = change_version_repository
+        self._index: BM25Index[ID] = BM25Index(
+            self.WEIGHTS, prefix_min_length=PREFIX_MIN_LENGTH
+        )
+        self._documents: Dict[ID, _Document] = {}
+        # Version of the catalog that indexed datasets were read at.
+        self._catalog_version: Optional[int] = None
+        # Created lazily, so that it is bound to the event loop that runs searches.
+        self._lock: Optional[asyncio.Lock] = None
+        # Hits of recent searches, so that facet counts of a listing reuse the hits
+        # of its search. Keyed by spec and catalog version: no invalidation needed.
+        self._hits: TTLCache[Tuple[str, int], List[_Hit]] = TTLCache(maxsize=16, ttl=60)
+
+    def _add(self, dataset: Dataset) -> None:
+        self._index.add(
+            dataset.id,
+            {
+                "title": dataset.title,
+                "keywords": " ".join(
+                    [
+                        dataset.service,
+                        dataset.geographical_coverage,
+                        *(tag.name for tag in dataset.tags),
+                    ]
+                ),
+                "description": dataset.description,
+            },
+        )
+        self._documents[dataset.id] = _Document(
+            created_at=dataset.catalog_record.created_at,
+            catalog_record_id=dataset.catalog_record.id,
+            geographical_coverage=dataset.geographical_coverage,
+            service=dataset.service,
+            formats=frozenset(dataset.formats),
+            technical_source=dataset.technical_source,
+            # Drivers may return UUID subclasses (e.g. asyncpg), which JSON
+            # encoders don't necessarily accept as mapping keys of facet counts.
+            tag_ids=frozenset(ID(uuid.UUID(int=tag.id.int)) for tag in dataset.tags),
+            license=dataset.license,
+        )
+
+    def _remove(self, id: ID) -> None:
+        self._index.remove(id)
+        self._documents.pop(id, None)
+
+    async def load(self) -> None:
+        await self._refresh()
+
+    async def _refresh(self) -> None:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        # Concurrent searches wait for the one that refreshes the index, rather
+        # than each loading it.
+        async with self._lock:
+            catalog_version = (
+                await self._change_version_repository.get_catalog_version()
+            )
+
+            if catalog_version.value == self._catalog_version:
+                return
+
+            # NOTE: the catalog version is read before datasets, so that datasets
+            # changed in the meantime are read again on the next refresh.
+            if self._catalog_version is None:
+                async for dataset in self._repository.stream_all():
+                    self._add(dataset)
+            else:
+                # Only read datasets changed since the last refresh.
+                versions = self._change_version_repository
+                changed_ids = await versions.get_changed_dataset_ids(
+                    since=self._catalog_version
+                )
+
+                for id in changed_ids:
+                    self._remove(id)
+
+                # Deleted datasets are not returned.
+                for dataset in await self._repository.get_many(changed_ids):
+                    self._add(dataset)
+
+            self._catalog_version = catalog_version.value
+
+    def _matches(self, document: _Document, spec: DatasetSpec) -> bool:
+        if (
+            spec.geographical_coverage__in is not None
+            and document.geographical_coverage not in spec.geographical_coverage__in
+        ):
+            return False
+
+        if spec.service__in is not None and document.service not in spec.service__in:
+            return False
+
+        if spec.format__in is not None and document.formats.isdisjoint(spec.format__in):
+            return False
+
+        if (
+            spec.technical_source__in is not None
+            and document.technical_source not in spec.technical_source__in
+        ):
+            return False
+
+        if spec.tag__id__in is not None and document.tag_ids.isdisjoint(
+            spec.tag__id__in
+        ):
+            return False
+
+        if spec.license == "*":
+            return document.license is not None
+
+        if spec.license is not None:
+            return document.license == spec.license
+
+        return True
+
+    async def _find(self, spec: DatasetSpec) -> List[_Hit]:
+        """
+        Return matching datasets, in no particular order.
+        """
+        assert spec.search_term is not None
+
+        await self._refresh()
+
+        assert self._catalog_version is not None
+        cachekey = (repr(spec), self._catalog_version)
+
+        if (cached := self._hits.get(cachekey)) is not None:
+            return cached
+
+        # NOTE: `spec.search_rank_normalization` is specific to PostgreSQL ranks.
+        # BM25 accounts for the length of datasets already.
+        scores = self._index.search(
+            spec.search_term, prefix=spec.search_mode == "prefix"
+        )
+
+        hits = []
+
+        for id, score in scores.items():
+            document = self._documents[id]
+            if self._matches(document, spec):
+                key = (score, document.created_at, document.catalog_record_id)
+                hits.append((key, id))
+
+        self._hits.set(cachekey, hits)
+
+        return hits
+
+    async def search(
+        self,
+        *,
+        page: Page = Page(),
+        spec: DatasetSpec,
+        count_mode: CountMode = "exact",
+    ) -> Tuple[List[Tuple[Dataset, DatasetGetAllExtras]], Count, PageCursors]:
+        hits = await self._find(spec)
+
+        # Counts are cheap here: they are always exact.
+        count = Count(value=len(hits))
+
+        pagehits, cursors = self._paginate(hits, page)
+
+        ids = [id for _, id in pagehits]
+        datasets_by_id = {
+            dataset.id: dataset for dataset in await self._repository.get_many(ids)
+        }
+
+        terms = set().union(
+            *self._index.query_terms(
+                spec.search_term or "", prefix=spec.search_mode == "prefix"
+            )
+        )
+
+        items = [
+            (dataset, self._extras(dataset, terms))
+            for id in ids
+            # May have been deleted since the index was refreshed.
+            if (dataset := datasets_by_id.get(id)) is not None
+        ]
+
+        return items, count, cursors
+
+    def _paginate(self, hits: List[_Hit], page: Page) -> Tuple[List[_Hit], PageCursors]:
+        # Same semantics as the keyset pagination of `GetAllQuery`.
+
+        # NOTE: only the best hits, up to the requested page, are sorted. Sorting
+        # all of them would block the event loop on broad searches, e.g. by prefix.
+
+        if page.cursor is None:
+            limit, offset = to_limit_offset(page)
+            pagehits = heapq.nlargest(offset + limit + 1, hits)[offset:]
+            has_next, has_previous = len(pagehits) > page.size, page.number > 1
+            pagehits = pagehits[: page.size]
+        else:
+            cursor = Cursor.decode(page.cursor)
+            key = self._parse_key(cursor)
+
+            if cursor.direction == "next":
+                pagehits = heapq.nlargest(
+                    page.size + 1, (hit for hit in hits if hit[0] < key)
+                )
+                has_next, has_previous = len(pagehits) > page.size, True
+                pagehits = pagehits[: page.size]
+            else:
+                pagehits = heapq.nsmallest(
+                    page.size + 1, (hit for hit in hits if hit[0] > key)
+                )
+                has_next, has_previous = True, len(pagehits) > page.size
+                pagehits = pagehits[: page.size][::-1]
+
+        if not pagehits:
+            return pagehits, PageCursors()
+
+        return pagehits, PageCursors(
+            next=self._cursor(pagehits[-1][0], "next") if has_next else None,
+            previous=(
+                self._cursor(pagehits[0][0], "previous") if has_previous else None
+            ),
+        )
+
+    def _cursor(self, key: _Key, direction: CursorDirection) -> str:
+        return Cursor(key=list(key), direction=direction).encode()
+
+    def _parse_key(self, cursor: Cursor) -> _Key:
+        try:
+            keytype: Any = Tuple[float, dt.datetime, uuid.UUID]
+            return parse_obj_as(keytype, cursor.key)
+        except ValidationError:
+            raise InvalidCursor(cursor.encode())
+
+    def _extras(self, dataset: Dataset, terms: Set[str]) -> DatasetGetAllExtras:
+        description = highlight(dataset.description, terms, "<mark>", "</mark>")
+
+        return {
+            "headlines": {
+                "title": highlight(dataset.title, terms, "<mark>", "</mark>"),
+                "description": description if "<mark>" in description else None,
+            }
+        }
+
+    async def get_facet_counts(self, *, spec: DatasetSpec) -> DatasetFacetCounts:
+        matching = [self._documents[id] for _, id in await self._find(spec)]
+
+        counts: Dict[str, Counter] = {
+            "geographical_coverage": Counter(d.geographical_coverage for d in matching),
+            "service": Counter(d.service for d in matching),
+            "format": Counter(fmt for d in matching for fmt in d.formats),
+            "technical_source": Counter(
+                d.technical_source for d in matching if d.technical_source is not None
+            ),
+            "tag_id": Counter(tag_id for d in matching for tag_id in d.tag_ids),
+            "license": Counter(d.license for d in matching if d.license is not None),
+        }
+
+        return {name: dict(counter) for name, counter in counts.items()}  # type: ignore
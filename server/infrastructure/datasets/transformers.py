@@ -41,6 +41,14 @@ def make_instance(
     return instance
 
 
+def make_row(entity: Dataset) -> dict:
+    # For use with Core INSERT statements, which bypass the ORM.
+    return {
+        "catalog_record_id": entity.catalog_record.id,
+        **entity.dict(exclude={"catalog_record", "formats", "tags"}),
+    }
+
+
 def update_instance(
     instance: DatasetModel,
     entity: Dataset,
@@ -0,0 +1,209 @@
+"""
+An in-memory inverted index, ranking documents with BM25.
+
+Documents are made of weighted fields, as in BM25F: a word in a field of weight 2
+counts as two occurrences of that word.
+
+See: https://en.wikipedia.org/wiki/Okapi_BM25
+"""
+import bisect
+import functools
+import math
+import re
+from typing import Dict, Generic, Hashable, List, Mapping, Optional, Set, TypeVar
+
+import Stemmer
+
+K = TypeVar("K", bound=Hashable)
+
+_WORD_RE = re.compile(r"\w+")
+
+_STEMMER = Stemmer.Stemmer("french")
+
+
+# Stemming is the costliest part of indexing, and most words occur many times.
+@functools.lru_cache(maxsize=100_000)
+def _stem(word: str) -> str:
+    return _STEMMER.stemWord(word)
+
+
+# Words ignored when indexing and searching, like the 'french' configuration of
+# PostgreSQL text search does.
+# See: https://snowballstem.org/algorithms/french/stop.txt
+FRENCH_STOP_WORDS = frozenset(
+    """
+    au aux avec ce ces dans de des du elle en et eux il ils je la le les leur lui
+    ma mais me même mes moi mon ne nos notre nous on ou par pas pour qu que qui sa
+    se ses son sur ta te tes toi ton tu un une vos votre vous c d j l à m n s t y
+    été est sont était ai as avons avez ont
+    """.split()
+)
+
+
+def analyze(text: str) -> List[str]:
+    """
+    Split `text` into normalized terms, e.g. 'Les forêts' -> ['forêt'].
+    """
+    words = (word.lower() for word in _WORD_RE.findall(text))
+    return [_stem(word) for word in words if word not in FRENCH_STOP_WORDS]
+
+
+def highlight(text: str, terms: Set[str], start: str, stop: str) -> str:
+    """
+    Wrap words of `text` whose term is in `terms` between `start` and `stop`.
+    """
+
+    def repl(match: re.Match) -> str:
+        word = match.group()
+        if _stem(word.lower()) in terms:
+            return f"{start}{word}{stop}"
+        return word
+
+    return _WORD_RE.sub(repl, text)
+
+
+class BM25Index(Generic[K]):
+    def __init__(
+        self,
+        weights: Mapping[str, float],
+        *,
+        k1: float = 1.2,
+        b: float = 0.75,
+        prefix_min_length: int = 3,
+    ) -> None:
+        self._weights = weights
+        self._k1 = k1
+        self._b = b
+        self._prefix_min_length = prefix_min_length
+
+        # Term -> document key -> weighted number of occurrences.
+        self._postings: Dict[str, Dict[K, float]] = {}
+        # Sorted terms, for prefix search. Computed on demand.
+        self._sorted_terms: Optional[List[str]] = None
+        # Document key -> indexed terms, for removal.
+        self._documents: Dict[K, List[str]] = {}
+        self._lengths: Dict[K, float] = {}
+        self._total_length = 0.0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._lengths
+
+    def add(self, key: K, fields: Mapping[str, str]) -> None:
+        """
+        Index a document, replacing any previous version of it.
+        """
+        self.remove(key)
+
+        frequencies: Dict[str, float] = {}
+
+        for name, text in fields.items():
+            weight = self._weights[name]
+            for term in analyze(text):
+                frequencies[term] = frequencies.get(term, 0) + weight
+
+        for term, frequency in frequencies.items():
+            if term not in self._postings:
+                self._postings[term] = {}
+                self._sorted_terms = None
+            self._postings[term][key] = frequency
+
+        self._documents[key] = list(frequencies)
+        length = sum(frequencies.values())
+        self._lengths[key] = length
+        self._total_length += length
+
+    def remove(self, key: K) -> None:
+        terms = self._documents.pop(key, None)
+
+        if terms is None:
+            return
+
+        self._total_length -= self._lengths.pop(key)
+
+        for term in terms:
+            docs = self._postings[term]
+            del docs[key]
+            if not docs:
+                del self._postings[term]
+                self._sorted_terms = None
+
+    def query_terms(self, query: str, *, prefix: bool = False) -> List[Set[str]]:
+        """
+        Return the indexed terms matching each word of `query`.
+
+        In `prefix` mode, words also match terms that start with them, unless
+        they are shorter than `prefix_min_length`.
+        """
+        groups = []
+
+        for word in _WORD_RE.findall(query):
+            word = word.lower()
+
+            if word in FRENCH_STOP_WORDS:
+                continue
+
+            term = _stem(word)
+
+            if prefix and len(word) >= self._prefix_min_length:
+                if self._sorted_terms is None:
+                    self._sorted_terms = sorted(self._postings)
+                terms = self._sorted_terms
+                start = end = bisect.bisect_left(terms, term)
+                while end < len(terms) and terms[end].startswith(term):
+                    end += 1
+                groups.append(set(terms[start:end]))
+            else:
+                groups.append({term})
+
+        return groups
+
+    def search(self, query: str, *, prefix: bool = False) -> Dict[K, float]:
+        """
+        Return the score of documents that match all words of `query`.
+        """
+        groups = self.query_terms(query, prefix=prefix)
+
+        if not groups or not self._lengths:
+            return {}
+
+        scores: Dict[K, float] = {}
+
+        for index, terms in enumerate(groups):
+            group_scores: Dict[K, float] = {}
+
+            for term in terms:
+                for key, score in self._score(term).items():
+                    # A prefix counts once, as its best matching term.
+                    group_scores[key] = max(score, group_scores.get(key, 0.0))
+
+            if index == 0:
+                scores = group_scores
+            else:
+                scores = {
+                    key: score + group_scores[key]
+                    for key, score in scores.items()
+                    if key in group_scores
+                }
+
+            if not scores:
+                break
+
+        return scores
+
+    def _score(self, term: str) -> Dict[K, float]:
+        docs = self._postings.get(term, {})
+        n = len(self._lengths)
+        idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+        average_length = self._total_length / n or 1.0
+        k1, b = self._k1, self._b
+
+        return {
+            key: idf
+            * frequency
+            * (k1 + 1)
+            / (frequency + k1 * (1 - b + b * self._lengths[key] / average_length))
+            for key, frequency in docs.items()
+        }
@@ -0,0 +1,68 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    An in-process LRU cache whose entries expire after `ttl` seconds.
+
+    Holds at most `maxsize` entries. When full, the least recently used entry
+    is evicted. A `maxsize` of 0 disables caching.
+
+    NOTE: the cache is local to the current process. Invalidation does not
+    propagate to other server processes, so keep `ttl` short enough that stale
+    entries are acceptable.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._timer = timer
+        self._entries: "OrderedDict[K, Tuple[float, V]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> Optional[V]:
+        try:
+            expires_at, value = self._entries[key]
+        except KeyError:
+            return None
+
+        if expires_at <= self._timer():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        if self._maxsize <= 0:
+            return
+
+        self._entries[key] = (self._timer() + self._ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: K) -> None:
+        self._entries.pop(key, None)
+
+    def delete_where(self, predicate: Callable[[V], bool]) -> None:
+        for key in [
+            key for key, (_, value) in self._entries.items() if predicate(value)
+        ]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -1,11 +1,16 @@
-from typing import Tuple
+import json
+from typing import Any, Tuple
 
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.sql import Select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import ClauseElement, Executable, Select
 
 from server.domain.common.pagination import Page
 
+# Counts up to this value are always exact in "estimated" mode.
+ESTIMATED_COUNT_THRESHOLD = 1000
+
 
 def to_limit_offset(page: Page) -> Tuple[int, int]:
     limit = page.size
@@ -17,3 +22,54 @@ async def get_count_from(stmt: Select, session: AsyncSession) -> int:
     count_stmt = select(func.count()).select_from(stmt.subquery())
     result = await session.execute(count_stmt)
     return result.scalar_one()
+
+
+class explain(Executable, ClauseElement):
+    """
+    An `EXPLAIN (FORMAT JSON)` statement.
+
+    See: https://www.postgresql.org/docs/12/sql-explain.html
+    """
+
+    inherit_cache = False
+
+    def __init__(self, stmt: Select) -> None:
+        self.statement = stmt
+
+
+@compiles(explain, "postgresql")
+def _compile_explain(element: explain, compiler: Any, **kwargs: Any) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kwargs)
+
+
+async def get_planner_count_from(stmt: Select, session: AsyncSession) -> int:
+    """
+    Return the number of rows the query planner expects `stmt` to return.
+
+    This relies on table statistics, and does not run the statement.
+    """
+    result = await session.execute(explain(stmt))
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def get_estimated_count_from(
+    stmt: Select, session: AsyncSession, threshold: int = ESTIMATED_COUNT_THRESHOLD
+) -> Tuple[int, bool]:
+    """
+    Count the rows of `stmt`, stopping early if there are more than `threshold`.
+
+    Returns a `(count, estimated)` tuple. Small counts are exact. For larger counts,
+    which are typically due to broad filters, use the query planner's estimate
+    rather than visiting every row.
+    """
+    count = await get_count_from(stmt.limit(threshold + 1), session)
+
+    if count <= threshold:
+        return count, False
+
+    estimate = await get_planner_count_from(stmt, session)
+
+    return max(estimate, count), True
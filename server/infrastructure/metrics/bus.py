@@ -0,0 +1,73 @@
+import time
+from typing import Any, Dict, Tuple, TypeVar, Union
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from server.seedwork.application.commands import Command
+from server.seedwork.application.events import Event
+from server.seedwork.application.messages import MessageBus
+from server.seedwork.application.queries import Query
+
+T = TypeVar("T")
+
+MESSAGE_DURATION_SECONDS = Histogram(
+    "catalogage_bus_message_duration_seconds",
+    "Time spent handling commands and queries.",
+    ["message"],
+)
+
+MESSAGES_IN_PROGRESS = Gauge(
+    "catalogage_bus_messages_in_progress",
+    "Number of commands and queries currently being handled.",
+    ["message"],
+    multiprocess_mode="livesum",
+)
+
+MESSAGE_ERRORS = Counter(
+    "catalogage_bus_message_errors",
+    "Number of commands and queries whose handler raised an exception.",
+    ["message"],
+)
+
+_Metrics = Tuple[Histogram, Gauge, Counter]
+
+
+class InstrumentedMessageBus(MessageBus):
+    """
+    Wrap a message bus to record metrics for each type of message.
+    """
+
+    def __init__(self, bus: MessageBus) -> None:
+        self._bus = bus
+        # Resolving labelled metrics takes a lock, so do it once per message type.
+        self._metrics: Dict[type, _Metrics] = {}
+
+    def _get_metrics(self, message_type: type) -> _Metrics:
+        try:
+            return self._metrics[message_type]
+        except KeyError:
+            name = message_type.__name__
+            metrics = self._metrics[message_type] = (
+                MESSAGE_DURATION_SECONDS.labels(name),
+                MESSAGES_IN_PROGRESS.labels(name),
+                MESSAGE_ERRORS.labels(name),
+            )
+            return metrics
+
+    async def execute(self, message: Union[Command[T], Query[T]], **kwargs: Any) -> T:
+        duration, in_progress, errors = self._get_metrics(type(message))
+
+        in_progress.inc()
+        start = time.perf_counter()
+
+        try:
+            return await self._bus.execute(message, **kwargs)
+        except Exception:
+            errors.inc()
+            raise
+        finally:
+            duration.observe(time.perf_counter() - start)
+            in_progress.dec()
+
+    def publish(self, event: Event) -> None:
+        self._bus.publish(event)
@@ -0,0 +1,66 @@
+"""
+Aggregate metrics of server worker processes.
+
+Each worker process has its own metrics, but Prometheus scrapes whichever worker
+accepts the connection. In multiprocess mode, workers write their metrics to files
+in a shared directory, and the scraped worker reads all of them.
+
+See: https://github.com/prometheus/client_python#multiprocess-mode-eg-gunicorn
+
+NOTE: `prometheus_client` reads the directory from the environment on import. So
+this module only imports it lazily, for the server process to enable multiprocess
+mode before anything else imports it. Worker processes are forked from it.
+"""
+import os
+import shutil
+import tempfile
+from typing import Optional
+
+ENV_VAR = "PROMETHEUS_MULTIPROC_DIR"
+
+# Directory created by `enable_multiprocess_mode()`, if not set by the operator.
+_tempdir: Optional[str] = None
+
+
+def is_multiprocess() -> bool:
+    return bool(os.environ.get(ENV_VAR))
+
+
+def enable_multiprocess_mode() -> None:
+    """
+    Enable multiprocess mode in the current process and processes it starts.
+
+    A directory set by the operator is reused, but must then be emptied between
+    runs. Otherwise, a temporary directory is used, see `disable_multiprocess_mode()`.
+    """
+    global _tempdir
+
+    if is_multiprocess():
+        return
+
+    _tempdir = tempfile.mkdtemp(prefix="catalogage-metrics-")
+    os.environ[ENV_VAR] = _tempdir
+
+
+def disable_multiprocess_mode() -> None:
+    """
+    Remove the temporary directory of `enable_multiprocess_mode()`, if any.
+    """
+    global _tempdir
+
+    if _tempdir is None:
+        return
+
+    del os.environ[ENV_VAR]
+    shutil.rmtree(_tempdir, ignore_errors=True)
+    _tempdir = None
+
+
+def mark_process_dead(pid: int) -> None:
+    """
+    Drop live gauge values of a process that exited.
+    """
+    if is_multiprocess():
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid)
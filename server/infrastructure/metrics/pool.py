@@ -0,0 +1,77 @@
+import os
+import time
+from typing import Any, Callable, Iterator, List
+
+from prometheus_client import Histogram
+from prometheus_client.core import GaugeMetricFamily, Metric
+from prometheus_client.registry import Collector
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+POOL_WAIT_SECONDS = Histogram(
+    "catalogage_db_pool_wait_seconds",
+    "Time spent waiting for a database connection to be checked out of the pool.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30),
+)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    An asyncio queue pool that records checkout wait times.
+
+    This includes time spent opening new connections when the pool overflows.
+    """
+
+    def _do_get(self) -> Any:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()  # type: ignore[misc]
+        finally:
+            POOL_WAIT_SECONDS.observe(time.perf_counter() - start)
+
+
+class PoolCollector(Collector):
+    """
+    Collect connection pool gauges at scrape time.
+
+    The pool is obtained lazily, as engines replace their pool on dispose.
+
+    Each worker process has its own pool, which is not shared with other processes
+    in multiprocess mode. With `per_process`, gauges are labelled with the `pid` of
+    the scraped worker, so that they are not mistaken for totals.
+    """
+
+    def __init__(
+        self, get_pool: Callable[[], QueuePool], per_process: bool = False
+    ) -> None:
+        self._get_pool = get_pool
+        self._per_process = per_process
+
+    def collect(self) -> Iterator[Metric]:
+        pool = self._get_pool()
+
+        labels: List[str] = []
+        values: List[str] = []
+        if self._per_process:
+            labels, values = ["pid"], [str(os.getpid())]
+
+        for name, documentation, value in [
+            (
+                "catalogage_db_pool_size",
+                "Number of connections the pool keeps open.",
+                pool.size(),
+            ),
+            (
+                "catalogage_db_pool_checked_out",
+                "Number of connections currently checked out of the pool.",
+                pool.checkedout(),
+            ),
+            (
+                "catalogage_db_pool_overflow",
+                "Number of connections opened beyond the pool size. "
+                "Negative while the pool is not full yet.",
+                pool.overflow(),
+            ),
+        ]:
+            family = GaugeMetricFamily(name, documentation, labels=labels)
+            family.add_metric(values, value)
+            yield family
@@ -0,0 +1,77 @@
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from prometheus_client import Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+QUERY_DURATION_SECONDS = Histogram(
+    "catalogage_db_query_duration_seconds",
+    "Time spent executing SQL statements.",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+
+
+class QueryStats:
+    """
+    Number and total duration of SQL statements executed within a given scope.
+    """
+
+    __slots__ = ("count", "duration")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+
+
+_query_stats: contextvars.ContextVar[Optional[QueryStats]] = contextvars.ContextVar(
+    "query_stats", default=None
+)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """
+    Collect stats about SQL statements executed in the current context,
+    e.g. while handling an HTTP request.
+
+    Scopes can be nested: stats of an inner scope are added to the enclosing
+    scope on exit.
+    """
+    parent = _query_stats.get()
+    stats = QueryStats()
+    token = _query_stats.set(stats)
+
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(token)
+
+        if parent is not None:
+            parent.count += stats.count
+            parent.duration += stats.duration
+
+
+def _before_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, *args: Any
+) -> None:
+    context._query_start_time = time.perf_counter()
+
+
+def _after_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, *args: Any
+) -> None:
+    duration = time.perf_counter() - context._query_start_time
+    QUERY_DURATION_SECONDS.observe(duration)
+
+    if (stats := _query_stats.get()) is not None:
+        stats.count += 1
+        stats.duration += duration
+
+
+def instrument_engine(engine: Engine) -> None:
+    # See: https://docs.sqlalchemy.org/en/14/core/events.html#sqlalchemy.events.ConnectionEvents  # noqa
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional, Sequence
 
 from sqlalchemy import select
 from sqlalchemy.exc import NoResultFound
@@ -27,13 +27,17 @@ class SqlOrganizationRepository(OrganizationRepository):
             else:
                 return make_entity(instance)
 
-    async def insert(self, entity: Organization) -> Siret:
+    async def get_many_by_siret(self, sirets: Sequence[Siret]) -> List[Organization]:
         async with self._db.session() as session:
+            stmt = select(OrganizationModel).where(OrganizationModel.siret.in_(sirets))
+            result = await session.execute(stmt)
+            return [make_entity(instance) for instance in result.scalars().all()]
+
+    async def insert(self, entity: Organization) -> Siret:
+        async with self._db.transaction() as session:
             instance = make_instance(entity)
 
             session.add(instance)
-
-            await session.commit()
-            await session.refresh(instance)
+            await session.flush()
 
             return instance.siret
@@ -1,7 +1,8 @@
-from typing import Callable, Union
+from typing import Any, Callable, Union
 
 import uvicorn
 import uvicorn.supervisors
+import uvicorn.workers
 
 from server.config.di import resolve
 from server.config.settings import Settings
@@ -15,10 +16,15 @@ def get_server_config(
     if settings is None:
         settings = resolve(Settings)
 
-    kwargs = dict(
+    kwargs: dict = dict(
         host=settings.host,
         port=settings.port,
         log_config=get_log_config(settings),
+        loop=settings.server_loop,
+        http=settings.server_http,
+        backlog=settings.server_backlog,
+        timeout_keep_alive=settings.server_timeout_keep_alive,
+        limit_concurrency=settings.server_limit_concurrency,
     )
 
     if settings.server_mode == "local":
@@ -44,6 +50,30 @@ class Server(uvicorn.Server):
     pass
 
 
+class UvicornWorker(uvicorn.workers.UvicornWorker):
+    """
+    A Gunicorn worker class, which runs the app with the Uvicorn options of
+    `get_server_config()` in live mode.
+
+    Gunicorn options, e.g. `workers` or `timeout`, are set in `gunicorn.conf.py`.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        settings = Settings()
+
+        # Applied by the parent class, on top of options derived from Gunicorn's.
+        options: dict = dict(
+            loop=settings.server_loop,
+            http=settings.server_http,
+            limit_concurrency=settings.server_limit_concurrency,
+            proxy_headers=True,
+            root_path="/api",
+        )
+        self.CONFIG_KWARGS = options
+
+        super().__init__(*args, **kwargs)
+
+
 def run(app: Union[str, Callable]) -> int:
     """
     Run the API server.
@@ -11,6 +11,8 @@ from server.domain.tags.entities import Tag
 from server.domain.tags.repositories import TagRepository
 from server.infrastructure.database import Base, Database, mapper_registry
 
+from ..changes.models import bump_catalog_version
+
 if TYPE_CHECKING:
     from ..datasets.models import DatasetModel
 
@@ -75,11 +77,11 @@ class SqlTagRepository(TagRepository):
             return make_entity(instance)
 
     async def insert(self, entity: Tag) -> ID:
-        async with self._db.session() as session:
-            async with session.begin():
-                instance = make_instance(entity)
-                session.add(instance)
+        async with self._db.transaction() as session:
+            instance = make_instance(entity)
 
-            await session.refresh(instance)
+            session.add(instance)
+            await session.flush()
+            bump_catalog_version(session)
 
             return ID(instance.id)
@@ -5,12 +5,19 @@ from alembic import context
 from sqlalchemy import engine_from_config, pool
 from sqlalchemy.ext.asyncio import AsyncEngine
 
-from server.config.di import bootstrap, resolve
+# Register tables on the metadata, e.g. for autogenerate.
+# Migrations don't need the DI container, so don't pay for configuring it.
+import server.infrastructure.auth.repositories  # noqa
+import server.infrastructure.catalog_records.repositories  # noqa
+import server.infrastructure.catalogs.models  # noqa
+import server.infrastructure.changes.models  # noqa
+import server.infrastructure.datasets.models  # noqa
+import server.infrastructure.organizations.models  # noqa
+import server.infrastructure.tags.repositories  # noqa
 from server.config.settings import Settings
 from server.infrastructure.database import mapper_registry
 
-bootstrap()
-settings = resolve(Settings)
+settings = Settings()
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -31,7 +38,8 @@ config.set_main_option("sqlalchemy.echo", str(settings.debug))
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
 assert config.config_file_name
-fileConfig(config.config_file_name)
+# Keep loggers of the app enabled, e.g. when migrations run from tests.
+fileConfig(config.config_file_name, disable_existing_loggers=False)
 
 # add your model's MetaData object here
 # for 'autogenerate' support
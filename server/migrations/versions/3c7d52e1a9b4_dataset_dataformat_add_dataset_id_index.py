@@ -0,0 +1,29 @@
+"""dataset-dataformat-add-dataset-id-index
+
+Revision ID: 3c7d52e1a9b4
+Revises: 8a1f3e9c47d2
+Create Date: 2022-07-29 10:12:43.581204
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "3c7d52e1a9b4"
+down_revision = "8a1f3e9c47d2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        op.f("ix_dataset_dataformat_dataset_id"),
+        "dataset_dataformat",
+        ["dataset_id"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index(
+        op.f("ix_dataset_dataformat_dataset_id"), table_name="dataset_dataformat"
+    )
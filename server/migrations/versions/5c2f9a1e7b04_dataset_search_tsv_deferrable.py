@@ -0,0 +1,88 @@
+"""dataset-search-tsv-deferrable
+
+Revision ID: 5c2f9a1e7b04
+Revises: d41c8e7f5a36
+Create Date: 2022-08-10 15:02:11.481305
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5c2f9a1e7b04"
+down_revision = "d41c8e7f5a36"
+branch_labels = None
+depends_on = None
+
+# Bulk loads may skip search vector triggers using:
+#   SET LOCAL catalogage.defer_search_tsv = 'on'
+# and then compute search vectors once all rows are written, instead of computing
+# them on dataset insert, and again on dataset tag insert.
+UPGRADE_FUNCTIONS = [
+    """
+CREATE OR REPLACE FUNCTION dataset_search_tsv_trigger()
+RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF current_setting('catalogage.defer_search_tsv', true) = 'on' THEN
+        RETURN NEW;
+    END IF;
+    NEW.search_tsv := dataset_search_tsv(
+        NEW.id, NEW.title, NEW.description, NEW.service, NEW.geographical_coverage
+    );
+    RETURN NEW;
+END
+$$
+""",
+    """
+CREATE OR REPLACE FUNCTION dataset_tag_search_tsv_trigger()
+RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF current_setting('catalogage.defer_search_tsv', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+    UPDATE dataset
+    SET search_tsv = dataset_search_tsv(
+        id, title, description, service, geographical_coverage
+    )
+    WHERE id IN (SELECT dataset_id FROM changed_rows);
+    RETURN NULL;
+END
+$$
+""",
+]
+
+DOWNGRADE_FUNCTIONS = [
+    """
+CREATE OR REPLACE FUNCTION dataset_search_tsv_trigger()
+RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.search_tsv := dataset_search_tsv(
+        NEW.id, NEW.title, NEW.description, NEW.service, NEW.geographical_coverage
+    );
+    RETURN NEW;
+END
+$$
+""",
+    """
+CREATE OR REPLACE FUNCTION dataset_tag_search_tsv_trigger()
+RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE dataset
+    SET search_tsv = dataset_search_tsv(
+        id, title, description, service, geographical_coverage
+    )
+    WHERE id IN (SELECT dataset_id FROM changed_rows);
+    RETURN NULL;
+END
+$$
+""",
+]
+
+
+def upgrade():
+    for statement in UPGRADE_FUNCTIONS:
+        op.execute(statement)
+
+
+def downgrade():
+    for statement in DOWNGRADE_FUNCTIONS:
+        op.execute(statement)
@@ -0,0 +1,51 @@
+"""add-change-versions
+
+Revision ID: 5e2b9d04c1f8
+Revises: 3c7d52e1a9b4
+Create Date: 2022-08-01 09:41:27.306518
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5e2b9d04c1f8"
+down_revision = "3c7d52e1a9b4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    catalog_version = op.create_table(
+        "catalog_version",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("value", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "changed_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("clock_timestamp()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.bulk_insert(catalog_version, [{"id": 1, "value": 1}])
+
+    op.add_column(
+        "dataset",
+        sa.Column("version", sa.Integer(), server_default="1", nullable=False),
+    )
+    op.add_column(
+        "dataset",
+        sa.Column(
+            "changed_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("clock_timestamp()"),
+            nullable=False,
+        ),
+    )
+
+
+def downgrade():
+    op.drop_column("dataset", "changed_at")
+    op.drop_column("dataset", "version")
+    op.drop_table("catalog_version")
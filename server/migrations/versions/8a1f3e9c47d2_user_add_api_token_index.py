@@ -0,0 +1,22 @@
+"""user-add-api-token-index
+
+Revision ID: 8a1f3e9c47d2
+Revises: be5c1edc33de
+Create Date: 2022-07-26 14:37:05.218846
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "8a1f3e9c47d2"
+down_revision = "be5c1edc33de"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(op.f("ix_user_api_token"), "user", ["api_token"], unique=True)
+
+
+def downgrade():
+    op.drop_index(op.f("ix_user_api_token"), table_name="user")
@@ -0,0 +1,29 @@
+"""add-dataset-changes
+
+Revision ID: 8a3f61c2d7e9
+Revises: 5c2f9a1e7b04
+Create Date: 2022-08-11 10:12:43.517209
+
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "8a3f61c2d7e9"
+down_revision = "5c2f9a1e7b04"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "dataset_change",
+        sa.Column("catalog_version", sa.BigInteger(), nullable=False),
+        sa.Column("dataset_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.PrimaryKeyConstraint("catalog_version", "dataset_id"),
+    )
+
+
+def downgrade():
+    op.drop_table("dataset_change")
@@ -0,0 +1,31 @@
+"""dataset-add-title-trgm-index
+
+Revision ID: b7e4a0c2d913
+Revises: 5e2b9d04c1f8
+Create Date: 2022-08-03 16:05:12.842931
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b7e4a0c2d913"
+down_revision = "5e2b9d04c1f8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # NOTE: requires the pg_trgm extension. Creating it requires a superuser, so it
+    # is created on provisioning rather than here. See: docs/fr/ops.md
+    op.create_index(
+        "ix_dataset_title_trgm",
+        "dataset",
+        ["title"],
+        unique=False,
+        postgresql_using="GIN",
+        postgresql_ops={"title": "gin_trgm_ops"},
+    )
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_dataset_title_trgm")
@@ -0,0 +1,27 @@
+"""catalog-record-add-created-at-id-index
+
+Revision ID: be5c1edc33de
+Revises: f2ef4eef61e3
+Create Date: 2022-07-25 10:12:41.503218
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "be5c1edc33de"
+down_revision = "f2ef4eef61e3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_catalog_record_created_at_id",
+        "catalog_record",
+        ["created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index("ix_catalog_record_created_at_id", table_name="catalog_record")
@@ -0,0 +1,150 @@
+"""dataset-weighted-search-tsv
+
+Revision ID: d41c8e7f5a36
+Revises: b7e4a0c2d913
+Create Date: 2022-08-05 11:24:37.190264
+
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "d41c8e7f5a36"
+down_revision = "b7e4a0c2d913"
+branch_labels = None
+depends_on = None
+
+# Tags live in `dataset_tag`, which a generated column cannot refer to, so the
+# search vector is maintained by triggers instead.
+# Weights: title (A), service, geographical coverage and tags (B), description (C).
+CREATE_FUNCTIONS = [
+    """
+CREATE FUNCTION dataset_search_tsv(
+    id uuid, title text, description text, service text, geographical_coverage text
+) RETURNS tsvector LANGUAGE sql STABLE AS $$
+    SELECT
+        setweight(to_tsvector('french', coalesce(title, '')), 'A')
+        || setweight(
+            to_tsvector(
+                'french',
+                concat_ws(
+                    ' ',
+                    service,
+                    geographical_coverage,
+                    (
+                        SELECT string_agg(tag.name, ' ')
+                        FROM dataset_tag
+                        JOIN tag ON tag.id = dataset_tag.tag_id
+                        WHERE dataset_tag.dataset_id = dataset_search_tsv.id
+                    )
+                )
+            ),
+            'B'
+        )
+        || setweight(to_tsvector('french', coalesce(description, '')), 'C')
+$$
+""",
+    """
+CREATE FUNCTION dataset_search_tsv_trigger() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.search_tsv := dataset_search_tsv(
+        NEW.id, NEW.title, NEW.description, NEW.service, NEW.geographical_coverage
+    );
+    RETURN NEW;
+END
+$$
+""",
+    """
+CREATE FUNCTION dataset_tag_search_tsv_trigger() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE dataset
+    SET search_tsv = dataset_search_tsv(
+        id, title, description, service, geographical_coverage
+    )
+    WHERE id IN (SELECT dataset_id FROM changed_rows);
+    RETURN NULL;
+END
+$$
+""",
+]
+
+# Tags are refreshed once per statement rather than once per row, so that bulk
+# inserts only update each dataset once.
+CREATE_TRIGGERS = [
+    """
+CREATE TRIGGER dataset_search_tsv_update
+BEFORE INSERT OR UPDATE OF title, description, service, geographical_coverage
+ON dataset
+FOR EACH ROW EXECUTE FUNCTION dataset_search_tsv_trigger()
+""",
+    """
+CREATE TRIGGER dataset_tag_insert_search_tsv_update
+AFTER INSERT ON dataset_tag
+REFERENCING NEW TABLE AS changed_rows
+FOR EACH STATEMENT EXECUTE FUNCTION dataset_tag_search_tsv_trigger()
+""",
+    """
+CREATE TRIGGER dataset_tag_delete_search_tsv_update
+AFTER DELETE ON dataset_tag
+REFERENCING OLD TABLE AS changed_rows
+FOR EACH STATEMENT EXECUTE FUNCTION dataset_tag_search_tsv_trigger()
+""",
+]
+
+
+def upgrade():
+    op.drop_column("dataset", "search_tsv")  # Also drops ix_dataset_search_tsv.
+    op.add_column(
+        "dataset",
+        sa.Column("search_tsv", postgresql.TSVECTOR(), nullable=True),
+    )
+
+    for statement in [*CREATE_FUNCTIONS, *CREATE_TRIGGERS]:
+        op.execute(statement)
+
+    op.execute(
+        """
+        UPDATE dataset
+        SET search_tsv = dataset_search_tsv(
+            id, title, description, service, geographical_coverage
+        )
+        """
+    )
+
+    op.create_index(
+        "ix_dataset_search_tsv",
+        "dataset",
+        ["search_tsv"],
+        unique=False,
+        postgresql_using="GIN",
+    )
+
+
+def downgrade():
+    op.execute("DROP TRIGGER dataset_tag_delete_search_tsv_update ON dataset_tag")
+    op.execute("DROP TRIGGER dataset_tag_insert_search_tsv_update ON dataset_tag")
+    op.execute("DROP TRIGGER dataset_search_tsv_update ON dataset")
+    op.execute("DROP FUNCTION dataset_tag_search_tsv_trigger()")
+    op.execute("DROP FUNCTION dataset_search_tsv_trigger()")
+    op.execute("DROP FUNCTION dataset_search_tsv(uuid, text, text, text, text)")
+
+    op.drop_column("dataset", "search_tsv")
+    op.add_column(
+        "dataset",
+        sa.Column(
+            "search_tsv",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "to_tsvector('french', title || ' ' || description)", persisted=True
+            ),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_dataset_search_tsv",
+        "dataset",
+        ["search_tsv"],
+        unique=False,
+        postgresql_using="GIN",
+    )
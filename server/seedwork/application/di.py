@@ -1,4 +1,5 @@
-from typing import Callable, Optional, Type, TypeVar
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Type, TypeVar
 
 import punq
 
@@ -15,6 +16,7 @@ class Container:
     ) -> None:
         self._impl: Optional[punq.Container] = None
         self._configure = configure
+        self._overrides: Dict[type, Any] = {}
 
     def bootstrap(self) -> None:
         self._impl = punq.Container()
@@ -31,7 +33,21 @@ class Container:
         if self._impl is None:
             raise RuntimeError("Container not ready. Please call bootstrap()")
 
+        if type_ in self._overrides:
+            return self._overrides[type_]
+
         try:
             return self._impl.resolve(type_)
         except punq.MissingDependencyError:
             raise RuntimeError(f"Failed to resolve implementation for {type_}")
+
+    @contextmanager
+    def override(self, type_: Type[T], instance: T) -> Iterator[None]:
+        """
+        Register `instance` for the duration of a block, e.g. in tests.
+        """
+        self._overrides[type_] = instance
+        try:
+            yield
+        finally:
+            del self._overrides[type_]
@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+
+class Event(BaseModel):
+    """
+    Something that happened while handling a command, e.g. a dataset was created.
+    """
@@ -1,6 +1,7 @@
 from typing import Any, TypeVar, Union
 
 from .commands import Command
+from .events import Event
 from .queries import Query
 
 T = TypeVar("T")
@@ -9,3 +10,10 @@ T = TypeVar("T")
 class MessageBus:
     async def execute(self, message: Union[Command[T], Query[T]], **kwargs: Any) -> T:
         raise NotImplementedError
+
+    def publish(self, event: Event) -> None:
+        """
+        Notify event handlers once changes of the current command are committed.
+        Events of a command that fails are dropped.
+        """
+        raise NotImplementedError
@@ -1,12 +1,17 @@
+import functools
 import importlib
-from typing import ClassVar, List
+from typing import Callable, ClassVar, Dict, Iterator, List, Mapping, TypeVar
 
-from .types import CommandHandlers, QueryHandlers
+from .types import CommandHandlers, EventHandlers, QueryHandlers
+
+K = TypeVar("K")
+V = TypeVar("V")
 
 
 class Module:
     command_handlers: ClassVar[CommandHandlers] = {}
     query_handlers: ClassVar[QueryHandlers] = {}
+    event_handlers: ClassVar[EventHandlers] = {}
 
 
 def load_modules(paths: List[str]) -> List[Module]:
@@ -21,3 +26,64 @@ def load_modules(paths: List[str]) -> List[Module]:
         mod = importlib.import_module(modpath)
         modules.append(getattr(mod, classname))
     return modules
+
+
+class _LazyMapping(Mapping[K, V]):
+    def __init__(self, load: Callable[[], Mapping[K, V]]) -> None:
+        self._load = load
+
+    @functools.cached_property
+    def _data(self) -> Mapping[K, V]:
+        return self._load()
+
+    def __getitem__(self, key: K) -> V:
+        return self._data[key]
+
+    def __iter__(self) -> Iterator[K]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class Handlers:
+    """
+    Handlers of modules, by type of message.
+
+    Modules are loaded on first access, i.e. when a first message is dispatched,
+    rather than when the container is configured. Entrypoints that dispatch no
+    messages, e.g. migrations, don't import handlers and their dependencies.
+    """
+
+    def __init__(self, paths: List[str]) -> None:
+        self._paths = paths
+        self.command_handlers: CommandHandlers = _LazyMapping(self._get_commands)
+        self.query_handlers: QueryHandlers = _LazyMapping(self._get_queries)
+        self.event_handlers: EventHandlers = _LazyMapping(self._get_events)
+
+    @functools.cached_property
+    def modules(self) -> List[Module]:
+        return load_modules(self._paths)
+
+    def _get_commands(self) -> CommandHandlers:
+        return {
+            command: handler
+            for cls in self.modules
+            for command, handler in cls.command_handlers.items()
+        }
+
+    def _get_queries(self) -> QueryHandlers:
+        return {
+            query: handler
+            for cls in self.modules
+            for query, handler in cls.query_handlers.items()
+        }
+
+    def _get_events(self) -> EventHandlers:
+        event_handlers: Dict = {}
+
+        for cls in self.modules:
+            for event, handlers in cls.event_handlers.items():
+                event_handlers.setdefault(event, []).extend(handlers)
+
+        return event_handlers
@@ -1,8 +1,11 @@
-from typing import Awaitable, Callable, Dict, Type
+from typing import Awaitable, Callable, List, Mapping, Type
 
 from .commands import Command
+from .events import Event
 from .queries import Query
 
-CommandHandlers = Dict[Type[Command], Callable[..., Awaitable]]
+CommandHandlers = Mapping[Type[Command], Callable[..., Awaitable]]
 
-QueryHandlers = Dict[Type[Query], Callable[..., Awaitable]]
+QueryHandlers = Mapping[Type[Query], Callable[..., Awaitable]]
+
+EventHandlers = Mapping[Type[Event], List[Callable[..., None]]]
@@ -0,0 +1,24 @@
+from typing import AsyncContextManager, Callable
+
+
+class UnitOfWork:
+    """
+    Groups the changes made while handling a command, so that they are
+    committed all at once, or not at all.
+    """
+
+    def transaction(self) -> AsyncContextManager:
+        raise NotImplementedError  # pragma: no cover
+
+    def read_only(self) -> AsyncContextManager:
+        """
+        Run a block that makes no changes, e.g. a query. Reads may be served by
+        a replica, and so lag behind recent changes of other clients.
+        """
+        raise NotImplementedError  # pragma: no cover
+
+    def on_commit(self, callback: Callable[[], None]) -> None:
+        """
+        Defer `callback` until changes are committed, e.g. to invalidate caches.
+        """
+        raise NotImplementedError  # pragma: no cover
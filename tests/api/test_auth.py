@@ -1,17 +1,23 @@
-from typing import List
+import time
+from typing import Any, List
 
 import httpx
 import pytest
 from pydantic import EmailStr
+from starlette.requests import HTTPConnection
 
+from server.api.auth.backends.token import TokenAuthBackend
 from server.application.auth.queries import GetUserByEmail
-from server.config.di import resolve
+from server.config import Settings
+from server.config.di import override, resolve
 from server.domain.auth.exceptions import UserDoesNotExist
 from server.domain.common.types import id_factory
 from server.domain.organizations.entities import LEGACY_ORGANIZATION_SIRET
+from server.infrastructure.database import Database
 from server.seedwork.application.messages import MessageBus
 
-from ..helpers import TestUser
+from ..factories import CreateDatasetFactory
+from ..helpers import TestUser, to_payload
 
 
 @pytest.mark.asyncio
@@ -190,6 +196,10 @@ async def test_delete_user(
     with pytest.raises(UserDoesNotExist):
         await bus.execute(query)
 
+    # API token of the deleted user was cached above, but must not be valid anymore.
+    response = await client.get("/auth/check/", auth=temp_user.auth)
+    assert response.status_code == 401
+
 
 @pytest.mark.asyncio
 async def test_delete_user_idempotent(
@@ -202,3 +212,62 @@ async def test_delete_user_idempotent(
 
     response = await client.delete(f"/auth/users/{user_id}/", auth=admin_user.auth)
     assert response.status_code == 204
+
+
+@pytest.mark.asyncio
+async def test_read_your_writes_cookie(
+    client: httpx.AsyncClient, temp_user: TestUser
+) -> None:
+    settings = resolve(Settings)
+    url = settings.env_database_url
+    db = Database(url, replica_urls=[url], read_your_writes_window=5)
+
+    try:
+        with override(Database, db):
+            response = await client.get("/datasets/", auth=temp_user.auth)
+            assert response.status_code == 200
+            assert "last_write_at" not in response.cookies
+
+            response = await client.post(
+                "/datasets/",
+                json=to_payload(CreateDatasetFactory.build()),
+                auth=temp_user.auth,
+            )
+            assert response.status_code == 201
+            assert float(response.cookies["last_write_at"]) <= time.time()
+            assert "Max-Age=5" in response.headers["set-cookie"]
+    finally:
+        client.cookies.clear()
+        await db.dispose()
+
+
+@pytest.mark.asyncio
+async def test_read_your_writes_authentication(
+    client: httpx.AsyncClient, temp_user: TestUser, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    settings = resolve(Settings)
+    url = settings.env_database_url
+    db = Database(url, replica_urls=[url], read_your_writes_window=5)
+
+    authenticate = TokenAuthBackend.authenticate
+    binds = []
+
+    async def spy_authenticate(self: TokenAuthBackend, conn: HTTPConnection) -> Any:
+        async with db.read_only():
+            async with db.session() as session:
+                binds.append(session.bind)
+        return await authenticate(self, conn)
+
+    monkeypatch.setattr(TokenAuthBackend, "authenticate", spy_authenticate)
+
+    try:
+        with override(Database, db):
+            client.cookies.set("last_write_at", str(time.time()))
+            response = await client.get("/auth/check/", auth=temp_user.auth)
+            assert response.status_code == 200
+            # The client changed something just now: authentication must not
+            # read from a replica, which may lag behind.
+            assert binds == [db.engine]
+    finally:
+        client.cookies.clear()
+        await db.dispose()
@@ -1,5 +1,5 @@
 import random
-from typing import Any, List
+from typing import Any, Callable, ContextManager, List
 
 import httpx
 import pytest
@@ -7,11 +7,14 @@ import pytest
 from server.application.datasets.queries import GetDatasetByID
 from server.application.tags.commands import CreateTag
 from server.application.tags.queries import GetTagByID
+from server.application.tags.views import TagView
 from server.config.di import resolve
+from server.domain.common.pagination import Cursor
 from server.domain.common.types import id_factory
 from server.domain.datasets.entities import DataFormat, UpdateFrequency
 from server.domain.datasets.exceptions import DatasetDoesNotExist
 from server.domain.organizations.entities import LEGACY_ORGANIZATION_SIRET
+from server.infrastructure.metrics.sql import QueryStats
 from server.seedwork.application.messages import MessageBus
 from tests.factories import CreateDatasetFactory
 
@@ -214,6 +217,32 @@ async def add_dataset_pagination_corpus(n: int, tags: list) -> None:
         )
 
 
+@pytest.mark.asyncio
+async def test_create_dataset_num_queries(
+    client: httpx.AsyncClient,
+    temp_user: TestUser,
+    tags: List[TagView],
+    assert_num_queries: Callable[[int], ContextManager[QueryStats]],
+) -> None:
+    payload = to_payload(
+        CreateDatasetFactory.build(
+            formats=[DataFormat.API, DataFormat.WEBSITE],
+            tag_ids=[tag.id for tag in tags[:2]],
+        )
+    )
+
+    # Authenticate once, so that the user is cached.
+    response = await client.get("/auth/check/", auth=temp_user.auth)
+    assert response.status_code == 200
+
+    # NOTE: includes 2 SAVEPOINT statements of the test transaction.
+    with assert_num_queries(10):
+        response = await client.post("/datasets/", json=payload, auth=temp_user.auth)
+        assert response.status_code == 201
+
+    assert "db;dur=" in response.headers["Server-Timing"]
+
+
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
     "params, expected_total_pages, expected_num_items, expected_dataset_titles",
@@ -278,6 +307,101 @@ async def test_dataset_pagination(
     assert data["total_pages"] == expected_total_pages
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize("count_mode", ["exact", "estimated"])
+async def test_dataset_pagination_count_mode(
+    client: httpx.AsyncClient, temp_user: TestUser, tags: list, count_mode: str
+) -> None:
+    await add_dataset_pagination_corpus(n=3, tags=tags)
+
+    params = {"count_mode": count_mode}
+    response = await client.get("/datasets/", params=params, auth=temp_user.auth)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_items"] == 3
+    assert not data["total_items_estimated"]  # Small counts are always exact.
+
+
+@pytest.mark.asyncio
+async def test_dataset_cursor_pagination(
+    client: httpx.AsyncClient, temp_user: TestUser, tags: list
+) -> None:
+    await add_dataset_pagination_corpus(n=7, tags=tags)
+
+    response = await client.get(
+        "/datasets/", params={"page_size": 3}, auth=temp_user.auth
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["title"] for item in data["items"]] == [
+        "Dataset 7",
+        "Dataset 6",
+        "Dataset 5",
+    ]
+    assert data["previous_cursor"] is None
+    assert data["next_cursor"] is not None
+
+    params = {"page_size": 3, "cursor": data["next_cursor"]}
+    response = await client.get("/datasets/", params=params, auth=temp_user.auth)
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["title"] for item in data["items"]] == [
+        "Dataset 4",
+        "Dataset 3",
+        "Dataset 2",
+    ]
+    assert data["total_items"] == 7
+    assert data["previous_cursor"] is not None
+
+    params = {"page_size": 3, "cursor": data["next_cursor"]}
+    response = await client.get("/datasets/", params=params, auth=temp_user.auth)
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["title"] for item in data["items"]] == ["Dataset 1"]
+    assert data["next_cursor"] is None
+
+    params = {"page_size": 3, "cursor": data["previous_cursor"]}
+    response = await client.get("/datasets/", params=params, auth=temp_user.auth)
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["title"] for item in data["items"]] == [
+        "Dataset 4",
+        "Dataset 3",
+        "Dataset 2",
+    ]
+    assert data["next_cursor"] is not None
+
+    params = {"page_size": 3, "cursor": data["previous_cursor"]}
+    response = await client.get("/datasets/", params=params, auth=temp_user.auth)
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["title"] for item in data["items"]] == [
+        "Dataset 7",
+        "Dataset 6",
+        "Dataset 5",
+    ]
+    assert data["previous_cursor"] is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "params",
+    [
+        pytest.param({"cursor": "garbage"}, id="garbage"),
+        pytest.param(
+            # A valid non-search cursor cannot be used in a search.
+            {"q": "test", "cursor": Cursor(key=[]).encode()},
+            id="key-mismatch",
+        ),
+    ],
+)
+async def test_dataset_cursor_pagination_invalid(
+    client: httpx.AsyncClient, temp_user: TestUser, params: dict
+) -> None:
+    response = await client.get("/datasets/", params=params, auth=temp_user.auth)
+    assert response.status_code == 400
+
+
 @pytest.mark.asyncio
 async def test_dataset_get_all_uses_reverse_chronological_order(
     client: httpx.AsyncClient, temp_user: TestUser
@@ -359,7 +483,7 @@ class TestDatasetUpdate:
         self, client: httpx.AsyncClient, temp_user: TestUser
     ) -> None:
         bus = resolve(MessageBus)
-        dataset_id = await bus.execute(CreateDatasetFactory.build())
+        dataset_id = (await bus.execute(CreateDatasetFactory.build())).id
 
         # Apply PUT semantics, which expect a full entity.
         response = await client.put(
@@ -395,7 +519,7 @@ class TestDatasetUpdate:
         last_updated_at = fake.date_time_tz()
         command = CreateDatasetFactory.build(last_updated_at=last_updated_at)
 
-        dataset_id = await bus.execute(command)
+        dataset_id = (await bus.execute(command)).id
 
         response = await client.put(
             f"/datasets/{dataset_id}/",
@@ -434,7 +558,7 @@ class TestDatasetUpdate:
 
     async def test_update(self, client: httpx.AsyncClient, temp_user: TestUser) -> None:
         bus = resolve(MessageBus)
-        dataset_id = await bus.execute(CreateDatasetFactory.build())
+        dataset_id = (await bus.execute(CreateDatasetFactory.build())).id
 
         other_last_updated_at = fake.date_time_tz()
 
@@ -511,7 +635,7 @@ class TestFormats:
         command = CreateDatasetFactory.build(
             formats=[DataFormat.WEBSITE, DataFormat.API]
         )
-        dataset_id = await bus.execute(command)
+        dataset_id = (await bus.execute(command)).id
 
         response = await client.put(
             f"/datasets/{dataset_id}/",
@@ -534,7 +658,7 @@ class TestFormats:
         command = CreateDatasetFactory.build(
             formats=[DataFormat.WEBSITE, DataFormat.API]
         )
-        dataset_id = await bus.execute(command)
+        dataset_id = (await bus.execute(command)).id
 
         response = await client.put(
             f"/datasets/{dataset_id}/",
@@ -559,7 +683,7 @@ class TestTags:
         bus = resolve(MessageBus)
 
         command = CreateDatasetFactory.build()
-        dataset_id = await bus.execute(command)
+        dataset_id = (await bus.execute(command)).id
         tag_architecture_id = await bus.execute(CreateTag(name="Architecture"))
         tag_architecture = await bus.execute(GetTagByID(id=tag_architecture_id))
 
@@ -588,7 +712,7 @@ class TestTags:
 
         tag_architecture_id = await bus.execute(CreateTag(name="Architecture"))
         command = CreateDatasetFactory.build(tag_ids=[str(tag_architecture_id)])
-        dataset_id = await bus.execute(command)
+        dataset_id = (await bus.execute(command)).id
 
         response = await client.put(
             f"/datasets/{dataset_id}/",
@@ -614,7 +738,7 @@ class TestDeleteDataset:
     ) -> None:
         bus = resolve(MessageBus)
 
-        dataset_id = await bus.execute(CreateDatasetFactory.build())
+        dataset_id = (await bus.execute(CreateDatasetFactory.build())).id
 
         response = await client.delete(f"/datasets/{dataset_id}/", auth=admin_user.auth)
         assert response.status_code == 204
@@ -629,3 +753,77 @@ class TestDeleteDataset:
         dataset_id = id_factory()
         response = await client.delete(f"/datasets/{dataset_id}/", auth=admin_user.auth)
         assert response.status_code == 204
+
+
+@pytest.mark.asyncio
+async def test_get_dataset_conditional(
+    client: httpx.AsyncClient,
+    temp_user: TestUser,
+    assert_num_queries: Callable[[int], ContextManager[QueryStats]],
+) -> None:
+    bus = resolve(MessageBus)
+
+    dataset_id = (await bus.execute(CreateDatasetFactory.build())).id
+
+    response = await client.get(f"/datasets/{dataset_id}/", auth=temp_user.auth)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+    last_modified = response.headers["Last-Modified"]
+    assert response.headers["Cache-Control"] == "private, no-cache"
+
+    # Only the version is read.
+    # NOTE: includes 2 SAVEPOINT statements of the test transaction.
+    with assert_num_queries(3):
+        response = await client.get(
+            f"/datasets/{dataset_id}/",
+            headers={"If-None-Match": etag},
+            auth=temp_user.auth,
+        )
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert not response.content
+
+    response = await client.get(
+        f"/datasets/{dataset_id}/",
+        headers={"If-Modified-Since": last_modified},
+        auth=temp_user.auth,
+    )
+    assert response.status_code == 304
+
+    response = await client.get(
+        f"/datasets/{dataset_id}/",
+        headers={"If-None-Match": 'W/"0-0"'},
+        auth=temp_user.auth,
+    )
+    assert response.status_code == 200
+
+    # Updating tags only is a change, too.
+    tag_id = await bus.execute(CreateTag(name="Architecture"))
+    dataset = await bus.execute(GetDatasetByID(id=dataset_id))
+    await bus.execute(
+        UpdateDatasetFactory.build(
+            **dataset.dict(exclude={"catalog_record", "tags"}), tag_ids=[tag_id]
+        )
+    )
+
+    response = await client.get(
+        f"/datasets/{dataset_id}/",
+        headers={"If-None-Match": etag},
+        auth=temp_user.auth,
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()["tags"] == [{"id": str(tag_id), "name": "Architecture"}]
+
+
+@pytest.mark.asyncio
+async def test_get_dataset_conditional_not_found(
+    client: httpx.AsyncClient, temp_user: TestUser
+) -> None:
+    response = await client.get(
+        f"/datasets/{id_factory()}/",
+        headers={"If-None-Match": "*"},
+        auth=temp_user.auth,
+    )
+    assert response.status_code == 404
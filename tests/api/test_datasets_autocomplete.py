@@ -0,0 +1,90 @@
+from typing import List
+
+import httpx
+import pytest
+
+from server.config.di import resolve
+from server.seedwork.application.messages import MessageBus
+
+from ..factories import CreateDatasetFactory
+from ..helpers import TestUser
+
+
+async def add_titles(titles: List[str]) -> None:
+    bus = resolve(MessageBus)
+
+    for title in titles:
+        await bus.execute(CreateDatasetFactory.build(title=title))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "q, expected_titles",
+    [
+        pytest.param("zzz", [], id="no-match"),
+        pytest.param(
+            "inv", ["Inventaire des forêts", "Inventaire national"], id="prefix"
+        ),
+        pytest.param(
+            "nationnal", ["Cadastre national", "Inventaire national"], id="typo"
+        ),
+        pytest.param("cadastree", ["Cadastre national"], id="typo-extra-letter"),
+        pytest.param("100%_", [], id="like-wildcards"),
+    ],
+)
+async def test_autocomplete(
+    client: httpx.AsyncClient,
+    temp_user: TestUser,
+    q: str,
+    expected_titles: List[str],
+) -> None:
+    await add_titles(
+        ["Inventaire des forêts", "Inventaire national", "Cadastre national"]
+    )
+
+    response = await client.get(
+        "/datasets/autocomplete/", params={"q": q}, auth=temp_user.auth
+    )
+    assert response.status_code == 200
+    suggestions = response.json()
+    assert sorted(suggestion["title"] for suggestion in suggestions) == expected_titles
+    assert all(set(suggestion) == {"id", "title"} for suggestion in suggestions)
+
+
+@pytest.mark.asyncio
+async def test_autocomplete_prefix_first(
+    client: httpx.AsyncClient, temp_user: TestUser
+) -> None:
+    await add_titles(["Données du cadastre", "Cadastre national"])
+
+    response = await client.get(
+        "/datasets/autocomplete/", params={"q": "cadastre"}, auth=temp_user.auth
+    )
+    assert response.status_code == 200
+    titles = [suggestion["title"] for suggestion in response.json()]
+    assert titles == ["Cadastre national", "Données du cadastre"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "params",
+    [
+        pytest.param({}, id="q-missing"),
+        pytest.param({"q": ""}, id="q-empty"),
+        pytest.param({"q": "inv", "limit": 0}, id="limit-too-small"),
+        pytest.param({"q": "inv", "limit": 21}, id="limit-too-large"),
+    ],
+)
+async def test_autocomplete_invalid(
+    client: httpx.AsyncClient, temp_user: TestUser, params: dict
+) -> None:
+    response = await client.get(
+        "/datasets/autocomplete/", params=params, auth=temp_user.auth
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_autocomplete_permissions(client: httpx.AsyncClient) -> None:
+    response = await client.get("/datasets/autocomplete/", params={"q": "inv"})
+    assert response.status_code == 401
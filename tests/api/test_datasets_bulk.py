@@ -0,0 +1,145 @@
+import json
+from typing import List
+
+import httpx
+import pytest
+from sqlalchemy import delete
+
+from server.application.datasets.queries import GetDatasetByID
+from server.config.di import resolve
+from server.domain.common.types import id_factory
+from server.domain.datasets.entities import DataFormat
+from server.infrastructure.database import Database
+from server.infrastructure.datasets.models import DataFormatModel
+from server.seedwork.application.messages import MessageBus
+
+from ..factories import CreateTagFactory
+from ..helpers import TestUser
+
+
+def _ndjson(items: List[dict]) -> str:
+    return "".join(json.dumps(item) + "\n" for item in items)
+
+
+def _payload(**kwargs: object) -> dict:
+    return {
+        "title": "Example",
+        "description": "Example description",
+        "service": "Example service",
+        "geographical_coverage": "France métropolitaine",
+        "formats": ["api", "website"],
+        "contact_emails": ["example.person@mydomain.org"],
+        **kwargs,
+    }
+
+
+@pytest.mark.asyncio
+async def test_dataset_bulk_create(
+    client: httpx.AsyncClient, temp_user: TestUser
+) -> None:
+    bus = resolve(MessageBus)
+
+    tag_id = await bus.execute(CreateTagFactory.build(name="Architecture"))
+    unknown_tag_id = id_factory()
+
+    content = _ndjson(
+        [
+            _payload(title="Dataset 1", tag_ids=[str(tag_id), str(tag_id)]),
+            _payload(title="Dataset 2", formats=[]),
+            _payload(title="Dataset 3", tag_ids=[str(unknown_tag_id)]),
+        ]
+    )
+    content += "\n{not json\n"
+    content += json.dumps(_payload(title="Dataset 5", formats=["database"]))
+
+    response = await client.post(
+        "/datasets/bulk/",
+        content=content,
+        params={"batch_size": 2},
+        auth=temp_user.auth,
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert [result["line"] for result in results] == [1, 2, 3, 5, 6]
+
+    assert set(results[0]) == {"line", "id"}
+    dataset = await bus.execute(GetDatasetByID(id=results[0]["id"]))
+    assert dataset.title == "Dataset 1"
+    assert sorted(fmt.value for fmt in dataset.formats) == ["api", "website"]
+    assert [tag.id for tag in dataset.tags] == [tag_id]
+
+    assert [error["loc"] for error in results[1]["errors"]] == [["formats"]]
+
+    assert results[2]["errors"] == [
+        {
+            "loc": ["tag_ids", 0],
+            "msg": f"Tag not found: {unknown_tag_id!r}",
+            "type": "value_error.does_not_exist",
+        }
+    ]
+
+    assert results[3]["errors"][0]["type"] == "value_error.jsondecode"
+
+    dataset = await bus.execute(GetDatasetByID(id=results[4]["id"]))
+    assert dataset.title == "Dataset 5"
+
+    response = await client.get("/datasets/", auth=temp_user.auth)
+    assert response.json()["total_items"] == 2
+
+
+@pytest.mark.asyncio
+async def test_dataset_bulk_create_insert_error(
+    client: httpx.AsyncClient, temp_user: TestUser
+) -> None:
+    # Make inserting datasets with this format fail.
+    async with resolve(Database).transaction() as session:
+        await session.execute(
+            delete(DataFormatModel).where(DataFormatModel.name == DataFormat.DATABASE)
+        )
+
+    content = _ndjson(
+        [
+            _payload(title="Dataset 1"),
+            _payload(title="Dataset 2", tag_ids=[str(id_factory())]),
+            _payload(title="Dataset 3", formats=["database"]),
+            _payload(title="Dataset 4"),
+        ]
+    )
+
+    response = await client.post(
+        "/datasets/bulk/",
+        content=content,
+        params={"batch_size": 3},
+        auth=temp_user.auth,
+    )
+    assert response.status_code == 200
+
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert [result["line"] for result in results] == [1, 2, 3, 4]
+
+    # The failed batch is reported on each of its valid lines.
+    insert_error = {
+        "loc": [],
+        "msg": "Could not insert 2 datasets",
+        "type": "insert_error",
+    }
+    assert results[0]["errors"] == [insert_error]
+    assert results[1]["errors"][0]["type"] == "value_error.does_not_exist"
+    assert results[2]["errors"] == [insert_error]
+
+    # Next batches are still processed.
+    dataset = await resolve(MessageBus).execute(GetDatasetByID(id=results[3]["id"]))
+    assert dataset.title == "Dataset 4"
+
+    response = await client.get("/datasets/", auth=temp_user.auth)
+    assert response.json()["total_items"] == 1
+
+
+@pytest.mark.asyncio
+async def test_dataset_bulk_create_not_authenticated(
+    client: httpx.AsyncClient,
+) -> None:
+    response = await client.post("/datasets/bulk/", content=_ndjson([_payload()]))
+    assert response.status_code == 401
@@ -0,0 +1,144 @@
+import csv
+import io
+import json
+
+import httpx
+import pytest
+
+from server.config.di import resolve
+from server.domain.datasets.entities import DataFormat
+from server.seedwork.application.messages import MessageBus
+
+from ..factories import CreateDatasetFactory, CreateTagFactory
+from ..helpers import TestUser
+
+
+@pytest.mark.asyncio
+async def test_dataset_export_ndjson(
+    client: httpx.AsyncClient, temp_user: TestUser
+) -> None:
+    bus = resolve(MessageBus)
+
+    tag1_id = await bus.execute(CreateTagFactory.build(name="Musée de France"))
+    tag2_id = await bus.execute(CreateTagFactory.build(name="Architecture"))
+
+    dataset1_id = (
+        await bus.execute(
+            CreateDatasetFactory.build(
+                formats=[DataFormat.WEBSITE, DataFormat.API], tag_ids=[tag1_id, tag2_id]
+            )
+        )
+    ).id
+    dataset2_id = (
+        await bus.execute(
+            CreateDatasetFactory.build(formats=[DataFormat.DATABASE], tag_ids=[])
+        )
+    ).id
+
+    response = await client.get("/datasets/export/")
+    assert response.status_code == 401
+
+    response = await client.get("/datasets/export/", auth=temp_user.auth)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+
+    items = [json.loads(line) for line in response.text.splitlines()]
+
+    # Same order and representation as the listing endpoint.
+    response = await client.get("/datasets/", auth=temp_user.auth)
+    listing = response.json()["items"]
+    for item in listing:
+        del item["headlines"]
+    for item in (*items, *listing):
+        # Not ordered in listings.
+        item["formats"].sort()
+        item["tags"].sort(key=lambda tag: tag["name"])
+
+    assert [item["id"] for item in items] == [str(dataset2_id), str(dataset1_id)]
+    assert items[1]["formats"] == ["api", "website"]
+    assert [tag["name"] for tag in items[1]["tags"]] == [
+        "Architecture",
+        "Musée de France",
+    ]
+    assert items[0]["tags"] == []
+    assert items == listing
+
+
+@pytest.mark.asyncio
+async def test_dataset_export_csv(
+    client: httpx.AsyncClient, temp_user: TestUser
+) -> None:
+    bus = resolve(MessageBus)
+
+    tag_id = await bus.execute(CreateTagFactory.build(name="Architecture"))
+    dataset_id = (
+        await bus.execute(
+            CreateDatasetFactory.build(
+                title="Inventaire, 2022",
+                formats=[DataFormat.FILE_GIS, DataFormat.API],
+                contact_emails=["a@mydomain.org", "b@mydomain.org"],
+                tag_ids=[tag_id],
+            )
+        )
+    ).id
+
+    params = {"format": "csv"}
+    response = await client.get("/datasets/export/", params=params, auth=temp_user.auth)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert (
+        response.headers["content-disposition"] == 'attachment; filename="datasets.csv"'
+    )
+
+    (row,) = csv.DictReader(io.StringIO(response.text))
+    assert row["id"] == str(dataset_id)
+    assert row["title"] == "Inventaire, 2022"
+    assert set(row["formats"].split(";")) == {"api", "file_gis"}
+    assert row["contact_emails"] == "a@mydomain.org;b@mydomain.org"
+    assert row["tags"] == "Architecture"
+
+
+@pytest.mark.asyncio
+async def test_dataset_export_dcat(
+    client: httpx.AsyncClient, temp_user: TestUser
+) -> None:
+    bus = resolve(MessageBus)
+
+    for _ in range(2):
+        await bus.execute(
+            CreateDatasetFactory.build(
+                formats=[DataFormat.API],
+                contact_emails=["a@mydomain.org"],
+                url=None,
+            )
+        )
+
+    params = {"format": "jsonld"}
+    response = await client.get("/datasets/export/", params=params, auth=temp_user.auth)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/ld+json"
+
+    catalog = response.json()
+    assert catalog["@type"] == "dcat:Catalog"
+    assert "dcat" in catalog["@context"]
+    assert len(catalog["dcat:dataset"]) == 2
+
+    dataset = catalog["dcat:dataset"][0]
+    assert dataset["@type"] == "dcat:Dataset"
+    assert dataset["dcat:distribution"] == [
+        {"@type": "dcat:Distribution", "dct:format": "api"}
+    ]
+    assert dataset["dcat:contactPoint"] == [
+        {"@type": "vcard:Kind", "vcard:hasEmail": "mailto:a@mydomain.org"}
+    ]
+    assert "dcat:landingPage" not in dataset
+
+
+@pytest.mark.asyncio
+async def test_dataset_export_empty(
+    client: httpx.AsyncClient, temp_user: TestUser
+) -> None:
+    params = {"format": "jsonld"}
+    response = await client.get("/datasets/export/", params=params, auth=temp_user.auth)
+    assert response.status_code == 200
+    assert response.json()["dcat:dataset"] == []
@@ -3,13 +3,18 @@ from typing import Callable
 
 import httpx
 import pytest
+from sqlalchemy import update
 
+from server.application.datasets.commands import DeleteDataset
 from server.config.di import resolve
 from server.domain.common.types import ID, id_factory
 from server.domain.datasets.entities import DataFormat
+from server.infrastructure.changes.models import bump_catalog_version
+from server.infrastructure.database import Database
+from server.infrastructure.datasets.models import DatasetModel
 from server.seedwork.application.messages import MessageBus
 
-from ..factories import CreateDatasetFactory, CreateTagFactory
+from ..factories import CreateDatasetFactory, CreateTagFactory, UpdateDatasetFactory
 from ..helpers import TestUser
 
 
@@ -87,6 +92,70 @@ async def test_dataset_filters_info(
     ]
 
 
+@pytest.mark.asyncio
+async def test_dataset_filters_cache_invalidation(
+    client: httpx.AsyncClient, temp_user: TestUser
+) -> None:
+    bus = resolve(MessageBus)
+
+    dataset_id = (
+        await bus.execute(
+            CreateDatasetFactory.build(service="Service A", technical_source=None)
+        )
+    ).id
+
+    response = await client.get("/datasets/filters/", auth=temp_user.auth)
+    assert response.status_code == 200
+    assert response.json()["service"] == ["Service A"]
+
+    # Served from cache.
+    response = await client.get("/datasets/filters/", auth=temp_user.auth)
+    assert response.json()["service"] == ["Service A"]
+
+    command = UpdateDatasetFactory.build(
+        id=dataset_id, service="Service B", technical_source=None, tag_ids=[]
+    )
+    await bus.execute(command)
+    response = await client.get("/datasets/filters/", auth=temp_user.auth)
+    assert response.json()["service"] == ["Service B"]
+
+    tag_id = await bus.execute(CreateTagFactory.build(name="Architecture"))
+    response = await client.get("/datasets/filters/", auth=temp_user.auth)
+    assert response.json()["tag_id"] == [{"id": str(tag_id), "name": "Architecture"}]
+
+    await bus.execute(DeleteDataset(id=dataset_id))
+    response = await client.get("/datasets/filters/", auth=temp_user.auth)
+    assert response.json()["service"] == []
+
+
+@pytest.mark.asyncio
+async def test_dataset_filters_cache_catalog_version(
+    client: httpx.AsyncClient, temp_user: TestUser
+) -> None:
+    bus = resolve(MessageBus)
+
+    dataset_id = (
+        await bus.execute(
+            CreateDatasetFactory.build(service="Service A", technical_source=None)
+        )
+    ).id
+
+    response = await client.get("/datasets/filters/", auth=temp_user.auth)
+    assert response.json()["service"] == ["Service A"]
+
+    # Simulate a write by another process, which does not invalidate our cache.
+    async with resolve(Database).transaction() as session:
+        await session.execute(
+            update(DatasetModel)
+            .where(DatasetModel.id == dataset_id)
+            .values(service="Service B")
+        )
+        bump_catalog_version(session, [dataset_id])
+
+    response = await client.get("/datasets/filters/", auth=temp_user.auth)
+    assert response.json()["service"] == ["Service B"]
+
+
 @dataclass
 class _Env:
     tag_id: ID
@@ -153,7 +222,9 @@ async def test_dataset_filters_apply(
     tag_id = await bus.execute(CreateTagFactory.build())
     env = _Env(tag_id=tag_id)
 
-    dataset_id = await bus.execute(CreateDatasetFactory.build(**create_kwargs(env)))
+    dataset_id = (
+        await bus.execute(CreateDatasetFactory.build(**create_kwargs(env)))
+    ).id
 
     params = {filtername: negative_value(env)}
     response = await client.get("/datasets/", params=params, auth=temp_user.auth)
@@ -175,12 +246,14 @@ async def test_dataset_filters_license_any(
 ) -> None:
     bus = resolve(MessageBus)
 
-    dataset1_id = await bus.execute(
-        CreateDatasetFactory.build(license="Licence Ouverte")
-    )
-    dataset2_id = await bus.execute(
-        CreateDatasetFactory.build(license="ODC Open Database Licence v1.0")
-    )
+    dataset1_id = (
+        await bus.execute(CreateDatasetFactory.build(license="Licence Ouverte"))
+    ).id
+    dataset2_id = (
+        await bus.execute(
+            CreateDatasetFactory.build(license="ODC Open Database Licence v1.0")
+        )
+    ).id
 
     params = {"license": "*"}
     response = await client.get("/datasets/", params=params, auth=temp_user.auth)
@@ -191,3 +264,113 @@ async def test_dataset_filters_license_any(
         str(dataset2_id),
         str(dataset1_id),
     ]
+
+
+@pytest.mark.asyncio
+async def test_dataset_facets(client: httpx.AsyncClient, temp_user: TestUser) -> None:
+    bus = resolve(MessageBus)
+
+    tag_id = await bus.execute(CreateTagFactory.build(name="Architecture"))
+
+    await bus.execute(
+        CreateDatasetFactory.build(
+            geographical_coverage="France métropolitaine",
+            service="Service A",
+            formats=[DataFormat.FILE_GIS, DataFormat.API],
+            technical_source="SGBD central",
+            tag_ids=[tag_id],
+            license="Licence Ouverte",
+        )
+    )
+    await bus.execute(
+        CreateDatasetFactory.build(
+            geographical_coverage="France métropolitaine",
+            service="Service B",
+            formats=[DataFormat.FILE_GIS],
+            technical_source=None,
+            tag_ids=[],
+            license=None,
+        )
+    )
+    await bus.execute(
+        CreateDatasetFactory.build(
+            geographical_coverage="Hauts-de-France",
+            service="Service A",
+            formats=[DataFormat.DATABASE],
+            technical_source="SGBD central",
+            tag_ids=[tag_id],
+            license="Licence Ouverte",
+        )
+    )
+
+    response = await client.get("/datasets/", auth=temp_user.auth)
+    assert response.status_code == 200
+    assert response.json()["facets"] is None
+
+    params: dict = {"facets": True}
+    response = await client.get("/datasets/", params=params, auth=temp_user.auth)
+    assert response.status_code == 200
+    assert response.json()["facets"] == {
+        "geographical_coverage": {"France métropolitaine": 2, "Hauts-de-France": 1},
+        "service": {"Service A": 2, "Service B": 1},
+        "format": {"file_gis": 2, "api": 1, "database": 1},
+        "technical_source": {"SGBD central": 2},
+        "tag_id": {str(tag_id): 2},
+        "license": {"Licence Ouverte": 2},
+    }
+
+    # Counts apply to datasets that match filters.
+    params = {"facets": True, "geographical_coverage": ["France métropolitaine"]}
+    response = await client.get("/datasets/", params=params, auth=temp_user.auth)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_items"] == 2
+    assert data["facets"] == {
+        "geographical_coverage": {"France métropolitaine": 2},
+        "service": {"Service A": 1, "Service B": 1},
+        "format": {"file_gis": 2, "api": 1},
+        "technical_source": {"SGBD central": 1},
+        "tag_id": {str(tag_id): 1},
+        "license": {"Licence Ouverte": 1},
+    }
+
+
+@pytest.mark.asyncio
+async def test_dataset_filters_conditional(
+    client: httpx.AsyncClient, temp_user: TestUser
+) -> None:
+    bus = resolve(MessageBus)
+
+    response = await client.get("/datasets/filters/", auth=temp_user.auth)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    response = await client.get(
+        "/datasets/filters/", headers={"If-None-Match": etag}, auth=temp_user.auth
+    )
+    assert response.status_code == 304
+
+    # Any change to datasets or tags makes a new version.
+    await bus.execute(CreateTagFactory.build(name="Architecture"))
+
+    response = await client.get(
+        "/datasets/filters/", headers={"If-None-Match": etag}, auth=temp_user.auth
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    etag = response.headers["ETag"]
+
+    dataset_id = (await bus.execute(CreateDatasetFactory.build())).id
+
+    response = await client.get(
+        "/datasets/filters/", headers={"If-None-Match": etag}, auth=temp_user.auth
+    )
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    await bus.execute(DeleteDataset(id=dataset_id))
+
+    response = await client.get(
+        "/datasets/filters/", headers={"If-None-Match": etag}, auth=temp_user.auth
+    )
+    assert response.status_code == 200
@@ -1,17 +1,43 @@
+import asyncio
 import random
-from typing import List, Optional, Tuple
+from typing import Any, AsyncIterator, Iterator, List, Optional, Tuple
 
 import httpx
 import pytest
 
 from server.application.datasets.commands import DeleteDataset
-from server.application.datasets.queries import GetDatasetByID
-from server.config.di import resolve
+from server.application.datasets.queries import GetAllDatasets, GetDatasetByID
+from server.config.di import override, resolve
+from server.domain.changes.repositories import ChangeVersionRepository
+from server.domain.datasets.entities import DataFormat, Dataset
+from server.domain.datasets.repositories import DatasetRepository
+from server.domain.datasets.search import SearchIndex
+from server.domain.datasets.specifications import DatasetSpec, SearchRankNormalization
+from server.infrastructure.datasets.search import BM25SearchIndex
 from server.seedwork.application.messages import MessageBus
-from tests.factories import CreateDatasetFactory, UpdateDatasetFactory
+from tests.factories import CreateDatasetFactory, CreateTagFactory, UpdateDatasetFactory
 
 from ..helpers import TestUser
 
+
+@pytest.fixture(autouse=True, params=["postgres", "bm25"])
+def search_index(request: Any) -> Iterator[str]:
+    """
+    Run each test against each search index.
+    """
+    if request.param == "postgres":
+        yield request.param
+        return
+
+    # A fresh index, which won't see datasets of other tests.
+    search_index = BM25SearchIndex(
+        resolve(DatasetRepository), resolve(ChangeVersionRepository)
+    )
+
+    with override(SearchIndex, search_index):
+        yield request.param
+
+
 DEFAULT_CORPUS_ITEMS = [
     ("Inventaire national forestier", "Ensemble des forêts de France"),
     ("Base Carbone", "Inventaire des données climat de l'ADEME"),
@@ -27,7 +53,7 @@ async def add_corpus(items: List[Tuple[str, str]] = None) -> None:
 
     for title, description in items:
         command = CreateDatasetFactory.build(title=title, description=description)
-        pk = await bus.execute(command)
+        pk = (await bus.execute(command)).id
         query = GetDatasetByID(id=pk)
         await bus.execute(query)
 
@@ -73,7 +99,7 @@ async def add_corpus(items: List[Tuple[str, str]] = None) -> None:
         ),
         pytest.param(
             "base",
-            ["Cadastre national", "Base Carbone"],
+            ["Base Carbone", "Cadastre national"],  # Title matches rank higher.
             id="terms:single-results:multiple-title-description",
         ),
         pytest.param(
@@ -142,6 +168,49 @@ async def test_search_robustness(
     assert reference_titles == other_titles
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "q, expected_titles",
+    [
+        pytest.param("", [], id="terms:none"),
+        pytest.param("!? & ||", [], id="terms:no-words"),
+        pytest.param("hello!? hm?m & || ch@rs'); \"quote", [], id="terms:garbage"),
+        pytest.param("carb", ["Base Carbone"], id="terms:single"),
+        pytest.param("car", [], id="terms:single:too-short-for-prefix"),
+        pytest.param(
+            "inventaire nation",
+            ["Inventaire national forestier"],
+            id="terms:multiple",
+        ),
+    ],
+)
+async def test_search_prefix(
+    client: httpx.AsyncClient, temp_user: TestUser, q: str, expected_titles: List[str]
+) -> None:
+    await add_corpus()
+
+    response = await client.get(
+        "/datasets/",
+        params={"q": q, "search_mode": "prefix"},
+        auth=temp_user.auth,
+    )
+    assert response.status_code == 200
+    data = response.json()
+    titles = [item["title"] for item in data["items"]]
+    assert titles == expected_titles
+
+
+@pytest.mark.asyncio
+async def test_search_prefix_plain_mode(
+    client: httpx.AsyncClient, temp_user: TestUser
+) -> None:
+    await add_corpus()
+
+    response = await client.get("/datasets/", params={"q": "carb"}, auth=temp_user.auth)
+    assert response.status_code == 200
+    assert response.json()["items"] == []
+
+
 @pytest.mark.asyncio
 async def test_search_results_change_when_data_changes(
     client: httpx.AsyncClient,
@@ -163,7 +232,7 @@ async def test_search_results_change_when_data_changes(
 
     # Add new dataset
     command = CreateDatasetFactory.build(title="Titre")
-    pk = await bus.execute(command)
+    pk = (await bus.execute(command)).id
     # New dataset is returned in search results
     response = await client.get(
         "/datasets/",
@@ -219,7 +288,139 @@ async def test_search_results_change_when_data_changes(
 
 
 @pytest.mark.asyncio
-async def test_search_ranking(client: httpx.AsyncClient, temp_user: TestUser) -> None:
+async def test_search_results_change_when_other_processes_write(
+    client: httpx.AsyncClient, temp_user: TestUser
+) -> None:
+    await add_corpus()
+
+    async def search(q: str) -> list:
+        response = await client.get("/datasets/", params={"q": q}, auth=temp_user.auth)
+        assert response.status_code == 200
+        return response.json()["items"]
+
+    (carbone,) = await search("carbone")
+    (cadastre,) = await search("cadastre")
+
+    # Simulate writes by another process, which this process is not told about.
+    repository = resolve(DatasetRepository)
+    dataset = await repository.get_by_id(carbone["id"])
+    assert dataset is not None
+    dataset.title = "Base Charbon"
+    await repository.update(dataset)
+    await repository.delete(cadastre["id"])
+
+    assert not await search("carbone")
+    assert [item["title"] for item in await search("charbon")] == ["Base Charbon"]
+    assert not await search("cadastre")
+
+
+@pytest.mark.asyncio
+async def test_search_index_loaded_once(
+    search_index: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    if search_index != "bm25":
+        pytest.skip("Only the BM25 index is loaded")
+
+    await add_corpus()
+
+    repository = resolve(DatasetRepository)
+    stream_all = repository.stream_all
+    calls = []
+
+    def counting_stream_all() -> AsyncIterator[Dataset]:
+        calls.append(1)
+        return stream_all()
+
+    monkeypatch.setattr(repository, "stream_all", counting_stream_all)
+
+    index = resolve(SearchIndex)
+    await asyncio.gather(index.load(), index.load(), index.load())
+    assert len(calls) == 1
+
+    items, _, _ = await index.search(spec=DatasetSpec(search_term="carbone"))
+    assert [dataset.title for dataset, _ in items] == ["Base Carbone"]
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_search_index_reads_changed_datasets_only(
+    search_index: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    if search_index != "bm25":
+        pytest.skip("Only the BM25 index is loaded")
+
+    await add_corpus()
+
+    index = resolve(SearchIndex)
+    await index.load()
+
+    bus = resolve(MessageBus)
+    dataset = await bus.execute(CreateDatasetFactory.build(title="Base Charbon"))
+
+    repository = resolve(DatasetRepository)
+    get_many = repository.get_many
+    calls: List[List[Any]] = []
+
+    async def recording_get_many(ids: List[Any]) -> List[Dataset]:
+        calls.append(list(ids))
+        return await get_many(ids)
+
+    monkeypatch.setattr(repository, "get_many", recording_get_many)
+
+    items, _, _ = await index.search(spec=DatasetSpec(search_term="charbon"))
+    assert [item.title for item, _ in items] == ["Base Charbon"]
+
+    # The refresh, then the page of results.
+    assert calls == [[dataset.id], [dataset.id]]
+
+
+@pytest.mark.asyncio
+async def test_search_index_facets_reuse_search_hits(
+    search_index: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    if search_index != "bm25":
+        pytest.skip("Only the BM25 index keeps hits")
+
+    await add_corpus()
+
+    index = resolve(SearchIndex)
+    await index.load()
+
+    bm25 = index._index  # type: ignore[attr-defined]
+    search = bm25.search
+    calls: List[str] = []
+
+    def recording_search(term: str, **kwargs: Any) -> Any:
+        calls.append(term)
+        return search(term, **kwargs)
+
+    monkeypatch.setattr(bm25, "search", recording_search)
+
+    spec = DatasetSpec(search_term="forêt")
+    items, count, _ = await index.search(spec=spec)
+    counts = await index.get_facet_counts(spec=spec)
+    assert sum(counts["service"].values()) == count.value == len(items)
+    assert calls == ["forêt"]
+
+    # Hits are scored again once the catalog has changed.
+    bus = resolve(MessageBus)
+    await bus.execute(CreateDatasetFactory.build(title="Forêt domaniale"))
+    counts = await index.get_facet_counts(spec=spec)
+    assert sum(counts["service"].values()) == count.value + 1
+    assert calls == ["forêt", "forêt"]
+
+
+def skip_unless_postgres(search_index: str) -> None:
+    if search_index != "postgres":
+        pytest.skip("Relies on PostgreSQL ranking, which accounts for proximity")
+
+
+@pytest.mark.asyncio
+async def test_search_ranking(
+    client: httpx.AsyncClient, temp_user: TestUser, search_index: str
+) -> None:
+    skip_unless_postgres(search_index)
+
     items = [
         ("A", "..."),
         ("B", "Forêt nouvelle"),
@@ -245,6 +446,232 @@ async def test_search_ranking(client: httpx.AsyncClient, temp_user: TestUser) ->
     assert titles == expected_titles
 
 
+@pytest.mark.asyncio
+async def test_search_ranking_weights(
+    client: httpx.AsyncClient, temp_user: TestUser
+) -> None:
+    bus = resolve(MessageBus)
+
+    for title, description, service in [
+        ("Routes départementales", "Réseau routier", "Direction des transports"),
+        ("Réseau routier", "Voies navigables", "Direction de l'eau"),
+        ("Voies navigables", "Canaux et rivières", "Service du réseau fluvial"),
+    ]:
+        command = CreateDatasetFactory.build(
+            title=title, description=description, service=service
+        )
+        await bus.execute(command)
+
+    # Title matches first, then service matches, then description matches.
+    expected_titles = ["Réseau routier", "Voies navigables", "Routes départementales"]
+
+    response = await client.get(
+        "/datasets/", params={"q": "réseau"}, auth=temp_user.auth
+    )
+    assert response.status_code == 200
+    titles = [item["title"] for item in response.json()["items"]]
+    assert titles == expected_titles
+
+
+@pytest.mark.asyncio
+async def test_search_rank_normalization(search_index: str) -> None:
+    skip_unless_postgres(search_index)
+
+    bus = resolve(MessageBus)
+
+    await add_corpus(
+        [
+            ("A", "Forêt domaniale"),
+            ("B", "Forêt " + "et autres espaces naturels " * 20),
+        ]
+    )
+
+    # Length is ignored by default: equal ranks are sorted by creation date,
+    # most recent first.
+    query = GetAllDatasets(spec=DatasetSpec(search_term="forêt"))
+    items = (await bus.execute(query)).items
+    assert [item.title for item in items] == ["B", "A"]
+
+    query = GetAllDatasets(
+        spec=DatasetSpec(
+            search_term="forêt",
+            search_rank_normalization=SearchRankNormalization.LENGTH,
+        )
+    )
+    items = (await bus.execute(query)).items
+    assert [item.title for item in items] == ["A", "B"]
+
+
+@pytest.mark.asyncio
+async def test_search_tags_service_geographical_coverage(
+    client: httpx.AsyncClient, temp_user: TestUser
+) -> None:
+    bus = resolve(MessageBus)
+
+    tag_id = await bus.execute(CreateTagFactory.build(name="Architecture"))
+    command = CreateDatasetFactory.build(
+        title="Bâtiments publics",
+        description="Liste des bâtiments",
+        service="Ministère de la culture",
+        geographical_coverage="Bretagne",
+        tag_ids=[tag_id],
+    )
+    pk = (await bus.execute(command)).id
+
+    for q in ("architecture", "culture", "bretagne"):
+        response = await client.get("/datasets/", params={"q": q}, auth=temp_user.auth)
+        assert response.status_code == 200
+        assert [item["id"] for item in response.json()["items"]] == [str(pk)], q
+
+    # Removing a tag updates search results.
+    update_command = UpdateDatasetFactory.build(
+        id=pk, **command.dict(exclude={"tag_ids"}), tag_ids=[]
+    )
+    await bus.execute(update_command)
+
+    response = await client.get(
+        "/datasets/", params={"q": "architecture"}, auth=temp_user.auth
+    )
+    assert response.status_code == 200
+    assert not response.json()["items"]
+
+
+@pytest.mark.asyncio
+async def test_search_cursor_pagination(
+    client: httpx.AsyncClient, temp_user: TestUser, search_index: str
+) -> None:
+    skip_unless_postgres(search_index)
+
+    items = [
+        ("C", "Historique des forêts anciennes"),
+        ("D", "Ancien historique des forêts"),
+        ("E", "Historique des forêts anciennes"),
+    ]
+
+    await add_corpus(items)
+
+    q = "Forêt ancienne"
+    params: dict = {"q": q, "page_size": 2}
+    response = await client.get("/datasets/", params=params, auth=temp_user.auth)
+    assert response.status_code == 200
+    data = response.json()
+    # Ties in rank are broken by reverse creation order.
+    assert [item["title"] for item in data["items"]] == ["E", "C"]
+
+    params = {"q": q, "page_size": 2, "cursor": data["next_cursor"]}
+    response = await client.get("/datasets/", params=params, auth=temp_user.auth)
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["title"] for item in data["items"]] == ["D"]
+    assert data["next_cursor"] is None
+    assert data["previous_cursor"] is not None
+
+
+@pytest.mark.asyncio
+async def test_search_cursor_pagination_both_directions(
+    client: httpx.AsyncClient, temp_user: TestUser
+) -> None:
+    bus = resolve(MessageBus)
+
+    for title, description in [
+        ("Forêts", "Inventaire"),
+        ("A", "Forêts domaniales"),
+        ("B", "Forêts domaniales"),
+        ("C", "Forêts domaniales"),
+    ]:
+        # Same lengths, so that BM25 ranks are tied too.
+        command = CreateDatasetFactory.build(
+            title=title,
+            description=description,
+            service="ONF",
+            geographical_coverage="France",
+        )
+        await bus.execute(command)
+
+    # Title matches first, then ties in rank by reverse creation order.
+    pages = [["Forêts", "C"], ["B", "A"]]
+
+    params: dict = {"q": "forêt", "page_size": 2}
+    response = await client.get("/datasets/", params=params, auth=temp_user.auth)
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["title"] for item in data["items"]] == pages[0]
+    assert data["previous_cursor"] is None
+
+    params = {**params, "cursor": data["next_cursor"]}
+    response = await client.get("/datasets/", params=params, auth=temp_user.auth)
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["title"] for item in data["items"]] == pages[1]
+    assert data["total_items"] == 4
+    assert data["next_cursor"] is None
+
+    params = {**params, "cursor": data["previous_cursor"]}
+    response = await client.get("/datasets/", params=params, auth=temp_user.auth)
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["title"] for item in data["items"]] == pages[0]
+    assert data["previous_cursor"] is None
+    assert data["next_cursor"] is not None
+
+
+@pytest.mark.asyncio
+async def test_search_filters_facets(
+    client: httpx.AsyncClient, temp_user: TestUser
+) -> None:
+    bus = resolve(MessageBus)
+
+    tag_id = await bus.execute(CreateTagFactory.build(name="Nature"))
+
+    for title, service, formats, tag_ids, license in [
+        ("Forêts", "Service A", [DataFormat.FILE_GIS], [tag_id], "Licence Ouverte"),
+        ("Forêts", "Service B", [DataFormat.API], [], None),
+        ("Forêts", "Service A", [DataFormat.API], [], "ODbL"),
+        ("Rivières", "Service A", [DataFormat.API], [tag_id], "Licence Ouverte"),
+    ]:
+        command = CreateDatasetFactory.build(
+            title=title,
+            description="...",
+            geographical_coverage="France",
+            service=service,
+            formats=formats,
+            technical_source=None,
+            tag_ids=tag_ids,
+            license=license,
+        )
+        await bus.execute(command)
+
+    params: dict = {"q": "forêt", "facets": True}
+    response = await client.get("/datasets/", params=params, auth=temp_user.auth)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_items"] == 3
+    assert data["facets"] == {
+        "geographical_coverage": {"France": 3},
+        "service": {"Service A": 2, "Service B": 1},
+        "format": {"file_gis": 1, "api": 2},
+        "technical_source": {},
+        "tag_id": {str(tag_id): 1},
+        "license": {"Licence Ouverte": 1, "ODbL": 1},
+    }
+
+    cases: List[Tuple[dict, int]] = [
+        ({"service": ["Service A"]}, 2),
+        ({"format": ["api"]}, 2),
+        ({"tag_id": [str(tag_id)]}, 1),
+        ({"license": "*"}, 2),
+        ({"license": "ODbL"}, 1),
+        ({"geographical_coverage": ["Bretagne"]}, 0),
+        ({"technical_source": ["SGBD"]}, 0),
+    ]
+
+    for filters, expected_total in cases:
+        params = {"q": "forêt", **filters}
+        response = await client.get("/datasets/", params=params, auth=temp_user.auth)
+        assert response.status_code == 200
+        assert response.json()["total_items"] == expected_total, filters
+
+
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
     "corpus, q, expected_headlines",
@@ -0,0 +1,138 @@
+import logging
+from typing import Dict, Optional
+
+import httpx
+import pytest
+from prometheus_client.parser import text_string_to_metric_families
+from prometheus_client.samples import Sample
+from starlette.types import Scope
+
+from server.api.app import create_app
+from server.api.metrics import middleware
+from server.config import Settings
+from server.config.di import resolve
+
+from ..helpers import TestUser, create_client
+
+
+async def get_samples(client: httpx.AsyncClient) -> Dict[str, Dict[str, Sample]]:
+    response = await client.get("/metrics/", headers={"X-Api-Key": "<metrics>"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+
+    samples: Dict[str, Dict[str, Sample]] = {}
+
+    for family in text_string_to_metric_families(response.text):
+        for sample in family.samples:
+            key = ",".join(f"{k}={v}" for k, v in sorted(sample.labels.items()))
+            samples.setdefault(sample.name, {})[key] = sample
+
+    return samples
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("headers", [{}, {"X-Api-Key": "invalid"}])
+async def test_metrics_api_key_required(
+    client: httpx.AsyncClient, headers: Dict[str, str]
+) -> None:
+    response = await client.get("/metrics/", headers=headers)
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_metrics_pool(client: httpx.AsyncClient) -> None:
+    samples = await get_samples(client)
+
+    assert samples["catalogage_db_pool_size"][""].value == 10
+    assert "catalogage_db_pool_checked_out" in samples
+    assert "catalogage_db_pool_overflow" in samples
+    assert "catalogage_db_pool_wait_seconds_count" in samples
+
+
+@pytest.mark.asyncio
+async def test_metrics_requests(client: httpx.AsyncClient, temp_user: TestUser) -> None:
+    def get_count(samples: dict, name: str, key: str) -> float:
+        sample = samples.get(name, {}).get(key)
+        return sample.value if sample is not None else 0
+
+    before = await get_samples(client)
+
+    response = await client.get("/datasets/", auth=temp_user.auth)
+    assert response.status_code == 200
+    response = await client.get("/datasets/filters/", auth=temp_user.auth)
+    assert response.status_code == 200
+    response = await client.get("/datasets/not-a-uuid/", auth=temp_user.auth)
+    assert response.status_code == 422
+
+    after = await get_samples(client)
+
+    # Message bus, per message type
+    name = "catalogage_bus_message_duration_seconds_count"
+    key = "message=GetAllDatasets"
+    assert get_count(after, name, key) == get_count(before, name, key) + 1
+    assert "message=GetAllDatasets" in after["catalogage_bus_messages_in_progress"]
+    assert "message=GetAllDatasets" in after["catalogage_bus_message_errors_total"]
+
+    # HTTP requests, per route template
+    name = "catalogage_http_request_duration_seconds_count"
+    key = "method=GET,route=/datasets/,status=200"
+    assert get_count(after, name, key) == get_count(before, name, key) + 1
+    key = "method=GET,route=/datasets/{id}/,status=422"
+    assert get_count(after, name, key) == get_count(before, name, key) + 1
+
+    # SQL statements, per request
+    name = "catalogage_http_request_db_queries_sum"
+    key = "method=GET,route=/datasets/"
+    assert get_count(after, name, key) > get_count(before, name, key)
+    assert after["catalogage_db_query_duration_seconds_count"][""].value > 0
+
+
+@pytest.mark.asyncio
+async def test_query_budget(
+    client: httpx.AsyncClient, temp_user: TestUser, caplog: pytest.LogCaptureFixture
+) -> None:
+    response = await client.get("/datasets/", auth=temp_user.auth)
+    assert response.status_code == 200
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+    assert "queries" in response.headers["Server-Timing"]
+
+    settings = resolve(Settings).copy(
+        update={"db_query_budget": 100, "db_query_budgets": {"/datasets/": 1}}
+    )
+
+    async with create_client(create_app(settings)) as client:
+        with caplog.at_level(logging.WARNING):
+            response = await client.get("/datasets/", auth=temp_user.auth)
+            assert response.status_code == 200
+            response = await client.get("/tags/", auth=temp_user.auth)
+            assert response.status_code == 200
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert len(messages) == 1
+    assert messages[0].startswith("GET /datasets/ executed")
+    assert "(budget: 1)" in messages[0]
+
+
+@pytest.mark.asyncio
+async def test_metrics_route_resolved_once(
+    client: httpx.AsyncClient, temp_user: TestUser, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    calls = []
+    match_route = middleware._match_route
+
+    def spy_match_route(scope: Scope) -> Optional[str]:
+        route = match_route(scope)
+        calls.append(route)
+        return route
+
+    monkeypatch.setattr(middleware, "_match_route", spy_match_route)
+
+    response = await client.get("/datasets/", auth=temp_user.auth)
+    assert response.status_code == 200
+    response = await client.get("/docs", auth=temp_user.auth)
+    assert response.status_code == 200
+    response = await client.get("/not-a-route/", auth=temp_user.auth)
+    assert response.status_code == 404
+
+    # Shared by the metrics and query budget middleware.
+    assert calls == ["/datasets/", "/docs", None]
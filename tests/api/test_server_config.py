@@ -23,3 +23,24 @@ def test_server_config_live() -> None:
     assert config.port == 3579
     assert config.proxy_headers
     assert config.root_path == "/api"
+
+
+def test_server_config_options() -> None:
+    settings = resolve(Settings).copy(
+        update={
+            "server_mode": "live",
+            "server_loop": "asyncio",
+            "server_http": "h11",
+            "server_backlog": 512,
+            "server_timeout_keep_alive": 75,
+            "server_limit_concurrency": 100,
+        }
+    )
+
+    config = get_server_config("server.main:app", settings)
+
+    assert config.loop == "asyncio"
+    assert config.http == "h11"
+    assert config.backlog == 512
+    assert config.timeout_keep_alive == 75
+    assert config.limit_concurrency == 100
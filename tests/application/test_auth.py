@@ -2,9 +2,9 @@ import pytest
 from pydantic import EmailStr, SecretStr
 
 from server.application.auth.commands import ChangePassword, CreateUser
-from server.application.auth.queries import Login
+from server.application.auth.queries import GetUserByAPIToken, Login
 from server.config.di import resolve
-from server.domain.auth.exceptions import LoginFailed
+from server.domain.auth.exceptions import LoginFailed, UserDoesNotExist
 from server.seedwork.application.messages import MessageBus
 
 
@@ -15,8 +15,16 @@ async def test_changepassword() -> None:
 
     await bus.execute(CreateUser(email=email, password=SecretStr("initialpwd")))
 
+    user = await bus.execute(Login(email=email, password=SecretStr("initialpwd")))
+    # Authenticate, so that the user gets cached.
+    await bus.execute(GetUserByAPIToken(api_token=user.api_token))
+
     await bus.execute(ChangePassword(email=email, password=SecretStr("newpwd")))
 
+    # Previous API token was revoked.
+    with pytest.raises(UserDoesNotExist):
+        await bus.execute(GetUserByAPIToken(api_token=user.api_token))
+
     with pytest.raises(LoginFailed):
         await bus.execute(Login(email=email, password=SecretStr("initialpwd")))
 
@@ -1,6 +1,14 @@
 import asyncio
 import os
-from typing import TYPE_CHECKING, AsyncIterator, Iterator, List
+from contextlib import contextmanager
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterator,
+    Callable,
+    ContextManager,
+    Iterator,
+    List,
+)
 
 import httpx
 import pytest
@@ -8,8 +16,11 @@ import pytest_asyncio
 from alembic import command
 from alembic.config import Config
 from asgi_lifespan import LifespanManager
+from sqlalchemy import create_engine, text
 from sqlalchemy_utils import create_database, database_exists, drop_database
 
+from server.application.auth.cache import APITokenCache
+from server.application.datasets.cache import DatasetFiltersCache
 from server.application.datasets.queries import GetAllDatasets
 from server.application.tags.queries import GetAllTags
 from server.application.tags.views import TagView
@@ -17,6 +28,7 @@ from server.config import Settings
 from server.config.di import bootstrap, resolve
 from server.domain.auth.entities import UserRole
 from server.infrastructure.database import Database
+from server.infrastructure.metrics.sql import QueryStats, track_queries
 from server.seedwork.application.messages import MessageBus
 from tests.factories import CreateTagFactory
 
@@ -27,6 +39,7 @@ if TYPE_CHECKING:
 
 os.environ["APP_TESTING"] = "True"
 os.environ["APP_CONFIG_REPO_API_KEY"] = "<testing>"
+os.environ["APP_METRICS_API_KEY"] = "<metrics>"
 
 bootstrap()
 
@@ -40,6 +53,12 @@ def test_database() -> Iterator[None]:
 
     create_database(url)
 
+    # Created on provisioning, as it requires a superuser. See: docs/fr/ops.md
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    engine.dispose()
+
     try:
         config = Config("alembic.ini")
         command.upgrade(config, "head")
@@ -55,6 +74,10 @@ async def autorollback_db() -> AsyncIterator[None]:
     async with db.autorollback():
         yield
 
+    # Rolled back writes bypass cache invalidation.
+    resolve(APITokenCache).clear()
+    resolve(DatasetFiltersCache).invalidate()
+
 
 @pytest_asyncio.fixture(scope="session", autouse=True)
 async def warmup_db() -> None:
@@ -113,3 +136,25 @@ async def fixture_temp_user() -> TestUser:
 @pytest_asyncio.fixture
 async def admin_user() -> TestUser:
     return await create_test_user(UserRole.ADMIN)
+
+
+@pytest.fixture
+def assert_num_queries() -> Callable[[int], ContextManager[QueryStats]]:
+    """
+    Assert the number of SQL statements executed within a block.
+
+    Usage:
+        with assert_num_queries(2):
+            response = await client.get(...)
+    """
+
+    @contextmanager
+    def _assert_num_queries(expected: int) -> Iterator[QueryStats]:
+        with track_queries() as queries:
+            yield queries
+
+        assert (
+            queries.count == expected
+        ), f"Expected {expected} SQL statements, {queries.count} were executed"
+
+    return _assert_num_queries
@@ -38,7 +38,9 @@ async def test_catalog_creation_and_relationships() -> None:
     assert user.organization_siret == siret
 
     # Add a dataset to the catalog...
-    dataset_id = await bus.execute(CreateDatasetFactory.build(organization_siret=siret))
+    dataset_id = (
+        await bus.execute(CreateDatasetFactory.build(organization_siret=siret))
+    ).id
 
     dataset = await bus.execute(GetDatasetByID(id=dataset_id))
     assert dataset.catalog_record.organization_siret == siret
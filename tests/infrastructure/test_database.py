@@ -0,0 +1,225 @@
+import asyncio
+import time
+from typing import Any, List
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from server.application.datasets.events import DatasetUpdated
+from server.application.tags.queries import GetAllTags
+from server.config import Settings
+from server.config.di import resolve
+from server.domain.common.types import id_factory
+from server.infrastructure.adapters.messages import MessageBusAdapter
+from server.infrastructure.adapters.unit_of_work import SqlUnitOfWork
+from server.infrastructure.database import Database
+from server.seedwork.application.commands import Command
+from server.seedwork.application.messages import MessageBus
+from server.seedwork.application.queries import Query
+
+from ..factories import CreateTagFactory
+
+
+@pytest.mark.asyncio
+async def test_database_statement_timeout() -> None:
+    settings = resolve(Settings)
+    db = Database(settings.env_database_url, statement_timeout=0.01)
+
+    try:
+        async with db.session() as session:
+            with pytest.raises(DBAPIError, match="statement timeout"):
+                await session.execute(text("SELECT pg_sleep(1)"))
+    finally:
+        await db.engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_database_transaction() -> None:
+    db = resolve(Database)
+    committed = []
+
+    async with db.transaction() as session:
+        db.on_commit(lambda: committed.append(1))
+
+        # Sessions share the transaction, including nested ones.
+        async with db.session() as other:
+            assert other is session
+        async with db.transaction() as other:
+            assert other is session
+            db.on_commit(lambda: committed.append(2))
+
+        assert not committed
+
+    assert committed == [1, 2]
+
+    # Outside of a transaction, sessions are independent.
+    async with db.session() as session:
+        async with db.session() as other:
+            assert other is not session
+
+    # Callbacks run right away.
+    db.on_commit(lambda: committed.append(3))
+    assert committed == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_database_transaction_rollback() -> None:
+    db = resolve(Database)
+    bus = resolve(MessageBus)
+    committed = []
+
+    with pytest.raises(RuntimeError):
+        async with db.transaction():
+            db.on_commit(lambda: committed.append(1))
+            await bus.execute(CreateTagFactory.build(name="Rolled back"))
+            raise RuntimeError
+
+    assert not committed
+
+    tags = await bus.execute(GetAllTags())
+    assert "Rolled back" not in [tag.name for tag in tags]
+
+
+@pytest.mark.asyncio
+async def test_events_published_on_commit() -> None:
+    db = resolve(Database)
+    handler = Mock()
+    bus = MessageBusAdapter(
+        {},
+        {},
+        unit_of_work=SqlUnitOfWork(db),
+        event_handlers={DatasetUpdated: [handler]},
+    )
+
+    with pytest.raises(RuntimeError):
+        async with db.transaction():
+            bus.publish(DatasetUpdated(id=id_factory()))
+            raise RuntimeError
+
+    handler.assert_not_called()
+
+    event = DatasetUpdated(id=id_factory())
+    async with db.transaction():
+        bus.publish(event)
+        handler.assert_not_called()
+
+    handler.assert_called_once_with(event)
+
+
+@pytest.mark.asyncio
+async def test_database_replica_routing() -> None:
+    settings = resolve(Settings)
+    # Same database under two URLs.
+    url = settings.env_database_url
+    db = Database(url, replica_urls=[url], read_your_writes_window=0.2)
+    (replica,) = db.replica_engines
+
+    try:
+        async with db.session() as session:
+            assert session.bind is db.engine
+
+        async with db.read_only():
+            async with db.session() as session:
+                assert session.bind is replica
+                assert (await session.execute(text("SELECT 1"))).scalar() == 1
+
+            async with db.transaction() as session:
+                assert session.bind is db.engine
+
+        with db.client() as client:
+            async with db.transaction():
+                pass
+
+            assert client.last_write_at is not None
+
+            async with db.read_only():
+                # The client reads its own writes from the primary...
+                async with db.session() as session:
+                    assert session.bind is db.engine
+
+                # ...until replicas have had time to catch up.
+                await asyncio.sleep(0.2)
+                async with db.session() as session:
+                    assert session.bind is replica
+
+        # Clients carry the time of their last write, e.g. across processes.
+        with db.client(last_write_at=time.time()):
+            async with db.read_only():
+                async with db.session() as session:
+                    assert session.bind is db.engine
+
+        with db.client() as client:
+            async with db.read_only():
+                async with db.session() as session:
+                    assert session.bind is replica
+
+            assert client.last_write_at is None
+    finally:
+        await db.dispose()
+
+
+@pytest.mark.asyncio
+async def test_database_replica_pinning() -> None:
+    settings = resolve(Settings)
+    url = settings.env_database_url
+    db = Database(url, replica_urls=[url, url])
+    first, second = db.replica_engines
+
+    async def get_binds() -> List[Any]:
+        binds = []
+        for _ in range(3):
+            async with db.session() as session:
+                binds.append(session.bind)
+        return binds
+
+    try:
+        # Sessions of a read-only block all use the same replica...
+        async with db.read_only():
+            assert await get_binds() == [first] * 3
+
+        # ...and the next block uses the next replica.
+        async with db.read_only():
+            assert await get_binds() == [second] * 3
+
+        # Read-only blocks of a client, e.g. of an HTTP request, share a replica.
+        with db.client():
+            async with db.read_only():
+                assert await get_binds() == [first] * 3
+            async with db.read_only():
+                assert await get_binds() == [first] * 3
+    finally:
+        await db.dispose()
+
+
+class _GetBind(Query[Any]):
+    pass
+
+
+class _GetBindInTransaction(Command[Any]):
+    pass
+
+
+@pytest.mark.asyncio
+async def test_bus_routes_queries_to_replica() -> None:
+    settings = resolve(Settings)
+    url = settings.env_database_url
+    db = Database(url, replica_urls=[url])
+    (replica,) = db.replica_engines
+
+    async def get_bind(message: Any) -> Any:
+        async with db.session() as session:
+            return session.bind
+
+    bus = MessageBusAdapter(
+        command_handlers={_GetBindInTransaction: get_bind},
+        query_handlers={_GetBind: get_bind},
+        unit_of_work=SqlUnitOfWork(db),
+    )
+
+    try:
+        assert await bus.execute(_GetBind()) is replica
+        assert await bus.execute(_GetBindInTransaction()) is db.engine
+    finally:
+        await db.dispose()
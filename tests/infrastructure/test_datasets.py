@@ -1,13 +1,20 @@
+from typing import Any, List
+
 import pytest
-from sqlalchemy import select
+from sqlalchemy import event, select
 from sqlalchemy.orm import contains_eager
 
 from server.application.datasets.commands import DeleteDataset
 from server.application.datasets.queries import GetDatasetByID
 from server.config.di import resolve
 from server.domain.catalog_records.repositories import CatalogRecordRepository
+from server.domain.changes.repositories import ChangeVersionRepository
+from server.domain.datasets.specifications import DatasetSpec
+from server.infrastructure.changes.models import bump_catalog_version
 from server.infrastructure.database import Database
 from server.infrastructure.datasets.models import DatasetModel
+from server.infrastructure.datasets.queries.get_all import GetAllQuery
+from server.infrastructure.helpers.sqlalchemy import get_estimated_count_from
 from server.infrastructure.tags.repositories import TagModel, dataset_tag
 from server.seedwork.application.messages import MessageBus
 
@@ -19,7 +26,7 @@ async def test_dataset_cascades() -> None:
     bus = resolve(MessageBus)
 
     tag_id = await bus.execute(CreateTagFactory.build(name="Architecture"))
-    dataset_id = await bus.execute(CreateDatasetFactory.build(tag_ids=[tag_id]))
+    dataset_id = (await bus.execute(CreateDatasetFactory.build(tag_ids=[tag_id]))).id
 
     dataset = await bus.execute(GetDatasetByID(id=dataset_id))
 
@@ -42,3 +49,56 @@ async def test_dataset_cascades() -> None:
         tag = result.unique().scalar_one()
         assert tag.name == "Architecture"
         assert not tag.datasets
+
+
+@pytest.mark.asyncio
+async def test_dataset_estimated_count() -> None:
+    bus = resolve(MessageBus)
+
+    for _ in range(5):
+        await bus.execute(CreateDatasetFactory.build())
+
+    query = GetAllQuery(DatasetSpec())
+
+    async with resolve(Database).session() as session:
+        count, estimated = await get_estimated_count_from(
+            query.count_statement, session, threshold=10
+        )
+        assert count == 5
+        assert not estimated
+
+        count, estimated = await get_estimated_count_from(
+            query.count_statement, session, threshold=2
+        )
+        assert count >= 3
+        assert estimated
+
+
+@pytest.mark.asyncio
+async def test_catalog_version_bumped_on_commit() -> None:
+    db = resolve(Database)
+    change_version_repository = resolve(ChangeVersionRepository)
+    version = await change_version_repository.get_catalog_version()
+
+    statements: List[str] = []
+
+    def on_execute(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        if not statement.startswith(("SAVEPOINT", "RELEASE", "ROLLBACK")):
+            statements.append(statement)
+
+    event.listen(db.engine.sync_engine, "before_cursor_execute", on_execute)
+    try:
+        async with db.transaction() as session:
+            async with session.begin_nested():
+                bump_catalog_version(session)
+                bump_catalog_version(session)
+            await session.execute(select(DatasetModel.id).limit(1))
+    finally:
+        event.remove(db.engine.sync_engine, "before_cursor_execute", on_execute)
+
+    # The catalog version row stays locked until commit, so it is updated last.
+    assert len(statements) == 2
+    assert statements[-1].startswith("UPDATE catalog_version")
+
+    new_version = await change_version_repository.get_catalog_version()
+    assert new_version.value == version.value + 1
@@ -1,3 +1,6 @@
+import subprocess
+import sys
+
 import httpx
 import pytest
 
@@ -57,3 +60,17 @@ async def test_cors_disallowed_origin(client: httpx.AsyncClient) -> None:
     }
     response = await client.options("/", headers=headers)
     assert response.status_code == 400
+
+
+def test_startup_lazy_imports() -> None:
+    # Debug-only dependencies and message handlers are loaded when needed, rather
+    # than slowing down startup. See: benchmarks/importtime.py
+    code = "import sys, server.main; print('\\n'.join(sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    modules = result.stdout.splitlines()
+
+    assert "server.main" in modules
+    assert "debug_toolbar" not in modules
+    assert "server.application.datasets.handlers" not in modules
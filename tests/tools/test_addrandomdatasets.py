@@ -1,8 +1,15 @@
+from typing import List
+
 import pytest
 
+from server.application.changes.queries import GetCatalogVersion
 from server.application.datasets.queries import GetAllDatasets
+from server.application.tags.views import TagView
 from server.config.di import resolve
+from server.domain.common.types import id_factory
+from server.domain.datasets.specifications import DatasetSpec
 from server.seedwork.application.messages import MessageBus
+from tests.factories import CreateDatasetFactory
 from tools import addrandomdatasets
 
 
@@ -18,3 +25,46 @@ async def test_addrandomdatasets() -> None:
 
     pagination = await bus.execute(GetAllDatasets())
     assert pagination.total_items == 20
+
+
+@pytest.mark.asyncio
+async def test_addrandomdatasets_copy(tags: List[TagView]) -> None:
+    bus = resolve(MessageBus)
+    version = await bus.execute(GetCatalogVersion())
+
+    await addrandomdatasets.main_copy(n=20, seed=1, batch_size=8)
+
+    pagination = await bus.execute(GetAllDatasets())
+    assert pagination.total_items == 20
+    assert all(1 <= len(dataset.tags) <= 3 for dataset in pagination.items)
+
+    # Changes were recorded.
+    assert (await bus.execute(GetCatalogVersion())).value > version.value
+
+    # Search vectors were computed, including tags...
+    dataset = pagination.items[0]
+    for term in [dataset.title, dataset.tags[0].name]:
+        pagination = await bus.execute(
+            GetAllDatasets(spec=DatasetSpec(search_term=term))
+        )
+        assert dataset.id in [item.id for item in pagination.items]
+
+    # ...and they are still computed by triggers afterwards.
+    await bus.execute(CreateDatasetFactory.build(title="Inventaire des orchidées"))
+    pagination = await bus.execute(
+        GetAllDatasets(spec=DatasetSpec(search_term="orchidées"))
+    )
+    assert pagination.total_items == 1
+
+
+def test_addrandomdatasets_copy_deterministic() -> None:
+    refs = addrandomdatasets.Refs(
+        tag_ids=[id_factory() for _ in range(5)], dataformat_ids=[1, 2, 3]
+    )
+
+    batch = addrandomdatasets.generate_batch(3, 10, seed=1, refs=refs)
+
+    # Batches only depend on the seed and their index, whatever the worker.
+    assert addrandomdatasets.generate_batch(3, 10, seed=1, refs=refs) == batch
+    assert addrandomdatasets.generate_batch(4, 10, seed=1, refs=refs) != batch
+    assert addrandomdatasets.generate_batch(3, 10, seed=2, refs=refs) != batch
@@ -0,0 +1,59 @@
+from server.infrastructure.helpers.bm25 import BM25Index, analyze, highlight
+
+
+def test_analyze() -> None:
+    assert analyze("Les forêts anciennes de France") == ["forêt", "ancien", "franc"]
+    assert analyze("") == []
+
+
+def test_bm25_index_search() -> None:
+    index: BM25Index[int] = BM25Index({"title": 1.0, "description": 0.2})
+    index.add(1, {"title": "Forêts anciennes", "description": "..."})
+    index.add(2, {"title": "Inventaire", "description": "Forêts anciennes"})
+    index.add(3, {"title": "Forêts nouvelles", "description": "..."})
+
+    scores = index.search("forêt ancienne")
+    # All words must match, and title matches rank higher.
+    assert set(scores) == {1, 2}
+    assert scores[1] > scores[2]
+
+    assert index.search("forêt tototitu") == {}
+    assert index.search("de la") == {}
+    assert index.search("") == {}
+
+
+def test_bm25_index_prefix_search() -> None:
+    index: BM25Index[int] = BM25Index({"title": 1.0})
+    index.add(1, {"title": "Inventaire forestier"})
+    index.add(2, {"title": "Inventaire des forêts"})
+
+    assert set(index.search("invent for", prefix=True)) == {1, 2}
+    assert set(index.search("invent forest", prefix=True)) == {1}
+    assert index.search("invent", prefix=False) == {}
+    # Short words are matched as whole words.
+    assert index.search("in", prefix=True) == {}
+
+
+def test_bm25_index_add_remove() -> None:
+    index: BM25Index[int] = BM25Index({"title": 1.0})
+    index.add(1, {"title": "Forêts"})
+    index.add(2, {"title": "Forêts"})
+    assert len(index) == 2
+
+    index.add(1, {"title": "Rivières"})
+    assert set(index.search("forêt")) == {2}
+    assert set(index.search("rivière")) == {1}
+
+    index.remove(1)
+    index.remove(1)  # Idempotent
+    assert 1 not in index
+    assert index.search("rivière", prefix=True) == {}
+    assert set(index.search("forêt")) == {2}
+
+
+def test_highlight() -> None:
+    terms = {"forêt", "ancien"}
+    assert (
+        highlight("Forêts anciennes de France", terms, "<mark>", "</mark>")
+        == "<mark>Forêts</mark> <mark>anciennes</mark> de France"
+    )
@@ -0,0 +1,64 @@
+from server.infrastructure.helpers.cache import TTLCache
+
+
+class FakeTimer:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_ttl_cache_expiry() -> None:
+    timer = FakeTimer()
+    cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl=60, timer=timer)
+
+    assert cache.get("a") is None
+
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    timer.now = 59
+    assert cache.get("a") == 1
+
+    timer.now = 60
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_ttl_cache_lru_eviction() -> None:
+    cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=60)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # 'b' is now least recently used.
+
+    cache.set("c", 3)
+    assert len(cache) == 2
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_disabled() -> None:
+    cache: TTLCache[str, int] = TTLCache(maxsize=0, ttl=60)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+
+def test_ttl_cache_delete() -> None:
+    cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+
+    cache.delete("a")
+    cache.delete("unknown")
+    assert cache.get("a") is None
+
+    cache.delete_where(lambda value: value % 2 == 0)
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+    cache.clear()
+    assert len(cache) == 0
@@ -34,3 +34,16 @@ def test_container_configured() -> None:
     container.bootstrap()
     person = container.resolve(Person)
     assert person.name == "Tiffany"
+
+
+def test_container_override() -> None:
+    def configure(container: Container) -> None:
+        container.register_instance(Person, Person("Tiffany"))
+
+    container = Container(configure)
+    container.bootstrap()
+
+    with container.override(Person, Person("Paul")):
+        assert container.resolve(Person).name == "Paul"
+
+    assert container.resolve(Person).name == "Tiffany"
@@ -0,0 +1,68 @@
+from typing import List
+
+import pytest
+
+from server.seedwork.application import modules
+from server.seedwork.application.commands import Command
+from server.seedwork.application.events import Event
+from server.seedwork.application.modules import Handlers, Module
+from server.seedwork.application.queries import Query
+
+
+class ExampleCommand(Command[None]):
+    pass
+
+
+class ExampleQuery(Query[None]):
+    pass
+
+
+class ExampleEvent(Event):
+    pass
+
+
+async def handle_command(command: ExampleCommand) -> None:
+    pass
+
+
+async def handle_query(query: ExampleQuery) -> None:
+    pass
+
+
+def on_event(event: ExampleEvent) -> None:
+    pass
+
+
+def on_event_too(event: ExampleEvent) -> None:
+    pass
+
+
+class CommandsModule(Module):
+    command_handlers = {ExampleCommand: handle_command}
+    event_handlers = {ExampleEvent: [on_event]}
+
+
+class QueriesModule(Module):
+    query_handlers = {ExampleQuery: handle_query}
+    event_handlers = {ExampleEvent: [on_event_too]}
+
+
+def test_handlers_loaded_on_first_access(monkeypatch: pytest.MonkeyPatch) -> None:
+    loaded: List[List[str]] = []
+
+    def load_modules(paths: List[str]) -> list:
+        loaded.append(paths)
+        return [CommandsModule, QueriesModule]
+
+    monkeypatch.setattr(modules, "load_modules", load_modules)
+
+    handlers = Handlers(["example.CommandsModule", "example.QueriesModule"])
+    assert not loaded
+
+    assert handlers.command_handlers[ExampleCommand] is handle_command
+    assert loaded == [["example.CommandsModule", "example.QueriesModule"]]
+
+    assert handlers.query_handlers[ExampleQuery] is handle_query
+    assert handlers.event_handlers[ExampleEvent] == [on_event, on_event_too]
+    assert ExampleQuery not in handlers.command_handlers
+    assert len(loaded) == 1
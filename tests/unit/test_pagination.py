@@ -3,7 +3,8 @@ from typing import Callable, Optional
 import pytest
 from pydantic import ValidationError
 
-from server.domain.common.pagination import Page, Pagination
+from server.domain.common.exceptions import InvalidCursor
+from server.domain.common.pagination import Cursor, Page, Pagination
 
 
 def test_default_page() -> None:
@@ -92,3 +93,24 @@ def test_pagination_total_pages() -> None:
 
     pagination = Pagination(items=items, total_items=7, page_size=3)
     assert pagination.total_pages == 3
+
+
+def test_cursor_encode_decode() -> None:
+    cursor = Cursor(key=[0.5, "2022-07-25T10:00:00+00:00"], direction="previous")
+    value = cursor.encode()
+    assert isinstance(value, str)
+    assert Cursor.decode(value) == cursor
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        pytest.param("", id="empty"),
+        pytest.param("not-base64!", id="not-base64"),
+        pytest.param("bm90LWpzb24=", id="not-json"),
+        pytest.param("eyJrZXkiOiAxfQ==", id="invalid-key"),
+    ],
+)
+def test_cursor_decode_invalid(value: str) -> None:
+    with pytest.raises(InvalidCursor):
+        Cursor.decode(value)
@@ -1,3 +1,6 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
 from pydantic import SecretStr
 
 from server.application.auth.passwords import generate_api_token
@@ -10,10 +13,27 @@ def test_generate_api_token() -> None:
     assert api_token.isalnum()
 
 
-def test_argon2_password_encoder() -> None:
+@pytest.mark.asyncio
+async def test_argon2_password_encoder() -> None:
     password = SecretStr("s3kr3t")
     encoder = Argon2PasswordEncoder()
-    hash_ = encoder.hash(password)
-    assert encoder.verify(password, hash_)
-    assert not encoder.verify(SecretStr("other"), hash_)
-    assert not encoder.verify(password, "invalidhash")
+    hash_ = await encoder.hash(password)
+    assert await encoder.verify(password, hash_)
+    assert not await encoder.verify(SecretStr("other"), hash_)
+    assert not await encoder.verify(password, "invalidhash")
+
+
+@pytest.mark.asyncio
+async def test_argon2_password_encoder_params() -> None:
+    password = SecretStr("s3kr3t")
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        encoder = Argon2PasswordEncoder(
+            time_cost=1, memory_cost=1024, parallelism=1, executor=executor
+        )
+        hash_ = await encoder.hash(password)
+        assert "$m=1024,t=1,p=1$" in hash_
+        assert await encoder.verify(password, hash_)
+
+        # Hashes made with other parameters remain valid.
+        assert await Argon2PasswordEncoder().verify(password, hash_)
@@ -0,0 +1,70 @@
+import datetime as dt
+import json
+import uuid
+
+from fastapi.encoders import jsonable_encoder
+
+from server.api.responses import ORJSONResponse
+from server.application.catalog_records.views import CatalogRecordView
+from server.application.datasets.views import (
+    DatasetFacetsView,
+    DatasetListView,
+    DatasetView,
+)
+from server.application.tags.views import TagView
+from server.domain.common.types import ID, id_factory
+from server.domain.datasets.entities import DataFormat, UpdateFrequency
+from server.domain.organizations.entities import LEGACY_ORGANIZATION_SIRET
+
+
+class _UUID(uuid.UUID):
+    # E.g. what asyncpg returns for UUID columns.
+    pass
+
+
+def test_orjson_response_matches_default_encoding() -> None:
+    tag_id = id_factory()
+
+    view = DatasetListView(
+        items=[
+            DatasetView(
+                id=ID(_UUID(str(id_factory()))),
+                catalog_record=CatalogRecordView(
+                    id=id_factory(),
+                    organization_siret=LEGACY_ORGANIZATION_SIRET,
+                    created_at=dt.datetime(
+                        2022, 7, 1, 12, 30, 15, 1234, dt.timezone.utc
+                    ),
+                ),
+                title="Example",
+                description="Example",
+                service="Service",
+                geographical_coverage="France",
+                formats=[DataFormat.WEBSITE],
+                technical_source=None,
+                producer_email=None,
+                contact_emails=["example@mydomain.org"],
+                update_frequency=UpdateFrequency.DAILY,
+                last_updated_at=dt.datetime(2022, 7, 1),
+                url=None,
+                license="Licence Ouverte",
+                tags=[TagView(id=tag_id, name="Tag")],
+                headlines={"title": "<mark>Example</mark>", "description": None},
+            )
+        ],
+        total_items=1,
+        page_size=10,
+        facets=DatasetFacetsView(
+            geographical_coverage={"France": 1},
+            service={"Service": 1},
+            format={DataFormat.WEBSITE: 1},
+            technical_source={},
+            tag_id={tag_id: 1},
+            license={"Licence Ouverte": 1},
+        ),
+    )
+
+    response = ORJSONResponse(view)
+
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == jsonable_encoder(view)
@@ -1,30 +1,334 @@
+"""
+Add random datasets, e.g. for development or capacity testing.
+
+By default, datasets are created through the message bus, as the API does.
+
+With --copy, rows are generated directly and loaded with PostgreSQL COPY, which is
+much faster, e.g. to seed millions of datasets:
+
+    python -m tools.addrandomdatasets 1000000 --copy --workers 4
+
+Datasets are generated in batches that only depend on --seed and on the batch
+size, whatever the number of workers.
+"""
 import argparse
 import asyncio
+import concurrent.futures
+import datetime as dt
 import functools
+import multiprocessing
 import random
+import uuid
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence, Tuple
 
 import click
+from sqlalchemy import any_, bindparam, func, select, text, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
 from tqdm import tqdm
 
+from server.application.datasets.commands import BulkCreateDatasets
 from server.application.tags.queries import GetAllTags
 from server.config.di import bootstrap, resolve
+from server.domain.common import datetime as dtutil
+from server.domain.common.types import ID
+from server.domain.datasets.entities import UpdateFrequency
+from server.domain.licenses.entities import BUILTIN_LICENSE_SUGGESTIONS
+from server.domain.organizations.entities import LEGACY_ORGANIZATION_SIRET
+from server.infrastructure.changes.models import bump_catalog_version
+from server.infrastructure.database import Database
+from server.infrastructure.datasets.models import DataFormatModel, DatasetModel
 from server.seedwork.application.messages import MessageBus
-from tests.factories import CreateDatasetFactory
 
 success = functools.partial(click.style, fg="bright_green")
 
+BATCH_SIZE = 500
+
+COPY_BATCH_SIZE = 5000
+
+# Generated datasets were created over the 3 years before this date.
+_CREATED_BEFORE = dt.datetime(2022, 1, 1, tzinfo=dtutil.UTC)
+_CREATED_OVER = dt.timedelta(days=3 * 365)
+
 
 async def main(n: int) -> None:
+    # Slow to import, and not needed with --copy.
+    from tests.factories import CreateDatasetFactory
+
     bus = resolve(MessageBus)
 
     tag_id_set = [tag.id for tag in await bus.execute(GetAllTags())]
     assert len(tag_id_set) >= 1, "Need at least 1 tag in DB, 0 found"
 
-    for _ in tqdm(range(n), unit="dataset"):
-        tag_ids = random.choices(
-            tag_id_set, k=random.randint(1, min(3, len(tag_id_set)))
+    with tqdm(total=n, unit="dataset") as progress:
+        for start in range(0, n, BATCH_SIZE):
+            items = [
+                CreateDatasetFactory.build(
+                    tag_ids=random.choices(
+                        tag_id_set, k=random.randint(1, min(3, len(tag_id_set)))
+                    )
+                )
+                for _ in range(min(BATCH_SIZE, n - start))
+            ]
+            await bus.execute(BulkCreateDatasets(items=items))
+            progress.update(len(items))
+
+    print(f"{success('created')}: {n} datasets")
+
+
+@dataclass(frozen=True)
+class Refs:
+    """
+    Existing rows that generated rows refer to.
+    """
+
+    tag_ids: List[ID]
+    dataformat_ids: List[int]
+
+
+@dataclass(frozen=True)
+class Batch:
+    catalog_records: List[tuple]
+    datasets: List[tuple]
+    dataset_dataformats: List[tuple]
+    dataset_tags: List[tuple]
+
+    def tables(self) -> List[Tuple[str, List[str], List[tuple]]]:
+        # In order of foreign keys.
+        return [
+            (
+                "catalog_record",
+                ["id", "created_at", "organization_siret"],
+                self.catalog_records,
+            ),
+            (
+                "dataset",
+                [
+                    "id",
+                    "catalog_record_id",
+                    "title",
+                    "description",
+                    "service",
+                    "geographical_coverage",
+                    "technical_source",
+                    "producer_email",
+                    "contact_emails",
+                    "update_frequency",
+                    "last_updated_at",
+                    "url",
+                    "license",
+                ],
+                self.datasets,
+            ),
+            (
+                "dataset_dataformat",
+                ["dataset_id", "dataformat_id"],
+                self.dataset_dataformats,
+            ),
+            ("dataset_tag", ["dataset_id", "tag_id"], self.dataset_tags),
+        ]
+
+
+@dataclass(frozen=True)
+class _Vocabulary:
+    words: Sequence[str]
+    # Catalogs have few distinct values of these fields, unlike random text.
+    services: List[str]
+    geographical_coverages: List[str]
+    technical_sources: List[str]
+    emails: List[str]
+    urls: List[str]
+
+
+@functools.lru_cache()
+def _get_vocabulary(seed: int) -> _Vocabulary:
+    import faker
+    from faker.providers.lorem.fr_FR import Provider as LoremProvider
+
+    fake = faker.Faker(["fr_FR"])
+    fake.seed_instance(seed)
+
+    return _Vocabulary(
+        words=LoremProvider.word_list,
+        services=[fake.company() for _ in range(200)],
+        geographical_coverages=[
+            "France",
+            "France métropolitaine",
+            "Outre-mer",
+            *(fake.region() for _ in range(20)),
+        ],
+        technical_sources=[fake.sentence(nb_words=3) for _ in range(50)],
+        emails=[fake.ascii_free_email() for _ in range(1000)],
+        urls=[fake.url() for _ in range(200)],
+    )
+
+
+def _sentence(
+    rng: random.Random, vocabulary: _Vocabulary, min_words: int, max_words: int
+) -> str:
+    words = rng.choices(vocabulary.words, k=rng.randint(min_words, max_words))
+    return " ".join(words).capitalize() + "."
+
+
+def _maybe(rng: random.Random, value: Any) -> Any:
+    return value if rng.random() < 0.5 else None
+
+
+def generate_batch(index: int, size: int, *, seed: int, refs: Refs) -> Batch:
+    """
+    Generate rows of the `index`-th batch of `size` datasets.
+    """
+    rng = random.Random(f"{seed}:{index}")
+    vocabulary = _get_vocabulary(seed)
+    update_frequencies = [None, *(freq.name for freq in UpdateFrequency)]
+    licenses = [None, *sorted(BUILTIN_LICENSE_SUGGESTIONS)]
+
+    batch = Batch([], [], [], [])
+
+    for _ in range(size):
+        catalog_record_id = uuid.UUID(int=rng.getrandbits(128), version=4)
+        dataset_id = uuid.UUID(int=rng.getrandbits(128), version=4)
+        created_at = _CREATED_BEFORE - _CREATED_OVER * rng.random()
+
+        batch.catalog_records.append(
+            (catalog_record_id, created_at, LEGACY_ORGANIZATION_SIRET)
         )
-        await bus.execute(CreateDatasetFactory.build(tag_ids=tag_ids))
+        batch.datasets.append(
+            (
+                dataset_id,
+                catalog_record_id,
+                _sentence(rng, vocabulary, 3, 10)[:-1],
+                " ".join(
+                    _sentence(rng, vocabulary, 5, 15) for _ in range(rng.randint(2, 8))
+                ),
+                rng.choice(vocabulary.services),
+                rng.choice(vocabulary.geographical_coverages),
+                _maybe(rng, rng.choice(vocabulary.technical_sources)),
+                rng.choice(vocabulary.emails),
+                rng.sample(vocabulary.emails, k=rng.randint(1, 3)),
+                rng.choice(update_frequencies),
+                _maybe(rng, created_at + (_CREATED_BEFORE - created_at) * rng.random()),
+                _maybe(rng, rng.choice(vocabulary.urls)),
+                rng.choice(licenses),
+            )
+        )
+        batch.dataset_dataformats.extend(
+            (dataset_id, dataformat_id)
+            for dataformat_id in rng.sample(refs.dataformat_ids, k=rng.randint(1, 3))
+        )
+        batch.dataset_tags.extend(
+            (dataset_id, tag_id)
+            for tag_id in rng.sample(
+                refs.tag_ids, k=rng.randint(1, min(3, len(refs.tag_ids)))
+            )
+        )
+
+    return batch
+
+
+async def copy_batch(index: int, size: int, *, seed: int, refs: Refs) -> int:
+    batch = generate_batch(index, size, seed=seed, refs=refs)
+    db = resolve(Database)
+
+    async with db.transaction() as session:
+        # Compute search vectors once all rows are written, rather than on each
+        # insert into `dataset` and `dataset_tag`. See migration `5c2f9a1e7b04`.
+        # NOTE: also makes the session begin its transaction, before COPY runs
+        # on the underlying connection.
+        await session.execute(text("SET LOCAL catalogage.defer_search_tsv = 'on'"))
+
+        conn = await session.connection()
+        raw_conn = await conn.get_raw_connection()
+        driver_conn = raw_conn.driver_connection  # asyncpg
+
+        for table, columns, records in batch.tables():
+            await driver_conn.copy_records_to_table(
+                table, records=records, columns=columns
+            )
+
+        await session.execute(
+            update(DatasetModel)
+            .where(
+                DatasetModel.id
+                == any_(
+                    bindparam(
+                        "ids",
+                        [record[0] for record in batch.datasets],
+                        type_=ARRAY(UUID(as_uuid=True)),
+                    )
+                )
+            )
+            .values(
+                search_tsv=func.dataset_search_tsv(
+                    DatasetModel.id,
+                    DatasetModel.title,
+                    DatasetModel.description,
+                    DatasetModel.service,
+                    DatasetModel.geographical_coverage,
+                )
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+        # Local to the transaction, which may be nested, e.g. in tests.
+        await session.execute(text("SET LOCAL catalogage.defer_search_tsv = 'off'"))
+
+        # Datasets are not written through repositories: record the change.
+        bump_catalog_version(session, [record[0] for record in batch.datasets])
+
+    return size
+
+
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _init_worker() -> None:
+    global _worker_loop
+    bootstrap()
+    # Kept across batches, as database connections are bound to it.
+    _worker_loop = asyncio.new_event_loop()
+
+
+def _copy_batch_in_worker(index: int, size: int, seed: int, refs: Refs) -> int:
+    assert _worker_loop is not None
+    return _worker_loop.run_until_complete(
+        copy_batch(index, size, seed=seed, refs=refs)
+    )
+
+
+async def main_copy(
+    n: int, *, seed: int = 0, workers: int = 1, batch_size: int = COPY_BATCH_SIZE
+) -> None:
+    bus = resolve(MessageBus)
+    db = resolve(Database)
+
+    tag_ids = [tag.id for tag in await bus.execute(GetAllTags())]
+    assert len(tag_ids) >= 1, "Need at least 1 tag in DB, 0 found"
+
+    async with db.session() as session:
+        result = await session.execute(select(DataFormatModel.id))
+        dataformat_ids = sorted(result.scalars())
+
+    refs = Refs(tag_ids=tag_ids, dataformat_ids=dataformat_ids)
+
+    sizes = [min(batch_size, n - start) for start in range(0, n, batch_size)]
+
+    with tqdm(total=n, unit="dataset") as progress:
+        if workers == 1:
+            for index, size in enumerate(sizes):
+                progress.update(await copy_batch(index, size, seed=seed, refs=refs))
+        else:
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            ) as executor:
+                futures = [
+                    executor.submit(_copy_batch_in_worker, index, size, seed, refs)
+                    for index, size in enumerate(sizes)
+                ]
+                for future in concurrent.futures.as_completed(futures):
+                    progress.update(future.result())
 
     print(f"{success('created')}: {n} datasets")
 
@@ -32,7 +336,26 @@ async def main(n: int) -> None:
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("n", type=int)
+    parser.add_argument(
+        "--copy", action="store_true", help="Load generated rows using COPY"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="With --copy")
+    parser.add_argument("--workers", type=int, default=1, help="With --copy")
+    parser.add_argument(
+        "--batch-size", type=int, default=COPY_BATCH_SIZE, help="With --copy"
+    )
     args = parser.parse_args()
 
     bootstrap()
-    asyncio.run(main(n=args.n))
+
+    if args.copy:
+        asyncio.run(
+            main_copy(
+                n=args.n,
+                seed=args.seed,
+                workers=args.workers,
+                batch_size=args.batch_size,
+            )
+        )
+    else:
+        asyncio.run(main(n=args.n))